@@ -0,0 +1,76 @@
+-- Migration: Append-only interview message storage
+-- Chat turns append their messages here instead of rewriting interview_sessions.messages,
+-- so a turn writes only its new rows. interview_sessions.messages is kept (no longer
+-- written) for sessions that haven't been migrated yet.
+
+-- One row per message, numbered from 0 within its session
+CREATE TABLE IF NOT EXISTS interview_messages (
+    session_id UUID NOT NULL REFERENCES interview_sessions(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    role VARCHAR(20) NOT NULL,
+    content TEXT,
+    timestamp TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (session_id, seq)
+);
+
+-- The primary key is the (session_id, seq) index used to read a session in order
+COMMENT ON TABLE interview_messages IS 'Append-only interview transcript, one row per message ordered by seq';
+
+-- Users can read the messages of their own sessions
+ALTER TABLE interview_messages ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can read their own interview messages" ON interview_messages;
+CREATE POLICY "Users can read their own interview messages" ON interview_messages
+FOR SELECT USING (
+    EXISTS (
+        SELECT 1 FROM interview_sessions s
+        WHERE s.id = interview_messages.session_id AND s.user_id = auth.uid()
+    )
+);
+
+-- Explode existing JSONB message arrays into interview_messages, batch_size sessions per
+-- transaction. Safe to re-run: sessions that already have rows are skipped.
+--   CALL migrate_interview_messages();        -- default 500 sessions per batch
+--   CALL migrate_interview_messages(100);
+CREATE OR REPLACE PROCEDURE migrate_interview_messages(batch_size INTEGER DEFAULT 500)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    last_id UUID := '00000000-0000-0000-0000-000000000000';
+    batch_last_id UUID;
+    migrated INTEGER;
+BEGIN
+    LOOP
+        SELECT max(id) INTO batch_last_id
+        FROM (
+            SELECT id FROM interview_sessions
+            WHERE id > last_id
+            ORDER BY id
+            LIMIT batch_size
+        ) batch;
+
+        EXIT WHEN batch_last_id IS NULL;
+
+        INSERT INTO interview_messages (session_id, seq, role, content, timestamp)
+        SELECT
+            s.id,
+            (m.ordinality - 1)::INTEGER,
+            COALESCE(m.message->>'role', 'user'),
+            m.message->>'content',
+            COALESCE(NULLIF(m.message->>'timestamp', '')::TIMESTAMPTZ, s.created_at)
+        FROM interview_sessions s
+        CROSS JOIN LATERAL jsonb_array_elements(s.messages) WITH ORDINALITY AS m(message, ordinality)
+        WHERE s.id > last_id
+          AND s.id <= batch_last_id
+          AND jsonb_typeof(s.messages) = 'array'
+          AND NOT EXISTS (SELECT 1 FROM interview_messages im WHERE im.session_id = s.id)
+        ON CONFLICT (session_id, seq) DO NOTHING;
+
+        GET DIAGNOSTICS migrated = ROW_COUNT;
+        RAISE NOTICE 'Migrated % messages for sessions up to %', migrated, batch_last_id;
+
+        last_id := batch_last_id;
+        COMMIT;
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,12 @@
+-- Migration: Index for the interview session sweeper
+-- The API deletes abandoned sessions (status 'active', not updated for
+-- INTERVIEW_SESSION_TTL_HOURS) in batches, and a user's superseded active sessions
+-- when they start a new interview. Both look up active sessions only.
+
+CREATE INDEX IF NOT EXISTS idx_interview_sessions_active_updated
+ON interview_sessions(updated_at)
+WHERE status = 'active';
+
+CREATE INDEX IF NOT EXISTS idx_interview_sessions_active_user
+ON interview_sessions(user_id)
+WHERE status = 'active';
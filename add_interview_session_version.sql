@@ -0,0 +1,8 @@
+-- Migration: Optimistic concurrency for interview sessions
+-- Every write of an interview_sessions row from the API is conditional on the version it
+-- read and increments it, so a worker holding a stale copy of a session can't overwrite
+-- the response chain (last_response_id) written by another worker.
+
+ALTER TABLE interview_sessions ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN interview_sessions.version IS 'Incremented on every API write; writes are conditional on the previous value';
@@ -0,0 +1,44 @@
+-- Migration: NOTIFY the backend when leaderboard-relevant rows change
+-- Lets the API patch its cached leaderboard snapshot for writes made outside the
+-- backend (n8n workflows, SQL editor). Listened to when INVALIDATION_DATABASE_URL is set.
+
+-- Publish a small JSON payload on the hybrid_house_invalidation channel
+CREATE OR REPLACE FUNCTION notify_hybrid_house_invalidation()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed_row RECORD;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed_row := OLD;
+    ELSE
+        changed_row := NEW;
+    END IF;
+
+    PERFORM pg_notify(
+        'hybrid_house_invalidation',
+        json_build_object(
+            'table', TG_TABLE_NAME,
+            'action', lower(TG_OP),
+            'user_id', changed_row.user_id,
+            'profile_id', CASE WHEN TG_TABLE_NAME = 'athlete_profiles' THEN changed_row.id ELSE NULL END,
+            -- Identifies the write, so the backend can drop the echo of its own writes
+            'updated_at', changed_row.updated_at
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Scores, privacy and deletions change leaderboard membership and ranks
+DROP TRIGGER IF EXISTS athlete_profiles_invalidation ON athlete_profiles;
+CREATE TRIGGER athlete_profiles_invalidation
+    AFTER INSERT OR DELETE OR UPDATE OF hybrid_score, score_data, is_public, user_id ON athlete_profiles
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_hybrid_house_invalidation();
+
+-- Display names and demographics change leaderboard entries and segments
+DROP TRIGGER IF EXISTS user_profiles_invalidation ON user_profiles;
+CREATE TRIGGER user_profiles_invalidation
+    AFTER UPDATE OF display_name, name, email, gender, date_of_birth, country ON user_profiles
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_hybrid_house_invalidation();
@@ -0,0 +1,32 @@
+-- Migration: LLM call ledger
+-- One row per interview model call, written in batches by the API when LLM_LEDGER_PERSIST=1.
+-- Used offline to size concurrency limits and to spot latency/token regressions after prompt changes.
+
+CREATE TABLE IF NOT EXISTS llm_call_ledger (
+    id BIGSERIAL PRIMARY KEY,
+    endpoint VARCHAR(50) NOT NULL,
+    model VARCHAR(50) NOT NULL,
+    route VARCHAR(30),
+    session_id UUID,
+    streamed BOOLEAN NOT NULL DEFAULT FALSE,
+    used_previous_response_id BOOLEAN NOT NULL DEFAULT FALSE,
+    response_id VARCHAR(100),
+    wall_ms REAL NOT NULL,
+    ttft_ms REAL,
+    input_tokens INTEGER,
+    cached_input_tokens INTEGER,
+    output_tokens INTEGER,
+    status VARCHAR(10) NOT NULL DEFAULT 'ok',
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Time-window queries per endpoint/model
+CREATE INDEX IF NOT EXISTS idx_llm_call_ledger_endpoint_created
+ON llm_call_ledger(endpoint, model, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_llm_call_ledger_session
+ON llm_call_ledger(session_id) WHERE session_id IS NOT NULL;
+
+-- Only the service role (the API) reads and writes the ledger
+ALTER TABLE llm_call_ledger ENABLE ROW LEVEL SECURITY;
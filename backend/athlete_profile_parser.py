@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Athlete Profile Stream Parser for Hybrid House
+Incremental detection and parsing of the ATHLETE_PROFILE::: completion payload,
+and the JSON schema for synthesizing a profile with structured output
+"""
+
+import os
+import re
+import json
+import copy
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import TypeAdapter
+
+# Completion trigger the interview prompts end with
+SENTINEL = "ATHLETE_PROFILE:::"
+
+# Payloads longer than this are rejected rather than scanned or repaired
+MAX_PROFILE_CHARS = int(os.environ.get('ATHLETE_PROFILE_MAX_CHARS', '16384'))
+
+# Most unclosed objects/arrays a truncated payload may have and still be repaired
+MAX_REPAIR_DEPTH = 8
+
+_TRAILING_COMMAS = re.compile(r',\s*([}\]])')
+_PARTIAL_SCALAR = re.compile(r'[-+0-9.eEa-z]+$')
+_DANGLING_MEMBER = re.compile(r'(?:,|(?<=[{\[]))\s*(?:"(?:[^"\\]|\\.)*"\s*:?\s*)?$')
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+class ProfileParseError(ValueError):
+    """The ATHLETE_PROFILE::: payload could not be parsed, even after repair"""
+
+
+class AthleteProfileStreamParser:
+    """
+    Watches model output for ATHLETE_PROFILE::: and parses the JSON after it
+    as the text arrives.
+
+    feed() scans each chunk once, tracking string/escape state and the
+    bracket stack, and returns the profile the moment its top-level object
+    closes, so the caller can stop reading the stream and persist it.
+    Anything after the closing brace (trailing prose) is ignored. If the
+    stream ends first, finish() attempts a bounded repair: the last member
+    is dropped if its value may be cut off (an open string or a bare
+    number), as are a dangling key and trailing comma, and the open
+    objects/arrays are closed, up to MAX_REPAIR_DEPTH levels. feed() never
+    raises; finish() reports a payload that could not be parsed.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._length = 0
+        self._search = ''
+        self._sentinel_at = 0
+        self.detected = False
+        self.profile: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self._payload: List[str] = []
+        self._payload_size = 0
+        self._started = False
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+    @property
+    def text(self) -> str:
+        """All text fed so far"""
+        return ''.join(self._chunks)
+
+    @property
+    def visible_text(self) -> str:
+        """Text safe to show while streaming: everything before the sentinel, holding back a partial one"""
+        text = self.text
+        if self.detected:
+            return text[:self._sentinel_at]
+        for keep in range(min(len(SENTINEL) - 1, len(text)), 0, -1):
+            if SENTINEL.startswith(text[-keep:]):
+                return text[:-keep]
+        return text
+
+    def feed(self, chunk: str) -> Optional[Dict]:
+        """Consume a chunk of output; returns the profile once its JSON object has closed"""
+        if not chunk:
+            return self.profile
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        if self.profile is not None or self.error is not None:
+            return self.profile
+
+        if not self.detected:
+            # Keep just enough of the previous text to find a sentinel split across chunks
+            self._search += chunk
+            index = self._search.find(SENTINEL)
+            if index < 0:
+                self._search = self._search[-(len(SENTINEL) - 1):]
+                return None
+            self.detected = True
+            self._sentinel_at = self._length - len(self._search) + index
+            chunk = self._search[index + len(SENTINEL):]
+            self._search = ''
+
+        self._scan(chunk)
+        return self.profile
+
+    def _scan(self, chunk: str):
+        for ch in chunk:
+            if not self._started:
+                # Skip whitespace and code fences until the object opens
+                if ch == '{':
+                    self._started = True
+                    self._stack.append('{')
+                    self._append('{')
+                continue
+
+            self._append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._payload_size - 1
+            elif ch in _CLOSERS:
+                self._stack.append(ch)
+            elif ch in '}]' and self._stack:
+                self._stack.pop()
+                if not self._stack:
+                    try:
+                        self.profile = self._load(''.join(self._payload))
+                    except ProfileParseError as e:
+                        self.error = str(e)
+                    return
+
+            if self._payload_size > MAX_PROFILE_CHARS:
+                self.error = f"Profile payload exceeds {MAX_PROFILE_CHARS} characters"
+                return
+
+    def _append(self, ch: str):
+        self._payload.append(ch)
+        self._payload_size += 1
+
+    def _load(self, payload: str) -> Dict:
+        """Parse a complete object, retrying once without trailing commas"""
+        for candidate in (payload, _TRAILING_COMMAS.sub(r'\1', payload)):
+            try:
+                value = json.loads(candidate)
+            except ValueError:
+                continue
+            if isinstance(value, dict):
+                return value
+        raise ProfileParseError(f"Invalid profile JSON: {payload[:200]}")
+
+    def finish(self) -> Optional[Dict]:
+        """
+        End of output: the profile, repairing a truncated payload if needed
+
+        Returns None when the output never contained the sentinel.
+
+        Raises:
+            ProfileParseError: The payload is missing or could not be repaired
+        """
+        if self.profile is not None or not self.detected:
+            return self.profile
+        if self.error is not None:
+            raise ProfileParseError(self.error)
+        if not self._started:
+            raise ProfileParseError("No JSON object after ATHLETE_PROFILE:::")
+        if len(self._stack) > MAX_REPAIR_DEPTH:
+            raise ProfileParseError(f"Profile payload truncated {len(self._stack)} levels deep")
+
+        payload = ''.join(self._payload)
+        if self._in_string:
+            payload = payload[:self._string_start]
+        else:
+            payload = _PARTIAL_SCALAR.sub('', payload.rstrip().removesuffix('```').rstrip())
+
+        # A key without a value (or a trailing comma) is dropped rather than guessed at
+        payload = _DANGLING_MEMBER.sub('', payload.rstrip())
+        closers = ''.join(_CLOSERS[opener] for opener in reversed(self._stack))
+        try:
+            self.profile = self._load(payload + closers)
+        except ProfileParseError:
+            raise ProfileParseError(f"Could not repair profile JSON: {payload[:200]}")
+        print(f"⚠️  AthleteProfileStreamParser: Repaired truncated profile payload ({len(self._stack)} levels open)")
+        return self.profile
+
+
+def parse_athlete_profile(text: str) -> Optional[Dict]:
+    """Profile from a complete response text (None when it has no ATHLETE_PROFILE::: sentinel)"""
+    parser = AthleteProfileStreamParser()
+    parser.feed(text)
+    return parser.finish()
+
+
+def _strict_schema(node: Any) -> Any:
+    """Make a pydantic JSON schema acceptable to strict structured outputs (in place)"""
+    if isinstance(node, dict):
+        # Strict mode has no defaults or optional keys: every property is required, and
+        # optional fields are already nullable through anyOf [..., null]
+        node.pop('default', None)
+        node.pop('title', None)
+        if node.get('type') == 'object' and 'properties' in node:
+            node['required'] = list(node['properties'])
+            node['additionalProperties'] = False
+        for key, value in node.items():
+            if key in ('properties', '$defs'):
+                # Maps of names to schemas; the names themselves aren't keywords
+                for schema in value.values():
+                    _strict_schema(schema)
+            else:
+                _strict_schema(value)
+    elif isinstance(node, list):
+        for value in node:
+            _strict_schema(value)
+    return node
+
+
+@lru_cache(maxsize=None)
+def profile_response_format(model: Type) -> Dict:
+    """Responses API text.format for a strict JSON schema of a pydantic profile model (built once)"""
+    return {
+        "type": "json_schema",
+        "name": model.__name__,
+        "schema": _strict_schema(copy.deepcopy(model.model_json_schema())),
+        "strict": True
+    }
+
+
+@lru_cache(maxsize=None)
+def _profile_adapter(model: Type):
+    # pydantic compiles the validator once per model; reused for every profile
+    return TypeAdapter(model)
+
+
+def validate_profile(model: Type, data: Any) -> Dict:
+    """
+    Validate profile JSON (a string or parsed dict) against a pydantic model
+
+    Returns the profile as a dict without null fields, the shape the model
+    emits after ATHLETE_PROFILE:::.
+
+    Raises:
+        ProfileParseError: The data does not match the model
+    """
+    adapter = _profile_adapter(model)
+    try:
+        if isinstance(data, (str, bytes)):
+            profile = adapter.validate_json(data)
+        else:
+            profile = adapter.validate_python(data)
+    except ValueError as e:
+        raise ProfileParseError(f"Profile does not match {model.__name__}: {e}")
+    return profile.model_dump(exclude_none=True)
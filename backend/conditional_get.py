@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Conditional GET support for Hybrid House read endpoints
+Weak ETags / Last-Modified from (id, updated_at) probes, answering 304 before building the body
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Supabase timestamp (ISO 8601, with or without offset) as UTC"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class ConditionalRequest:
+    """
+    FastAPI dependency for If-None-Match / If-Modified-Since handling.
+
+    Usage:
+        probe = supabase.table(...).select('id, updated_at')...execute()
+        not_modified = conditional.evaluate('athlete-profile', probe.data)
+        if not_modified:
+            return not_modified
+        ... build and return the full body (validators are already set on the response)
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+
+    def evaluate(self, namespace: str, rows: Iterable[Dict], cache_control: str = 'private, no-cache',
+                 extra: str = '') -> Optional[Response]:
+        """
+        Compute validators for the given (id, updated_at) rows and check the request against them
+
+        Args:
+            namespace: Distinguishes endpoints whose rows could otherwise collide
+            rows: Probe rows with 'id' (or 'user_id') and 'updated_at'; a list endpoint
+                passes all of its rows so inserts and deletes change the ETag
+            cache_control: Cache-Control sent with both 200 and 304 responses
+            extra: Additional input for the ETag (e.g. today's date when the body has a computed age)
+
+        Returns:
+            A 304 Response if the client's copy is current, else None (validators are
+            set on the injected response so the endpoint's 200 carries them)
+        """
+        rows = list(rows)
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(f"{namespace}|{extra}".encode('utf-8'))
+        last_modified = None
+        for row in rows:
+            row_id = row.get('id') or row.get('user_id')
+            updated_at = row.get('updated_at')
+            digest.update(f"|{row_id}:{updated_at}".encode('utf-8'))
+            parsed = _parse_timestamp(updated_at)
+            if parsed and (last_modified is None or parsed > last_modified):
+                last_modified = parsed
+
+        headers = {
+            'ETag': f'W/"{digest.hexdigest()}"',
+            'Cache-Control': cache_control
+        }
+        if last_modified:
+            headers['Last-Modified'] = format_datetime(last_modified, usegmt=True)
+
+        for name, value in headers.items():
+            self.response.headers[name] = value
+
+        if self._is_not_modified(headers['ETag'], last_modified):
+            return Response(status_code=304, headers=headers)
+        return None
+
+    def _is_not_modified(self, etag: str, last_modified: Optional[datetime]) -> bool:
+        if_none_match = self.request.headers.get('if-none-match')
+        if if_none_match:
+            # Weak comparison: W/ prefixes are ignored
+            opaque = etag[2:] if etag.startswith('W/') else etag
+            for candidate in if_none_match.split(','):
+                candidate = candidate.strip()
+                if candidate == '*' or (candidate[2:] if candidate.startswith('W/') else candidate) == opaque:
+                    return True
+            # If-Modified-Since is ignored when If-None-Match is present
+            return False
+
+        if_modified_since = self.request.headers.get('if-modified-since')
+        if if_modified_since and last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            # HTTP dates have whole-second precision
+            return last_modified.replace(microsecond=0) <= since
+        return False
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Interview Field Extractor for Hybrid House
+Deterministic parsing of hybrid interview answers into athlete profile fields
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+def safe_int(value):
+    """Safely convert to integer"""
+    if not value:
+        return None
+    try:
+        return int(float(str(value)))
+    except (ValueError, TypeError):
+        return None
+
+
+def safe_decimal(value):
+    """Safely convert to decimal"""
+    if not value:
+        return None
+    try:
+        return float(str(value))
+    except (ValueError, TypeError):
+        return None
+
+
+def convert_time_to_seconds(time_str):
+    """Convert time string like '7:43' to seconds"""
+    if not time_str:
+        return None
+    try:
+        if ':' in str(time_str):
+            parts = str(time_str).split(':')
+            if len(parts) == 2:
+                minutes = int(parts[0])
+                seconds = int(parts[1])
+                return minutes * 60 + seconds
+        return safe_int(time_str)
+    except (ValueError, TypeError):
+        return None
+
+
+def extract_weight_from_object(obj):
+    """Extract weight from object format like {weight_lb: 225, reps: 5, sets: 3}"""
+    if not obj:
+        return None
+    if isinstance(obj, dict):
+        return safe_decimal(obj.get('weight_lb') or obj.get('weight'))
+    return safe_decimal(obj)
+
+
+KG_TO_LB = 2.20462
+KM_TO_MILES = 0.621371
+
+# Essential hybrid interview fields, in the order the coach asks for them
+HYBRID_FIELDS = [
+    'first_name', 'sex', 'weight_lb', 'vo2max', 'hrv_ms', 'resting_hr_bpm',
+    'pb_mile', 'weekly_miles', 'long_run', 'pb_bench_1rm', 'pb_squat_1rm', 'pb_deadlift_1rm'
+]
+
+# Fields that must have a value (not just an explicit skip) for a local completion
+REQUIRED_VALUES = ['first_name']
+
+# Question asked for each field when the next turn is answered locally
+HYBRID_QUESTIONS = {
+    'first_name': "First, what's your first name?",
+    'sex': "How do you identify—male or female?",
+    'weight_lb': "Current body-weight (lb or kg)?",
+    'vo2max': "Do you know your VO₂-max? If yes, share the number; if not, type skip.",
+    'hrv_ms': "If you track health stats, drop HRV (ms) and Resting HR (bpm); otherwise skip.",
+    'resting_hr_bpm': "What's your resting heart rate (bpm)? Type skip if you don't track it.",
+    'pb_mile': "Fastest one-mile time (mm:ss)?",
+    'weekly_miles': "How many running miles per week do you average?",
+    'long_run': "Longest recent run—distance in miles?",
+    'pb_bench_1rm': "Your best bench press: 1-RM or weight×reps?",
+    'pb_squat_1rm': "Best squat: 1-RM or weight×reps?",
+    'pb_deadlift_1rm': "Best deadlift: 1-RM or weight×reps?"
+}
+
+# Which field(s) an assistant question asks for; first match wins, so specific patterns come first
+QUESTION_PATTERNS: List[Tuple[re.Pattern, Tuple[str, ...]]] = [
+    (re.compile(r'\bhrv\b', re.I), ('hrv_ms', 'resting_hr_bpm')),
+    (re.compile(r'resting\s*(hr|heart)|\brhr\b', re.I), ('resting_hr_bpm',)),
+    (re.compile(r'vo\s*[₂2]|vo2', re.I), ('vo2max',)),
+    (re.compile(r'bench', re.I), ('pb_bench_1rm',)),
+    (re.compile(r'squat', re.I), ('pb_squat_1rm',)),
+    (re.compile(r'deadlift', re.I), ('pb_deadlift_1rm',)),
+    (re.compile(r'longest|long run', re.I), ('long_run',)),
+    (re.compile(r'per week|weekly|a week', re.I), ('weekly_miles',)),
+    (re.compile(r'mile', re.I), ('pb_mile',)),
+    (re.compile(r'body[\s\-‑]*weight|\bweigh', re.I), ('weight_lb',)),
+    (re.compile(r'\bmale\b|\bfemale\b|identify|\bsex\b|gender', re.I), ('sex',)),
+    (re.compile(r'first name|your name|call you', re.I), ('first_name',)),
+]
+
+# "Ready for the next piece? (yes/skip)" style turns that carry no data
+CONFIRMATION_PATTERN = re.compile(r'ready for the next|\(yes\s*/\s*skip\)|shall we (keep going|continue)', re.I)
+AFFIRMATIVE_PATTERN = re.compile(r"^\s*(y|yes|yep|yeah|yup|sure|ok|okay|ready|let'?s go|go|next|continue)\b[\s!.]*$", re.I)
+SKIP_PHRASES = r"(skip|no|nope|n/?a|none|idk|not sure|no idea|i don'?t know|don'?t know|dunno)"
+SKIP_PATTERN = re.compile(r"^\s*" + SKIP_PHRASES + r"\b", re.I)
+# The whole answer is a skip ("skip", "nope.", "skip it")
+SKIP_ONLY_PATTERN = re.compile(r"^\s*" + SKIP_PHRASES + r"(\s+(it|that|this|thanks))?[\s!.,]*$", re.I)
+
+# Words that are never a first name ("yes", "ok", a bare greeting)
+NAME_STOP_WORDS = {
+    'y', 'yes', 'yeah', 'yep', 'yup', 'sure', 'ok', 'okay', 'ready', 'go', 'next', 'continue',
+    'no', 'nope', 'skip', 'hi', 'hey', 'hello', 'thanks', 'thank', 'you', 'please', 'my', 'name', 'is'
+}
+
+NUMBER = r'(\d+(?:\.\d+)?)'
+_number = re.compile(NUMBER)
+_mile_time = re.compile(r'(\d{1,2})\s*[:.]\s*(\d{2})\b')
+_mile_words = re.compile(r'(\d{1,2})\s*(?:min(?:utes?)?|m)\s*(?:and\s*)?(\d{1,2})\s*(?:sec(?:onds?)?|s)\b', re.I)
+_kg = re.compile(r'\bkgs?\b|kilo', re.I)
+_km = re.compile(r'\bkm\b|kilomet', re.I)
+_reps = re.compile(NUMBER + r'\s*(?:lbs?|pounds?|kgs?|kilos?)?\s*(?:x|×|\*|for)\s*(\d+)\s*(?:reps?)?', re.I)
+_labeled_hrv = re.compile(r'hrv\D{0,12}?' + NUMBER, re.I)
+_labeled_rhr = re.compile(r'(?:rhr|resting(?:\s*(?:hr|heart\s*rate))?)\D{0,12}?' + NUMBER, re.I)
+_name_prefix = re.compile(r"^\s*(?:hi|hey|hello|yes|yeah|sure|ok|okay)?[\s,!]*(?:i'?m|i am|my name is|my name's|call me|it'?s|name:)\s+", re.I)
+
+
+def _to_lb(value: float, text: str) -> float:
+    return round(value * KG_TO_LB, 1) if _kg.search(text) else value
+
+
+def _to_miles(value: float, text: str) -> float:
+    return round(value * KM_TO_MILES, 1) if _km.search(text) else value
+
+
+def parse_name(text: str) -> Optional[Dict]:
+    words = [w for w in re.split(r'\s+', _name_prefix.sub('', text).strip(' .!,')) if w]
+    words = [w for w in words if re.match(r"^[^\W\d_][\w'\-]*$", w) and w.lower() not in NAME_STOP_WORDS]
+    if not words or len(words) > 4:
+        return None
+    parsed = {'first_name': words[0].capitalize()}
+    if len(words) > 1:
+        parsed['last_name'] = ' '.join(w.capitalize() for w in words[1:])
+    return parsed
+
+
+def parse_sex(text: str) -> Optional[Dict]:
+    lowered = text.lower()
+    if re.search(r'\bfemale\b|\bwoman\b|^\s*f\s*$', lowered):
+        return {'sex': 'Female'}
+    if re.search(r'\bmale\b|\bman\b|^\s*m\s*$', lowered):
+        return {'sex': 'Male'}
+    if 'prefer not' in lowered:
+        return {'sex': None}
+    return None
+
+
+def parse_body_weight(text: str) -> Optional[Dict]:
+    match = _number.search(text)
+    if not match:
+        return None
+    return {'weight_lb': _to_lb(float(match.group(1)), text)}
+
+
+def parse_vo2max(text: str) -> Optional[Dict]:
+    match = _number.search(text)
+    return {'vo2max': safe_decimal(match.group(1))} if match else None
+
+
+def parse_hrv_and_resting_hr(text: str) -> Optional[Dict]:
+    parsed = {}
+    hrv = _labeled_hrv.search(text)
+    rhr = _labeled_rhr.search(text)
+    if hrv:
+        parsed['hrv_ms'] = safe_int(hrv.group(1))
+    if rhr:
+        parsed['resting_hr_bpm'] = safe_int(rhr.group(1))
+    if not parsed:
+        # Unlabeled numbers follow the question's order: HRV, then resting HR
+        numbers = _number.findall(text)
+        if len(numbers) >= 2:
+            parsed = {'hrv_ms': safe_int(numbers[0]), 'resting_hr_bpm': safe_int(numbers[1])}
+    return parsed or None
+
+
+def parse_resting_hr(text: str) -> Optional[Dict]:
+    """Answer to the resting-HR-only question: a labeled value or a lone number"""
+    match = _labeled_rhr.search(text) or _number.search(text)
+    return {'resting_hr_bpm': safe_int(match.group(1))} if match else None
+
+
+def parse_mile_time(text: str) -> Optional[Dict]:
+    match = _mile_time.search(text) or _mile_words.search(text)
+    if not match:
+        return None
+    minutes, seconds = int(match.group(1)), int(match.group(2))
+    if seconds >= 60:
+        return None
+    return {'pb_mile': f"{minutes}:{seconds:02d}"}
+
+
+def parse_distance(field: str):
+    def parse(text: str) -> Optional[Dict]:
+        match = _number.search(text)
+        return {field: _to_miles(float(match.group(1)), text)} if match else None
+    return parse
+
+
+def parse_lift(field: str):
+    def parse(text: str) -> Optional[Dict]:
+        reps = _reps.search(text)
+        if reps:
+            weight = _to_lb(float(reps.group(1)), text)
+            count = int(reps.group(2))
+            return {field: weight if count <= 1 else {'weight_lb': weight, 'reps': count}}
+        match = _number.search(text)
+        return {field: _to_lb(float(match.group(1)), text)} if match else None
+    return parse
+
+
+FIELD_PARSERS = {
+    'first_name': parse_name,
+    'sex': parse_sex,
+    'weight_lb': parse_body_weight,
+    'vo2max': parse_vo2max,
+    'hrv_ms': parse_hrv_and_resting_hr,
+    'resting_hr_bpm': parse_resting_hr,
+    'pb_mile': parse_mile_time,
+    'weekly_miles': parse_distance('weekly_miles'),
+    'long_run': parse_distance('long_run'),
+    'pb_bench_1rm': parse_lift('pb_bench_1rm'),
+    'pb_squat_1rm': parse_lift('pb_squat_1rm'),
+    'pb_deadlift_1rm': parse_lift('pb_deadlift_1rm'),
+}
+
+
+_questions = re.compile(r'[^.!?\n]*\?')
+
+
+def asked_question(message: str) -> str:
+    """The question an assistant message ends on (recaps before it mention other fields)"""
+    questions = _questions.findall(message or '')
+    return questions[-1] if questions else (message or '')[-200:]
+
+
+def is_confirmation(message: str) -> bool:
+    """Whether an assistant message only asks to continue"""
+    return bool(CONFIRMATION_PATTERN.search(asked_question(message)))
+
+
+def question_fields(message: str) -> Tuple[str, ...]:
+    """Fields an assistant message asks for (empty for confirmations and non-catalog turns)"""
+    question = asked_question(message)
+    if CONFIRMATION_PATTERN.search(question):
+        return ()
+    for pattern, fields in QUESTION_PATTERNS:
+        if pattern.search(question):
+            return fields
+    return ()
+
+
+def is_skip(answer: str) -> bool:
+    """
+    Whether an answer skips the question
+
+    Only when the whole answer is a skip phrase, or it starts with one and has
+    no number in it: "no idea honestly, probably 405" is an answer.
+    """
+    if SKIP_ONLY_PATTERN.match(answer):
+        return True
+    return bool(SKIP_PATTERN.match(answer)) and not _number.search(answer)
+
+
+class InterviewExtraction:
+    """Fields parsed from a hybrid interview transcript and which of them are settled"""
+
+    def __init__(self):
+        self.values: Dict = {}
+        self.filled: set = set()
+
+    @property
+    def missing(self) -> List[str]:
+        return [field for field in HYBRID_FIELDS if field not in self.filled]
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing and all(self.values.get(field) for field in REQUIRED_VALUES)
+
+    def apply_answer(self, question: str, answer: str):
+        """Parse one user answer against the question it replies to"""
+        fields = question_fields(question)
+        if not fields:
+            return
+        if is_skip(answer or ''):
+            for field in fields:
+                self.values.setdefault(field, None)
+                self.filled.add(field)
+            return
+
+        parsed = FIELD_PARSERS[fields[0]](answer or '')
+        if parsed:
+            self.values.update(parsed)
+            self.filled.update(key for key in parsed if key in HYBRID_FIELDS)
+
+    def to_profile(self) -> Dict:
+        """Profile JSON in the shape the model emits after ATHLETE_PROFILE:::"""
+        values = self.values
+        profile = {
+            'first_name': values.get('first_name'),
+            'last_name': values.get('last_name'),
+            'sex': values.get('sex'),
+            'body_metrics': {
+                'weight_lb': values.get('weight_lb'),
+                'vo2max': values.get('vo2max'),
+                'hrv_ms': values.get('hrv_ms'),
+                'resting_hr_bpm': values.get('resting_hr_bpm')
+            },
+            'pb_mile': values.get('pb_mile'),
+            'weekly_miles': values.get('weekly_miles'),
+            'long_run': values.get('long_run'),
+            'pb_bench_1rm': values.get('pb_bench_1rm'),
+            'pb_squat_1rm': values.get('pb_squat_1rm'),
+            'pb_deadlift_1rm': values.get('pb_deadlift_1rm')
+        }
+        return profile
+
+
+def extract_interview_fields(messages: List[Dict]) -> InterviewExtraction:
+    """Walk a transcript, pairing each user answer with the assistant message before it"""
+    extraction = InterviewExtraction()
+    question = ''
+    for message in messages:
+        role = message.get('role')
+        if role == 'assistant':
+            question = message.get('content') or ''
+        elif role == 'user':
+            extraction.apply_answer(question, message.get('content') or '')
+    return extraction
+
+
+def local_reply(messages: List[Dict]) -> Optional[str]:
+    """
+    Answer a confirmation turn without the model
+
+    When the last assistant message only asked to continue ("Ready for the next
+    piece? (yes/skip)") and the user agreed, the reply is the catalog question
+    for the next missing field. Returns None whenever the model is needed.
+    """
+    if len(messages) < 2 or messages[-1].get('role') != 'user' or messages[-2].get('role') != 'assistant':
+        return None
+    if not is_confirmation(messages[-2].get('content') or ''):
+        return None
+    if not AFFIRMATIVE_PATTERN.match(messages[-1].get('content') or ''):
+        return None
+
+    extraction = extract_interview_fields(messages)
+    missing = extraction.missing
+    if not missing:
+        return None
+    # HRV and resting HR are asked together
+    field = 'hrv_ms' if missing[0] == 'resting_hr_bpm' and 'hrv_ms' in missing else missing[0]
+    return HYBRID_QUESTIONS[field]
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Interview Greeting Cache for Hybrid House
+Opening interview messages generated once per prompt and refreshed in the background
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from .llm_ledger import llm_ledger
+
+# Regenerate each greeting this often; stored responses stay chainable for 30 days
+GREETING_REFRESH_SECONDS = float(os.environ.get('INTERVIEW_GREETING_REFRESH_SECONDS', '3600'))
+
+# Delay before retrying a greeting that failed to generate
+GREETING_RETRY_SECONDS = 30.0
+
+# The input every /start sends to get the opening message
+START_INPUT = [{"role": "user", "content": "start"}]
+
+
+def greeting_key(model: str, prompt: Optional[Dict] = None, instructions: Optional[str] = None) -> str:
+    """Cache key for a greeting: the prompt id, or a hash of the instructions"""
+    if prompt and prompt.get('id'):
+        return f"{model}:prompt:{prompt['id']}"
+    digest = hashlib.sha256((instructions or '').encode('utf-8')).hexdigest()[:16]
+    return f"{model}:instructions:{digest}"
+
+
+def first_output_text(response) -> str:
+    """Text of the first output message only (the interview endpoints ignore later ones)"""
+    if response.output and len(response.output) > 0:
+        first_output = response.output[0]
+        if hasattr(first_output, 'content') and first_output.content:
+            return first_output.content[0].text or ""
+    return ""
+
+
+class GreetingCache:
+    """
+    Opening messages for the interview /start endpoints.
+
+    Every start sends the same "start" input with the same prompt (or
+    instructions), so the greeting is generated once per key and shared: a
+    session starts with the cached text and its stored response id as
+    last_response_id, and the first chat turn chains from that response like
+    it would from a per-session one. Greetings are regenerated from a
+    background task every GREETING_REFRESH_SECONDS. Until a key's first
+    greeting exists, get() returns None and the endpoint uses its static
+    greeting with no response id; the first chat turn then starts the
+    response chain from the full transcript.
+    """
+
+    def __init__(self, client, refresh_interval: float = GREETING_REFRESH_SECONDS):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self._params: Dict[str, Dict[str, Any]] = {}
+        self._greetings: Dict[str, Dict[str, Any]] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def register(self, model: str, prompt: Optional[Dict] = None, instructions: Optional[str] = None,
+                 temperature: float = 0.7) -> str:
+        """Register a greeting's Responses API parameters; returns its cache key"""
+        key = greeting_key(model, prompt, instructions)
+        params: Dict[str, Any] = {"model": model, "temperature": temperature}
+        if prompt:
+            params["prompt"] = prompt
+        if instructions:
+            params["instructions"] = instructions
+        with self._lock:
+            self._params[key] = params
+        return key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached greeting ({text, response_id, generated_at}), or None while it is being generated"""
+        with self._lock:
+            greeting = self._greetings.get(key)
+        if greeting is None:
+            self.request_refresh()
+        return greeting
+
+    def generate(self, key: str) -> Dict[str, Any]:
+        """Generate and cache a greeting now (blocking Responses API call)"""
+        with self._lock:
+            params = self._params[key]
+        try:
+            with llm_ledger.track('interview_greeting', params['model']) as call:
+                response = self.client.responses.create(input=START_INPUT, store=True, **params)
+                call.response(response.id, response.usage)
+            text = first_output_text(response)
+            if not text:
+                raise Exception("No greeting text generated")
+        except Exception:
+            with self._lock:
+                self._failed_at[key] = time.monotonic()
+            raise
+
+        greeting = {"text": text, "response_id": response.id, "generated_at": time.time()}
+        with self._lock:
+            self._greetings[key] = greeting
+            self._failed_at.pop(key, None)
+        return greeting
+
+    def _due(self):
+        """Keys that are missing or older than the refresh interval (and not waiting out a failure)"""
+        now = time.time()
+        mono = time.monotonic()
+        with self._lock:
+            return [
+                key for key in self._params
+                if (key not in self._greetings or now - self._greetings[key]['generated_at'] >= self.refresh_interval)
+                and mono - self._failed_at.get(key, -GREETING_RETRY_SECONDS) >= GREETING_RETRY_SECONDS
+            ]
+
+    def refresh_due(self):
+        """Regenerate every greeting that is due; a failure keeps serving the previous one"""
+        for key in self._due():
+            try:
+                self.generate(key)
+                print(f"✅ GreetingCache: Generated greeting for {key}")
+            except Exception as e:
+                print(f"❌ GreetingCache: Failed to generate greeting for {key}: {e}")
+
+    def request_refresh(self):
+        """Wake the refresh task; safe to call from any thread"""
+        if self._loop and self._wake and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def start(self):
+        """Start the refresh task, which generates the greetings right away (called from the FastAPI startup hook)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._wake.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the refresh task (called from the FastAPI shutdown hook)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=min(self.refresh_interval, GREETING_RETRY_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.refresh_due)
+            except Exception as e:
+                print(f"❌ GreetingCache: Refresh failed: {e}")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Interview Model Routing for Hybrid House
+Sends scripted interview turns to a fast model and keeps the large model for synthesis and ambiguous answers
+"""
+
+import os
+from typing import Dict, List, NamedTuple
+
+from .interview_extractor import (
+    InterviewExtraction, asked_question, is_confirmation, question_fields
+)
+
+# Set INTERVIEW_MODEL_ROUTING=0 to send every turn to the large model
+ROUTING_ENABLED = os.environ.get('INTERVIEW_MODEL_ROUTING', '1').lower() not in ('0', 'false', 'no')
+
+FAST_MODEL = os.environ.get('INTERVIEW_FAST_MODEL', 'gpt-4.1-mini')
+LARGE_MODEL = os.environ.get('INTERVIEW_LARGE_MODEL', 'gpt-4.1')
+
+# User messages that ask the model to wrap up
+FINISH_WORDS = ('done', 'finish', 'force_complete')
+
+
+class RouteDecision(NamedTuple):
+    route: str
+    model: str
+    reason: str
+
+
+def route_turn(messages: List[Dict], extraction: InterviewExtraction) -> RouteDecision:
+    """
+    Pick the model for the turn answering the last user message
+
+    - synthesis (large): every field is settled or the user asks to finish,
+      so the reply is likely the ATHLETE_PROFILE::: JSON
+    - ambiguous (large): the user asked something back, the answer didn't
+      parse against the question asked, or the question isn't a scripted one
+    - scripted (fast): the answer parsed; the reply acknowledges it and asks
+      the next scripted question
+    """
+    if not ROUTING_ENABLED:
+        return RouteDecision('large', LARGE_MODEL, 'routing disabled')
+
+    answer = (messages[-1].get('content') or '').strip() if messages else ''
+    if extraction.complete or answer.lower() in FINISH_WORDS:
+        return RouteDecision('synthesis', LARGE_MODEL, 'all fields settled' if extraction.complete else 'user asked to finish')
+
+    question = next((m.get('content') or '' for m in reversed(messages[:-1]) if m.get('role') == 'assistant'), '')
+    if is_confirmation(question):
+        return RouteDecision('scripted', FAST_MODEL, 'confirmation')
+
+    if '?' in answer:
+        return RouteDecision('ambiguous', LARGE_MODEL, 'user asked a question')
+
+    if not question_fields(question):
+        return RouteDecision('ambiguous', LARGE_MODEL, f"off-script question: {asked_question(question)[:60]}")
+
+    answer_only = InterviewExtraction()
+    answer_only.apply_answer(question, answer)
+    if not answer_only.filled:
+        return RouteDecision('ambiguous', LARGE_MODEL, 'answer did not parse')
+
+    return RouteDecision('scripted', FAST_MODEL, f"parsed {', '.join(sorted(answer_only.filled))}")
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Interview Session Cache for Hybrid House
+In-process LRU of active interview sessions with write-behind message persistence
+to the append-only interview_messages table
+"""
+
+import os
+import time
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Active sessions kept in memory; the least recently used is flushed and evicted beyond this
+SESSION_CACHE_SIZE = int(os.environ.get('INTERVIEW_SESSION_CACHE_SIZE', '1000'))
+
+# A session's pending messages are written once it has been quiet this long
+WRITE_BEHIND_SECONDS = float(os.environ.get('INTERVIEW_WRITE_BEHIND_SECONDS', '30'))
+
+# How often the background task looks for sessions to write
+FLUSH_INTERVAL_SECONDS = float(os.environ.get('INTERVIEW_FLUSH_INTERVAL_SECONDS', '5'))
+
+# Results of turns sent with an Idempotency-Key, kept for replaying retries
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('INTERVIEW_IDEMPOTENCY_CACHE_SIZE', '1000'))
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get('INTERVIEW_IDEMPOTENCY_TTL_SECONDS', '600'))
+
+# Columns needed to continue a conversation (messages live in interview_messages)
+SESSION_COLUMNS = 'id, user_id, status, last_response_id, current_index, version'
+
+
+class SessionVersionConflict(Exception):
+    """The session row was written by another worker since this one read it"""
+
+
+def message_rows(session_id: str, messages: List[Dict], start_seq: int = 0) -> List[Dict]:
+    """interview_messages rows for messages starting at sequence number start_seq"""
+    return [
+        {
+            'session_id': session_id,
+            'seq': start_seq + offset,
+            'role': message.get('role'),
+            'content': message.get('content'),
+            'timestamp': message.get('timestamp')
+        }
+        for offset, message in enumerate(messages)
+    ]
+
+
+def load_session_messages(client, session_id: str) -> Optional[List[Dict]]:
+    """
+    A session's messages from interview_messages, in order
+
+    Returns None when the table has no rows for the session, i.e. a session
+    from before the table existed that hasn't been migrated yet.
+    """
+    result = client.table('interview_messages').select('role, content, timestamp')\
+        .eq('session_id', session_id).order('seq').execute()
+    if not result.data:
+        return None
+    return [dict(row) for row in result.data]
+
+
+def read_session_messages(client, session_id: str) -> Tuple[List[Dict], int]:
+    """
+    Compatibility reader: (messages, count already stored in interview_messages)
+
+    Falls back to the legacy interview_sessions.messages JSONB array for
+    unmigrated sessions; those messages are then appended on the next write.
+    """
+    messages = load_session_messages(client, session_id)
+    if messages is not None:
+        return messages, len(messages)
+    legacy = client.table('interview_sessions').select('messages').eq('id', session_id).execute()
+    return list((legacy.data[0].get('messages') if legacy.data else None) or []), 0
+
+
+class InterviewSessionStore:
+    """
+    Active interview sessions served from memory.
+
+    Chat turns read the session from the LRU (only a miss reads the database)
+    and record their messages in memory. Dirty sessions are written once
+    they've been idle for WRITE_BEHIND_SECONDS, and immediately on completion,
+    eviction and shutdown: the messages not yet stored are appended to
+    interview_messages and the session row gets a small metadata update, so
+    write volume is proportional to new messages, never to conversation
+    length. Sessions are only returned to their owner.
+
+    Turns on one session are serialized with turn_lock(), and turns sent with
+    an Idempotency-Key have their result kept so a retry is answered without
+    running the turn again. Row writes are guarded by the row's version
+    column. A turn that advances the response chain commits its
+    last_response_id before the reply is returned, so a turn racing one on
+    another worker fails with SessionVersionConflict instead of forking the
+    chain. On a conflict, at commit or at write-behind, the cached copy is
+    dropped and its unwritten messages are appended after the other worker's,
+    so they are never lost. Sticky routing is still assumed for reads; other
+    workers would read the row without the pending messages.
+    """
+
+    def __init__(self, client, max_size: int = SESSION_CACHE_SIZE):
+        self.supabase = client
+        self.max_size = max_size
+        self._sessions: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._dirty: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Serializes row writes so an older background write never lands after a newer one
+        self._write_lock = threading.Lock()
+        self._turn_locks: 'weakref.WeakValueDictionary[str, asyncio.Lock]' = weakref.WeakValueDictionary()
+        self._turn_results: 'OrderedDict[Tuple[str, str, str], Tuple[float, Any]]' = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    def _put(self, session: Dict) -> List[Dict]:
+        """Cache a session (caller holds the lock); returns evicted sessions that still need writing"""
+        self._sessions[session['id']] = session
+        self._sessions.move_to_end(session['id'])
+        evicted = []
+        while len(self._sessions) > self.max_size:
+            session_id, old_session = self._sessions.popitem(last=False)
+            if self._dirty.pop(session_id, None) is not None:
+                evicted.append(old_session)
+        return evicted
+
+    def create(self, session_row: Dict) -> Dict:
+        """Cache a newly inserted session row"""
+        session = {
+            'id': session_row['id'],
+            'user_id': session_row['user_id'],
+            'status': session_row.get('status', 'active'),
+            'messages': list(session_row.get('messages') or []),
+            'persisted_count': 0,
+            'last_response_id': session_row.get('last_response_id'),
+            'current_index': session_row.get('current_index') or 0,
+            'version': session_row.get('version') or 0
+        }
+        with self._lock:
+            evicted = self._put(session)
+        self._write_evicted(evicted)
+        return session
+
+    def get(self, session_id: str, user_id: str) -> Optional[Dict]:
+        """
+        Session for its owner, from memory when cached
+
+        Returns None when the session doesn't exist or belongs to another user.
+        Callers must treat the returned dict as read-only and go through
+        record_turn() to change it.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                return session if session['user_id'] == user_id else None
+
+        return self._load(session_id, user_id)
+
+    def _load(self, session_id: str, user_id: Optional[str] = None) -> Optional[Dict]:
+        """Read a session row and its messages into the cache (only the owner's, when user_id is given)"""
+        query = self.supabase.table('interview_sessions').select(SESSION_COLUMNS).eq('id', session_id)
+        if user_id is not None:
+            query = query.eq('user_id', user_id)
+        result = query.execute()
+        if not result.data:
+            return None
+
+        messages, persisted_count = read_session_messages(self.supabase, session_id)
+
+        with self._lock:
+            # A concurrent turn may have cached (and changed) it meanwhile
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = dict(result.data[0])
+                session['messages'] = messages
+                session['persisted_count'] = persisted_count
+                evicted = self._put(session)
+            else:
+                evicted = []
+        self._write_evicted(evicted)
+        return session
+
+    def turn_lock(self, session_id: str) -> asyncio.Lock:
+        """Lock serializing a session's chat turns (hold a reference while using it)"""
+        with self._lock:
+            lock = self._turn_locks.get(session_id)
+            if lock is None:
+                lock = asyncio.Lock()
+                self._turn_locks[session_id] = lock
+            return lock
+
+    def turn_result(self, user_id: str, session_id: str, idempotency_key: str) -> Optional[Any]:
+        """The result of an earlier turn sent with this Idempotency-Key, if still kept"""
+        key = (user_id, session_id, idempotency_key)
+        with self._lock:
+            entry = self._turn_results.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > IDEMPOTENCY_TTL_SECONDS:
+                del self._turn_results[key]
+                return None
+            return entry[1]
+
+    def remember_turn(self, user_id: str, session_id: str, idempotency_key: str, result: Any):
+        """Keep a turn's result for retries with the same Idempotency-Key"""
+        with self._lock:
+            self._turn_results[(user_id, session_id, idempotency_key)] = (time.monotonic(), result)
+            while len(self._turn_results) > IDEMPOTENCY_CACHE_SIZE:
+                self._turn_results.popitem(last=False)
+
+    def record_turn(self, session_id: str, new_messages: List[Dict], last_response_id: Optional[str] = None,
+                    previous_response_id: Optional[str] = None):
+        """
+        Record a finished turn
+
+        The messages are kept in memory and written behind. A turn that
+        advanced the response chain (last_response_id given) first commits it
+        to the session row under the version check. A session that left the
+        cache while the turn ran (evicted, discarded, or dropped after a
+        version conflict) is reloaded from its row first, so the turn isn't lost.
+
+        Args:
+            previous_response_id: The session's last_response_id when the turn
+                started; a chain that has moved on since is a conflict
+
+        Raises:
+            SessionVersionConflict: Another worker advanced the session since
+                this one read it; the turn's messages are appended after the
+                other worker's, but the response chain stays theirs
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+
+        if session is None:
+            print(f"⚠️  InterviewSessionStore: Session {session_id} left the cache during a turn, reloading it")
+            session = self._load(session_id)
+            if session is None:
+                print(f"❌ InterviewSessionStore: Session {session_id} no longer exists, turn not recorded")
+                return
+
+        if last_response_id:
+            self._commit_response_chain(session, new_messages, last_response_id, previous_response_id)
+
+        with self._lock:
+            self._append_turn(session, new_messages, last_response_id)
+            evicted = self._sessions.get(session_id) is not session
+            if evicted:
+                self._dirty.pop(session_id, None)
+        if evicted:
+            # Pushed out again before the turn was added; write it through
+            self._write_evicted([session])
+
+    def _commit_response_chain(self, session: Dict, new_messages: List[Dict], last_response_id: str,
+                               previous_response_id: Optional[str]):
+        """Write a turn's last_response_id to the row if nobody else has written it since it was read"""
+        with self._write_lock:
+            with self._lock:
+                version = session.get('version') or 0
+                current_index = len([m for m in session['messages'] + new_messages if m.get('role') == 'user'])
+                chain_moved = session.get('last_response_id') != previous_response_id
+            if chain_moved:
+                # Reloaded after another worker's turn: the row is newer than what this turn read
+                self._resolve_conflict(session, new_messages)
+                raise SessionVersionConflict(
+                    f"Session {session['id']} moved past {previous_response_id}; kept the turn's messages, not its response chain")
+            result = self.supabase.table('interview_sessions').update({
+                "last_response_id": last_response_id,
+                "current_index": current_index,
+                "version": version + 1,
+                "updated_at": datetime.utcnow().isoformat()
+            }).eq('id', session['id']).eq('version', version).execute()
+            if result.data:
+                with self._lock:
+                    session['version'] = version + 1
+                return
+            self._resolve_conflict(session, new_messages)
+        raise SessionVersionConflict(
+            f"Session {session['id']} changed since version {version}; kept the turn's messages, not its response chain")
+
+    def _resolve_conflict(self, session: Dict, extra_messages: List[Dict] = ()):
+        """
+        Drop a session another worker has moved on and append its unwritten
+        messages (plus extra_messages) after the ones already stored (caller holds _write_lock)
+        """
+        with self._lock:
+            if self._sessions.get(session['id']) is session:
+                del self._sessions[session['id']]
+            self._dirty.pop(session['id'], None)
+            unwritten = session['messages'][session.get('persisted_count') or 0:] + list(extra_messages)
+        if not unwritten:
+            return
+        stored, stored_count = read_session_messages(self.supabase, session['id'])
+        # Unmigrated sessions move their legacy messages over first, so none are hidden
+        self.supabase.table('interview_messages').insert(
+            message_rows(session['id'], stored[stored_count:] + unwritten, stored_count)
+        ).execute()
+
+    def _append_turn(self, session: Dict, new_messages: List[Dict], last_response_id: Optional[str]):
+        """Add a turn to a cached session and mark it dirty (caller holds the lock)"""
+        # Replace rather than mutate so readers holding the old list are unaffected
+        session['messages'] = session['messages'] + new_messages
+        session['current_index'] = len([m for m in session['messages'] if m.get('role') == 'user'])
+        if last_response_id:
+            session['last_response_id'] = last_response_id
+        self._dirty[session['id']] = time.monotonic()
+
+    def discard_user_sessions(self, user_id: str, status: str = 'active'):
+        """Forget a user's cached sessions in a status (their rows are being deleted)"""
+        with self._lock:
+            for session_id in [sid for sid, s in self._sessions.items()
+                               if s['user_id'] == user_id and s.get('status') == status]:
+                del self._sessions[session_id]
+                self._dirty.pop(session_id, None)
+
+    def discard_sessions(self, session_ids: List[str]):
+        """Forget sessions whose rows were deleted (e.g. expired by the sweeper)"""
+        with self._lock:
+            for session_id in session_ids:
+                self._sessions.pop(session_id, None)
+                self._dirty.pop(session_id, None)
+
+    def finish(self, session_id: str, status: str):
+        """Write the session's messages together with its final status and drop it from the cache"""
+        with self._write_lock:
+            with self._lock:
+                session = self._sessions.pop(session_id, None)
+                self._dirty.pop(session_id, None)
+                pending = self._pending_write(session) if session is not None else None
+
+            if pending:
+                try:
+                    self._write_session(*pending, status=status)
+                except SessionVersionConflict as e:
+                    # Another worker has moved the session on; its status is theirs to set
+                    print(f"⚠️  InterviewSessionStore: Not marking session {status}: {e}")
+            else:
+                self.supabase.table('interview_sessions').update({
+                    "status": status,
+                    "updated_at": datetime.utcnow().isoformat()
+                }).eq('id', session_id).execute()
+
+    def flush(self, session_id: Optional[str] = None, idle_for: float = 0.0):
+        """
+        Write dirty sessions now
+
+        Args:
+            session_id: Only this session (e.g. before a read that bypasses the cache)
+            idle_for: Only sessions whose last turn is at least this many seconds old
+        """
+        with self._write_lock:
+            now = time.monotonic()
+            with self._lock:
+                if session_id is not None:
+                    due = [session_id] if session_id in self._dirty else []
+                else:
+                    due = [sid for sid, dirtied_at in self._dirty.items() if now - dirtied_at >= idle_for]
+                pending = []
+                for sid in due:
+                    self._dirty.pop(sid, None)
+                    session = self._sessions.get(sid)
+                    if session is not None:
+                        pending.append(self._pending_write(session))
+
+            for write in pending:
+                sid = write[0]['id']
+                try:
+                    self._write_session(*write)
+                except SessionVersionConflict as e:
+                    print(f"⚠️  InterviewSessionStore: {e}")
+                except Exception as e:
+                    print(f"❌ InterviewSessionStore: Failed to write session {sid}, will retry: {e}")
+                    with self._lock:
+                        if sid in self._sessions:
+                            self._dirty.setdefault(sid, now)
+
+    def _pending_write(self, session: Dict) -> Tuple[Dict, int, List[Dict], Dict]:
+        """Snapshot what a write needs (caller holds the lock): session, first new seq, new messages, row fields"""
+        start_seq = session.get('persisted_count') or 0
+        fields = {
+            "current_index": session.get('current_index') or 0,
+            "last_response_id": session.get('last_response_id')
+        }
+        return session, start_seq, session['messages'][start_seq:], fields
+
+    def _write_session(self, session: Dict, start_seq: int, new_messages: List[Dict], fields: Dict,
+                       status: Optional[str] = None):
+        """
+        Update the session row's metadata and append new messages to interview_messages
+
+        Raises:
+            SessionVersionConflict: Another worker wrote the row first; the
+                session is dropped from the cache and its unwritten messages
+                are appended after the other worker's
+        """
+        version = session.get('version') or 0
+        update = {**fields, "version": version + 1, "updated_at": datetime.utcnow().isoformat()}
+        if status:
+            update["status"] = status
+        result = self.supabase.table('interview_sessions').update(update)\
+            .eq('id', session['id']).eq('version', version).execute()
+        if not result.data:
+            self._resolve_conflict(session)
+            raise SessionVersionConflict(
+                f"Session {session['id']} changed since version {version}; dropped the cached copy")
+        with self._lock:
+            session['version'] = version + 1
+
+        if new_messages:
+            # Idempotent on (session_id, seq), so a retried write never duplicates messages
+            self.supabase.table('interview_messages').upsert(
+                message_rows(session['id'], new_messages, start_seq),
+                on_conflict='session_id,seq',
+                ignore_duplicates=True
+            ).execute()
+            with self._lock:
+                session['persisted_count'] = max(session.get('persisted_count') or 0, start_seq + len(new_messages))
+
+    def _write_evicted(self, sessions: List[Dict]):
+        for session in sessions:
+            try:
+                with self._write_lock:
+                    with self._lock:
+                        pending = self._pending_write(session)
+                    self._write_session(*pending)
+            except Exception as e:
+                print(f"❌ InterviewSessionStore: Failed to write evicted session {session['id']}: {e}")
+
+    async def start(self):
+        """Start the write-behind task (called from the FastAPI startup hook)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the write-behind task and write everything pending (called from the FastAPI shutdown hook)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(self.flush, None, WRITE_BEHIND_SECONDS)
+            except Exception as e:
+                print(f"❌ InterviewSessionStore: Write-behind failed: {e}")
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Cache Invalidation Bus for Hybrid House
+Fans out change events from local writes and Postgres NOTIFY to cache subscribers
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from .ranking_service import ranking_service
+
+# Postgres connection string for LISTEN/NOTIFY (e.g. Supabase's direct DB URL); unset = local events only
+INVALIDATION_DATABASE_URL = os.environ.get('INVALIDATION_DATABASE_URL')
+
+# Channel used by the triggers in add_invalidation_triggers.sql
+INVALIDATION_CHANNEL = 'hybrid_house_invalidation'
+
+# How long a local write is remembered while its trigger notification is in flight
+LOCAL_ECHO_TTL_SECONDS = 60.0
+
+
+def write_token(updated_at) -> Optional[str]:
+    """
+    Normalize a row's updated_at so the value PostgREST returned for a write and
+    the one the trigger sent in its NOTIFY payload compare equal
+    """
+    if not updated_at:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(updated_at).replace('Z', '+00:00'))
+    except ValueError:
+        return str(updated_at)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def make_event(table: str, action: str, user_id: Optional[str] = None,
+               profile_id: Optional[str] = None, source: str = 'local',
+               updated_at: Optional[str] = None) -> Dict:
+    """Build an invalidation event"""
+    return {
+        'table': table,            # 'athlete_profiles' or 'user_profiles'
+        'action': action,          # 'insert', 'update' or 'delete'
+        'user_id': user_id,
+        'profile_id': profile_id,
+        'source': source,          # 'local' or 'postgres'
+        'token': write_token(updated_at),  # the written row's updated_at, identifies the write
+        'timestamp': time.time()
+    }
+
+
+class InvalidationBus:
+    """
+    In-process publish/subscribe for data-change events.
+
+    Endpoints publish after a successful write; the optional Postgres listener
+    publishes changes made out-of-band (n8n, SQL editor). publish() only queues
+    the event: subscribers may block (Supabase reads, snapshot rebuilds, mmap
+    publishes), so once start() has run they are called from a worker thread by
+    a background task, one event at a time, off the request path. Events for the
+    same row queued before delivery are coalesced into the latest one. A failing
+    subscriber never affects the others or the writer.
+
+    A local write's trigger notification is dropped as an echo only when it
+    carries the same write token (the row's updated_at) the endpoint published;
+    any other notification for the row, however soon after, is delivered.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Callable[[Dict], None]] = []
+        # (table, row id, action, token) of local writes whose notification is still expected
+        self._local_writes: Dict[tuple, float] = {}
+        self._pending: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+        # Held while delivering, so a shutdown flush never overlaps a cancelled task's delivery
+        self._delivery_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """Register a callback invoked with every event"""
+        self._subscribers.append(callback)
+
+    def publish(self, event: Dict):
+        """Queue an event for the subscribers; safe to call from any thread"""
+        key = (event['table'], event.get('profile_id') or event.get('user_id'))
+        now = time.monotonic()
+
+        with self._lock:
+            if event.get('token'):
+                write = key + (event['action'], event['token'])
+                if event['source'] == 'local':
+                    self._local_writes[write] = now
+                elif self._local_writes.pop(write, None) is not None:
+                    # Trigger echo of a write this process already published
+                    return
+
+            # Forget writes whose notification never came (no trigger fired) so the dict stays small
+            if len(self._local_writes) > 1000:
+                self._local_writes = {k: t for k, t in self._local_writes.items() if now - t < LOCAL_ECHO_TTL_SECONDS}
+
+            if self._task is None or self._loop is None or self._loop.is_closed():
+                started = False
+            else:
+                started = True
+                self._pending.pop(key, None)
+                self._pending[key] = event
+
+        if started:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        else:
+            # Not started (scripts, tests): deliver inline
+            self._deliver(event)
+
+    def _deliver(self, event: Dict):
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"❌ InvalidationBus: Subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def deliver_pending(self):
+        """Deliver every queued event (blocking; run from a worker thread)"""
+        with self._delivery_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for event in pending.values():
+                self._deliver(event)
+
+    async def start(self):
+        """Start delivering events from a background task (called from the FastAPI startup hook)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the delivery task and deliver what is still queued (called from the FastAPI shutdown hook)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.deliver_pending)
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.deliver_pending)
+            except Exception as e:
+                print(f"❌ InvalidationBus: Delivery failed: {e}")
+
+    def publish_athlete_profile_change(self, action: str, user_id: Optional[str], profile_id: str,
+                                       updated_at: Optional[str] = None):
+        """
+        Publish a local athlete_profiles write (score, privacy, delete)
+
+        Args:
+            updated_at: updated_at of the row the write returned (for a delete, the
+                deleted row's); lets the bus recognise the write's trigger echo
+        """
+        self.publish(make_event('athlete_profiles', action, user_id=user_id, profile_id=profile_id,
+                                updated_at=updated_at))
+
+    def publish_user_profile_change(self, user_id: str, updated_at: Optional[str] = None):
+        """Publish a local user_profiles write (display name, demographics); see publish_athlete_profile_change"""
+        self.publish(make_event('user_profiles', 'update', user_id=user_id, updated_at=updated_at))
+
+
+class PostgresInvalidationListener:
+    """
+    LISTEN on INVALIDATION_CHANNEL and republish notifications on the bus.
+
+    Requires the optional asyncpg package and the triggers from
+    add_invalidation_triggers.sql; disabled when INVALIDATION_DATABASE_URL is unset.
+    """
+
+    def __init__(self, bus: InvalidationBus, dsn: Optional[str] = INVALIDATION_DATABASE_URL):
+        self.bus = bus
+        self.dsn = dsn
+        self._connection = None
+
+    async def start(self):
+        if not self.dsn:
+            return
+
+        try:
+            import asyncpg
+        except ImportError:
+            print("⚠️  PostgresInvalidationListener: asyncpg not installed, out-of-band changes will not be seen")
+            return
+
+        try:
+            self._connection = await asyncpg.connect(self.dsn)
+            await self._connection.add_listener(INVALIDATION_CHANNEL, self._on_notify)
+            print(f"✅ PostgresInvalidationListener: Listening on {INVALIDATION_CHANNEL}")
+        except Exception as e:
+            print(f"❌ PostgresInvalidationListener: Failed to listen: {e}")
+            self._connection = None
+
+    async def stop(self):
+        if self._connection:
+            await self._connection.close()
+            self._connection = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            data = json.loads(payload)
+            event = make_event(
+                data['table'],
+                data['action'],
+                user_id=data.get('user_id'),
+                profile_id=data.get('profile_id'),
+                source='postgres',
+                updated_at=data.get('updated_at')
+            )
+        except (ValueError, KeyError) as e:
+            print(f"⚠️  PostgresInvalidationListener: Ignoring malformed payload {payload!r}: {e}")
+            return
+
+        # Only queues the event; subscribers run off the listener's event loop
+        self.bus.publish(event)
+
+
+def patch_ranking_snapshot(event: Dict):
+    """Subscriber: re-read the affected user's entry and patch the leaderboard snapshot"""
+    if event.get('user_id'):
+        ranking_service.apply_user_change(event['user_id'])
+    elif ranking_service.refresh_callback:
+        # Without a user id we can't patch; fall back to a full background rebuild
+        ranking_service.refresh_callback(force=True)
+
+
+# Global instances used by server.py
+invalidation_bus = InvalidationBus()
+invalidation_bus.subscribe(patch_ranking_snapshot)
+postgres_listener = PostgresInvalidationListener(invalidation_bus)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Change Log for Hybrid House
+Bounded ring buffer of snapshot-to-snapshot diffs for delta sync
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from .leaderboard_snapshot import LeaderboardSnapshot
+
+# Number of recent snapshot diffs kept; older versions get "full reload required"
+CHANGELOG_SIZE = int(os.environ.get('LEADERBOARD_CHANGELOG_SIZE', '64'))
+
+
+def _without_rank(entry: Dict) -> Dict:
+    return {key: value for key, value in entry.items() if key != 'rank'}
+
+
+def diff_snapshots(old: LeaderboardSnapshot, new: LeaderboardSnapshot) -> Dict:
+    """
+    Diff two snapshots by profile_id
+
+    Returns:
+        Dict with from_version, to_version, inserted/updated entries (as in the new
+        snapshot), removed profile ids and rank_shifts {profile_id: new_rank} for
+        unchanged entries whose rank moved
+    """
+    inserted = []
+    updated = []
+    rank_shifts = {}
+
+    for entry in new.entries:
+        profile_id = entry['profile_id']
+        previous = old.by_profile_id.get(profile_id)
+        if previous is None:
+            inserted.append(entry)
+        elif _without_rank(previous) != _without_rank(entry):
+            updated.append(entry)
+        elif previous.get('rank') != entry.get('rank'):
+            rank_shifts[profile_id] = entry['rank']
+
+    removed = [profile_id for profile_id in old.by_profile_id if profile_id not in new.by_profile_id]
+
+    return {
+        'from_version': old.version,
+        'to_version': new.version,
+        'total': len(new),
+        'inserted': inserted,
+        'updated': updated,
+        'removed': removed,
+        'rank_shifts': rank_shifts
+    }
+
+
+def diff_to_delta(diff: Dict) -> Dict:
+    """A single recorded diff in the /leaderboard/changes response shape"""
+    return {
+        'since': diff['from_version'],
+        'version': diff['to_version'],
+        'total': diff['total'],
+        'full_reload_required': False,
+        'inserted': diff['inserted'],
+        'updated': diff['updated'],
+        'removed': diff['removed'],
+        'rank_shifts': [{'profile_id': profile_id, 'rank': rank} for profile_id, rank in diff['rank_shifts'].items()]
+    }
+
+
+class SnapshotChangeLog:
+    """Recent snapshot diffs, merged on demand into a single delta since a client's version"""
+
+    def __init__(self, size: int = CHANGELOG_SIZE):
+        self._diffs = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, old: Optional[LeaderboardSnapshot], new: LeaderboardSnapshot) -> Optional[Dict]:
+        """Record the diff for a snapshot swap; returns the diff (None for the first snapshot)"""
+        if old is None or new.version == old.version:
+            return None
+        diff = diff_snapshots(old, new)
+        with self._lock:
+            self._diffs.append(diff)
+        return diff
+
+    def changes_since(self, since: int, current: LeaderboardSnapshot) -> Dict:
+        """
+        Merge the diffs between version `since` and the current snapshot
+
+        A full reload is required when `since` is unknown to this process: older
+        than the ring buffer, from the future, or a version skipped when adopting
+        a snapshot published by another worker.
+        """
+        response = {
+            'since': since,
+            'version': current.version,
+            'total': len(current),
+            'full_reload_required': False,
+            'inserted': [],
+            'updated': [],
+            'removed': [],
+            'rank_shifts': []
+        }
+        if since == current.version:
+            return response
+
+        with self._lock:
+            diffs = list(self._diffs)
+
+        start = next((index for index, diff in enumerate(diffs) if diff['from_version'] == since), None)
+        if start is None:
+            response['full_reload_required'] = True
+            return response
+
+        inserted: Dict[str, Dict] = {}
+        updated: Dict[str, Dict] = {}
+        removed = set()
+        ranks: Dict[str, int] = {}
+        cursor = since
+
+        for diff in diffs[start:]:
+            if cursor == current.version:
+                # A newer snapshot was swapped in after `current` was read
+                break
+            if diff['from_version'] != cursor:
+                response['full_reload_required'] = True
+                return response
+            cursor = diff['to_version']
+
+            for entry in diff['inserted']:
+                profile_id = entry['profile_id']
+                if profile_id in removed:
+                    # Removed and re-added since the client's version: an update for them
+                    removed.discard(profile_id)
+                    updated[profile_id] = entry
+                else:
+                    inserted[profile_id] = entry
+                ranks[profile_id] = entry['rank']
+            for entry in diff['updated']:
+                profile_id = entry['profile_id']
+                if profile_id in inserted:
+                    inserted[profile_id] = entry
+                else:
+                    updated[profile_id] = entry
+                ranks[profile_id] = entry['rank']
+            for profile_id in diff['removed']:
+                ranks.pop(profile_id, None)
+                if inserted.pop(profile_id, None) is None:
+                    updated.pop(profile_id, None)
+                    removed.add(profile_id)
+            ranks.update(diff['rank_shifts'])
+
+        if cursor != current.version:
+            response['full_reload_required'] = True
+            return response
+
+        upserted = set(inserted) | set(updated)
+        response['inserted'] = [dict(entry, rank=ranks[pid]) for pid, entry in inserted.items()]
+        response['updated'] = [dict(entry, rank=ranks[pid]) for pid, entry in updated.items()]
+        response['removed'] = sorted(removed)
+        response['rank_shifts'] = [
+            {'profile_id': profile_id, 'rank': rank}
+            for profile_id, rank in ranks.items()
+            if profile_id not in upserted
+        ]
+        return response
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Facets for Hybrid House
+Filter counts (country, gender, age bracket, score band) kept in step with the snapshot
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from .leaderboard_snapshot import AGE_BRACKETS, LeaderboardSnapshot, get_age_group
+from .ranking_service import ranking_service
+
+# Width of each score band (0-10, 10-20, ... 90-100)
+SCORE_BAND_WIDTH = 10
+
+FACET_NAMES = ('country', 'gender', 'age_group', 'score_band')
+
+
+def get_score_band(score: Optional[float]) -> Optional[str]:
+    """Map a hybrid score to its band label (e.g. 73.4 -> '70-80'; 100 falls in '90-100')"""
+    if score is None:
+        return None
+    low = min(int(score // SCORE_BAND_WIDTH) * SCORE_BAND_WIDTH, 100 - SCORE_BAND_WIDTH)
+    low = max(low, 0)
+    return f"{low}-{low + SCORE_BAND_WIDTH}"
+
+
+def facet_values(entry: Dict) -> Tuple[Optional[str], ...]:
+    """An entry's value for each facet in FACET_NAMES (None when unknown)"""
+    country = (entry.get('country') or '').strip() or None
+    gender = (entry.get('gender') or '').strip() or None
+    return (country, gender, get_age_group(entry.get('age')), get_score_band(entry.get('score')))
+
+
+class LeaderboardFacets:
+    """
+    Facet counts for one leaderboard version.
+
+    Built in one pass over a snapshot, then kept current from RankingService's
+    snapshot diffs: each entry's facet values are remembered, so an update or
+    removal decrements exactly the buckets it was counted in. A diff that does
+    not follow on from the counted version (e.g. an adopted shared snapshot)
+    marks the counts stale and the next read rebuilds them.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.total = 0
+        self._counts: Dict[str, Counter] = {name: Counter() for name in FACET_NAMES}
+        self._values: Dict[str, Tuple[Optional[str], ...]] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, profile_id: str, entry: Dict):
+        values = facet_values(entry)
+        self._values[profile_id] = values
+        self.total += 1
+        for name, value in zip(FACET_NAMES, values):
+            if value is not None:
+                self._counts[name][value] += 1
+
+    def _remove(self, profile_id: str):
+        values = self._values.pop(profile_id, None)
+        if values is None:
+            return
+        self.total -= 1
+        for name, value in zip(FACET_NAMES, values):
+            if value is not None:
+                self._counts[name][value] -= 1
+                if self._counts[name][value] <= 0:
+                    del self._counts[name][value]
+
+    def rebuild(self, snapshot: LeaderboardSnapshot):
+        """Recount from scratch for a snapshot"""
+        with self._lock:
+            self.total = 0
+            self._counts = {name: Counter() for name in FACET_NAMES}
+            self._values = {}
+            for entry in snapshot.entries:
+                self._add(entry['profile_id'], entry)
+            self.version = snapshot.version
+
+    def apply_diff(self, diff: Dict):
+        """RankingService diff listener: adjust only the buckets touched by the diff"""
+        with self._lock:
+            if self.version is None or diff['from_version'] != self.version:
+                self.version = None
+                return
+            for profile_id in diff['removed']:
+                self._remove(profile_id)
+            for entry in diff['inserted'] + diff['updated']:
+                self._remove(entry['profile_id'])
+                self._add(entry['profile_id'], entry)
+            self.version = diff['to_version']
+
+    def for_snapshot(self, snapshot: LeaderboardSnapshot) -> Dict:
+        """Facet counts matching a snapshot, rebuilding only when they have fallen out of step"""
+        if self.version != snapshot.version:
+            self.rebuild(snapshot)
+        with self._lock:
+            return self._to_dict()
+
+    def _to_dict(self) -> Dict:
+        def ordered(name: str, order=None):
+            counts = self._counts[name]
+            if order is None:
+                # Most common first, then alphabetical
+                keys = sorted(counts, key=lambda value: (-counts[value], value))
+            else:
+                keys = [value for value in order if value in counts]
+            return [{'value': value, 'count': counts[value]} for value in keys]
+
+        age_order = [label for _, _, label in AGE_BRACKETS]
+        band_order = [f"{low}-{low + SCORE_BAND_WIDTH}" for low in range(0, 100, SCORE_BAND_WIDTH)]
+
+        return {
+            'snapshot_version': self.version,
+            'total': self.total,
+            'facets': {
+                'country': ordered('country'),
+                'gender': ordered('gender'),
+                'age_group': ordered('age_group', age_order),
+                'score_band': ordered('score_band', band_order)
+            }
+        }
+
+
+# Global instance kept current by RankingService's snapshot diffs
+leaderboard_facets = LeaderboardFacets()
+ranking_service.diff_listeners.append(leaderboard_facets.apply_diff)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Name Search for Hybrid House
+Prefix trie and trigram index over leaderboard display names, built per snapshot
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Set
+
+from .leaderboard_snapshot import LeaderboardSnapshot
+
+# Best-ranked profile ids kept per trie node (and the largest result page); bounds memory and lookup time
+MAX_HITS_PER_NODE = 20
+
+# Minimum trigram similarity (shared / union) for a fuzzy hit
+FUZZY_THRESHOLD = 0.3
+
+_APOSTROPHES = re.compile(r"['\u2019`]")
+_SEPARATORS = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """Case- and diacritic-folded name with punctuation collapsed to single spaces"""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    # "O'Neil" folds to "oneil" rather than two words
+    return _SEPARATORS.sub(' ', _APOSTROPHES.sub('', stripped.casefold())).strip()
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading spaces and one trailing"""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class LeaderboardSearchIndex:
+    """
+    Search index over one snapshot's display names.
+
+    The trie is keyed by the full normalized name and by each word in it, so
+    "smi" finds "John Smith". Entries are inserted in rank order and each node
+    keeps only its best-ranked MAX_HITS_PER_NODE ids, so a prefix lookup is
+    O(len(query)) regardless of leaderboard size. Trigram posting lists back
+    fuzzy matching for typos.
+    """
+
+    def __init__(self, snapshot: LeaderboardSnapshot):
+        self.version = snapshot.version
+        self.entries = snapshot.by_profile_id
+        self._trie: Dict = {}
+        self._trigrams: Dict[str, List[str]] = {}
+        self._name_trigrams: Dict[str, Set[str]] = {}
+
+        for entry in snapshot.entries:
+            profile_id = entry['profile_id']
+            normalized = normalize_name(entry.get('display_name'))
+            if not normalized:
+                continue
+
+            keys = {normalized}
+            keys.update(normalized.split())
+            for key in keys:
+                self._insert(key, profile_id)
+
+            grams = trigrams(normalized)
+            self._name_trigrams[profile_id] = grams
+            for gram in grams:
+                self._trigrams.setdefault(gram, []).append(profile_id)
+
+    def _insert(self, key: str, profile_id: str):
+        node = self._trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+            hits = node.setdefault('', [])
+            if len(hits) < MAX_HITS_PER_NODE and (not hits or hits[-1] != profile_id):
+                hits.append(profile_id)
+
+    def prefix_matches(self, normalized: str) -> List[str]:
+        """Profile ids whose name (or a word in it) starts with the query, best rank first"""
+        node = self._trie
+        for ch in normalized:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node.get('', [])
+
+    def fuzzy_matches(self, normalized: str, exclude: Set[str]) -> List[str]:
+        """Profile ids with trigram similarity >= FUZZY_THRESHOLD, most similar (then best rank) first"""
+        query_grams = trigrams(normalized)
+        if not query_grams:
+            return []
+
+        # A hit must share at least `needed` trigrams, so it appears in at least one of
+        # the len - needed + 1 rarest posting lists; only those generate candidates
+        needed = max(1, math.ceil(FUZZY_THRESHOLD * len(query_grams)))
+        rarest = sorted(query_grams, key=lambda gram: len(self._trigrams.get(gram, ())))
+        candidates: Set[str] = set()
+        for gram in rarest[:len(query_grams) - needed + 1]:
+            candidates.update(self._trigrams.get(gram, ()))
+        candidates -= exclude
+
+        scored = []
+        for profile_id in candidates:
+            name_grams = self._name_trigrams[profile_id]
+            count = len(query_grams & name_grams)
+            similarity = count / (len(query_grams) + len(name_grams) - count)
+            if similarity >= FUZZY_THRESHOLD:
+                scored.append((-similarity, self.entries[profile_id].get('rank') or 0, profile_id))
+        scored.sort()
+        return [profile_id for _, _, profile_id in scored]
+
+    def search(self, query: str, limit: int = 10, entries: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """
+        Prefix hits first, then fuzzy hits, as small result rows
+
+        Args:
+            entries: Entries by profile_id of a newer snapshot to take ranks from;
+                profiles no longer on it are skipped
+        """
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        entries = entries if entries is not None else self.entries
+
+        results = []
+        seen: Set[str] = set()
+        for profile_id in self.prefix_matches(normalized):
+            if len(results) >= limit:
+                break
+            seen.add(profile_id)
+            if profile_id in entries:
+                results.append(self._result(entries[profile_id], 'prefix'))
+
+        if len(results) < limit:
+            for profile_id in self.fuzzy_matches(normalized, seen):
+                if len(results) >= limit:
+                    break
+                if profile_id in entries:
+                    results.append(self._result(entries[profile_id], 'fuzzy'))
+        return results
+
+    def _result(self, entry: Dict, match: str) -> Dict:
+        return {
+            'profile_id': entry['profile_id'],
+            'user_id': entry.get('user_id'),
+            'display_name': entry.get('display_name'),
+            'rank': entry.get('rank'),
+            'score': entry.get('score'),
+            'country_flag': entry.get('country_flag'),
+            'match': match
+        }
+
+
+class SearchIndexCache:
+    """
+    The search index for the latest snapshot.
+
+    Only a cold start builds on the request path. After a snapshot swap the
+    previous index keeps answering (with ranks taken from the current snapshot)
+    while a background thread builds the new one, so incremental patches never
+    put a full index build in front of a search.
+    """
+
+    def __init__(self):
+        self._index: Optional[LeaderboardSearchIndex] = None
+        self._building_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self, snapshot: LeaderboardSnapshot) -> LeaderboardSearchIndex:
+        index = self._index
+        if index and index.version == snapshot.version:
+            return index
+
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = LeaderboardSearchIndex(snapshot)
+                return self._index
+
+        with self._lock:
+            if self._building_version is None or self._building_version < snapshot.version:
+                self._building_version = snapshot.version
+                threading.Thread(target=self._build, args=(snapshot,), daemon=True).start()
+        return index
+
+    def _build(self, snapshot: LeaderboardSnapshot):
+        try:
+            index = LeaderboardSearchIndex(snapshot)
+            with self._lock:
+                if self._index is None or self._index.version < index.version:
+                    self._index = index
+        except Exception as e:
+            print(f"❌ SearchIndexCache: Failed to build search index v{snapshot.version}: {e}")
+        finally:
+            with self._lock:
+                if self._building_version == snapshot.version:
+                    self._building_version = None
+
+
+# Global instance for use in server.py
+search_index_cache = SearchIndexCache()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Snapshot for Hybrid House
+Immutable, pre-sorted view of the public leaderboard used for ranking lookups
+"""
+
+import bisect
+import math
+from typing import Dict, List, Optional, Sequence
+from datetime import datetime
+
+# Age brackets used for segment leaderboards (upper bound inclusive)
+AGE_BRACKETS = [
+    (0, 17, 'under-18'),
+    (18, 24, '18-24'),
+    (25, 29, '25-29'),
+    (30, 34, '30-34'),
+    (35, 39, '35-39'),
+    (40, 44, '40-44'),
+    (45, 49, '45-49'),
+    (50, 54, '50-54'),
+    (55, 59, '55-59'),
+    (60, 200, '60+')
+]
+
+
+def get_age_group(age: Optional[int]) -> Optional[str]:
+    """Map an age to its bracket label (e.g. 27 -> '25-29')"""
+    if age is None:
+        return None
+    for low, high, label in AGE_BRACKETS:
+        if low <= age <= high:
+            return label
+    return None
+
+
+def get_segment_key(gender: Optional[str], age: Optional[int]) -> Optional[str]:
+    """
+    Segment key used for segment leaderboards: '<gender>:<age_group>'
+
+    Returns None when either gender or age is unknown, since such athletes
+    cannot be placed in a segment.
+    """
+    age_group = get_age_group(age)
+    if not gender or not age_group:
+        return None
+    return f"{gender.strip().lower()}:{age_group}"
+
+
+class LeaderboardSnapshot:
+    """
+    Ranked leaderboard built once per refresh.
+
+    Entries are sorted by score (highest first) and carry a competition-style
+    'rank' (ties share a rank). Scores are also kept in ascending order, globally
+    and per segment, so rank and threshold lookups are O(log n) via bisect.
+    """
+
+    def __init__(self, entries: List[Dict], version: int = 0, built_at: Optional[str] = None):
+        """
+        Args:
+            entries: Leaderboard entries (any order)
+            version: Snapshot version, increasing with every rebuild
+            built_at: ISO timestamp of the build; defaults to now
+        """
+        self.version = version
+        self.built_at = built_at or datetime.utcnow().isoformat()
+        self.entries = sorted(entries, key=lambda e: e.get('score') or 0, reverse=True)
+        self.by_profile_id: Dict[str, Dict] = {}
+        self._scores_asc: Sequence[float] = []
+        self._segment_scores_asc: Dict[str, Sequence[float]] = {}
+
+        previous_score = None
+        previous_rank = 0
+        for index, entry in enumerate(self.entries):
+            score = entry.get('score') or 0
+            rank = previous_rank if score == previous_score else index + 1
+            entry['rank'] = rank
+            entry['segment'] = get_segment_key(entry.get('gender'), entry.get('age'))
+            previous_score, previous_rank = score, rank
+
+            self.by_profile_id[entry['profile_id']] = entry
+            if entry['segment']:
+                self._segment_scores_asc.setdefault(entry['segment'], []).append(score)
+
+        self._scores_asc = [entry.get('score') or 0 for entry in reversed(self.entries)]
+        for scores in self._segment_scores_asc.values():
+            scores.reverse()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def entry_at(self, index: int) -> Dict:
+        """Entry at a 0-based position in rank order"""
+        return self.entries[index]
+
+    def page(self, offset: int, limit: int) -> List[Dict]:
+        """Entries in rank order from `offset`, at most `limit` of them"""
+        return self.entries[offset:offset + limit]
+
+    def scores(self, segment: Optional[str] = None) -> Sequence[float]:
+        """Global (or segment) scores in ascending order"""
+        if segment is None:
+            return self._scores_asc
+        return self._segment_scores_asc.get(segment, [])
+
+    def segment_keys(self) -> List[str]:
+        """Segments that have at least one athlete"""
+        return list(self._segment_scores_asc)
+
+    def total(self, segment: Optional[str] = None) -> int:
+        """Number of athletes on the global (or segment) leaderboard"""
+        return len(self.scores(segment))
+
+    def rank_for_score(self, score: float, segment: Optional[str] = None) -> int:
+        """Competition rank a score would hold: 1 + number of strictly higher scores"""
+        scores = self.scores(segment)
+        return len(scores) - bisect.bisect_right(scores, score) + 1
+
+    def score_at_rank(self, rank: int, segment: Optional[str] = None) -> Optional[float]:
+        """Score held by the athlete at 1-based position `rank`, None if out of range"""
+        scores = self.scores(segment)
+        if rank < 1 or rank > len(scores):
+            return None
+        return scores[len(scores) - rank]
+
+    def next_score_above(self, score: float, segment: Optional[str] = None) -> Optional[float]:
+        """Lowest score strictly greater than `score`, None if already first"""
+        scores = self.scores(segment)
+        index = bisect.bisect_right(scores, score)
+        return scores[index] if index < len(scores) else None
+
+    def percentile_for_score(self, score: float, segment: Optional[str] = None) -> Optional[float]:
+        """Percentage of athletes scoring strictly below `score`"""
+        scores = self.scores(segment)
+        if not scores:
+            return None
+        below = bisect.bisect_left(scores, score)
+        return round((below / len(scores)) * 100, 1)
+
+    def rank_for_percentile(self, percentile: float, segment: Optional[str] = None) -> Optional[int]:
+        """Worst rank that still sits in the top (100 - percentile)% of the leaderboard"""
+        total = self.total(segment)
+        if not total:
+            return None
+        return max(1, math.floor(total * (100 - percentile) / 100))
+
+    def with_user_entry(self, user_id: str, entry: Optional[Dict], version: int) -> 'LeaderboardSnapshot':
+        """
+        Copy of this snapshot with a user's entry replaced (or removed when entry is None)
+
+        Entries are shallow-copied so readers of this snapshot never see the patch.
+        """
+        entries = [dict(e) for e in self.entries if e.get('user_id') != user_id]
+        if entry:
+            entries.append(dict(entry))
+        return LeaderboardSnapshot(entries, version=version)
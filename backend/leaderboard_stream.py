@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Live Leaderboard Stream for Hybrid House
+Fans out snapshot diffs and per-profile rank changes to Server-Sent Events subscribers
+"""
+
+import os
+import asyncio
+from typing import Dict, List, Optional, Set
+
+import orjson
+
+from .leaderboard_changes import diff_to_delta
+from .ranking_service import ranking_service, RankingService
+
+# Pending frames per connection; a slow client that overflows gets one coalesced delta instead
+STREAM_QUEUE_SIZE = int(os.environ.get('LEADERBOARD_STREAM_QUEUE_SIZE', '32'))
+
+# Bursts of snapshot changes within this window are sent as a single event
+STREAM_COALESCE_SECONDS = float(os.environ.get('LEADERBOARD_STREAM_COALESCE_SECONDS', '0.25'))
+
+# Comment frames keep idle connections open through proxies and detect disconnects
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get('LEADERBOARD_STREAM_HEARTBEAT_SECONDS', '15'))
+
+HEARTBEAT_FRAME = b': keepalive\n\n'
+
+
+def encode_event(event: str, data: Dict, event_id: Optional[int] = None) -> bytes:
+    """Encode one SSE frame (data is a single JSON line)"""
+    frame = f"event: {event}\n"
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    return frame.encode('utf-8') + b'data: ' + orjson.dumps(data, default=str) + b'\n\n'
+
+
+def profile_rank_changes(diff: Dict) -> Dict[str, Optional[int]]:
+    """New rank per profile touched by a diff (None = left the leaderboard)"""
+    ranks: Dict[str, Optional[int]] = dict(diff['rank_shifts'])
+    for entry in diff['inserted']:
+        ranks[entry['profile_id']] = entry['rank']
+    for entry in diff['updated']:
+        ranks[entry['profile_id']] = entry['rank']
+    for profile_id in diff['removed']:
+        ranks[profile_id] = None
+    return ranks
+
+
+class StreamSubscriber:
+    """One SSE connection: a bounded frame queue plus the snapshot version it has seen"""
+
+    def __init__(self, version: int, profile_id: Optional[str] = None, diffs: bool = True):
+        self.version = version
+        self.profile_id = profile_id
+        self.diffs = diffs
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, item: tuple):
+        """Enqueue without blocking; on overflow drop the backlog and resync on the next send"""
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(('overflow',))
+
+
+class LeaderboardStream:
+    """
+    Event-loop fan-out of leaderboard changes to SSE subscribers.
+
+    RankingService reports each snapshot diff from whichever thread swapped the
+    snapshot; the diff is handed to the event loop, encoded once, and offered to
+    every subscriber's bounded queue. Each connection is an async generator, so
+    idle viewers cost a queue and never a thread or a leaderboard query.
+    """
+
+    def __init__(self, service: RankingService):
+        self.service = service
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[StreamSubscriber] = set()
+        self._by_profile: Dict[str, Set[StreamSubscriber]] = {}
+        self._merged_frames: Dict[tuple, bytes] = {}
+
+    def start(self):
+        """Attach to the running loop and to RankingService (called from the FastAPI startup hook)"""
+        self._loop = asyncio.get_running_loop()
+        if self.publish_diff not in self.service.diff_listeners:
+            self.service.diff_listeners.append(self.publish_diff)
+
+    def stop(self):
+        """Detach and end all open streams (called from the FastAPI shutdown hook)"""
+        if self.publish_diff in self.service.diff_listeners:
+            self.service.diff_listeners.remove(self.publish_diff)
+        for subscriber in list(self._subscribers):
+            subscriber.offer(('close',))
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish_diff(self, diff: Dict):
+        """RankingService diff listener; safe to call from any thread"""
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._fan_out, diff)
+
+    def _fan_out(self, diff: Dict):
+        if not self._subscribers:
+            return
+
+        self._merged_frames.clear()
+        frame = encode_event('diff', diff_to_delta(diff), event_id=diff['to_version'])
+        for subscriber in self._subscribers:
+            if subscriber.diffs:
+                subscriber.offer(('diff', diff['from_version'], diff['to_version'], frame))
+
+        if self._by_profile:
+            for profile_id, rank in profile_rank_changes(diff).items():
+                watchers = self._by_profile.get(profile_id)
+                if not watchers:
+                    continue
+                rank_frame = encode_event('rank', {
+                    'profile_id': profile_id,
+                    'rank': rank,
+                    'total': diff['total'],
+                    'version': diff['to_version']
+                })
+                for subscriber in watchers:
+                    subscriber.offer(('rank', diff['from_version'], diff['to_version'], rank_frame))
+
+    def subscribe(self, profile_id: Optional[str] = None, diffs: bool = True,
+                  since: Optional[int] = None) -> StreamSubscriber:
+        """Register a connection, starting from `since` (e.g. Last-Event-ID) or the current snapshot"""
+        snapshot = self.service.get_snapshot()
+        subscriber = StreamSubscriber(snapshot.version if since is None else since, profile_id, diffs)
+        self._subscribers.add(subscriber)
+        if profile_id:
+            self._by_profile.setdefault(profile_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber):
+        self._subscribers.discard(subscriber)
+        if subscriber.profile_id:
+            watchers = self._by_profile.get(subscriber.profile_id)
+            if watchers:
+                watchers.discard(subscriber)
+                if not watchers:
+                    del self._by_profile[subscriber.profile_id]
+
+    def _merged_diff_frame(self, since: int) -> bytes:
+        """One delta covering everything since `since`, shared by subscribers at the same version"""
+        snapshot = self.service.get_snapshot()
+        key = (since, snapshot.version)
+        if key not in self._merged_frames:
+            changes = self.service.get_leaderboard_changes(since)
+            self._merged_frames[key] = encode_event('diff', changes, event_id=changes['version'])
+        return self._merged_frames[key]
+
+    def _current_rank_frame(self, profile_id: str) -> bytes:
+        snapshot = self.service.get_snapshot()
+        entry = snapshot.by_profile_id.get(profile_id)
+        return encode_event('rank', {
+            'profile_id': profile_id,
+            'rank': entry['rank'] if entry else None,
+            'total': len(snapshot),
+            'version': snapshot.version
+        })
+
+    def _coalesce(self, subscriber: StreamSubscriber, items: List[tuple]) -> List[bytes]:
+        """Collapse a burst of queued frames into at most one diff and one rank frame"""
+        diff_items = [item for item in items if item[0] == 'diff']
+        rank_items = [item for item in items if item[0] == 'rank']
+        overflowed, subscriber.overflowed = subscriber.overflowed, False
+        frames = []
+
+        if subscriber.diffs and (overflowed or diff_items):
+            if not overflowed and len(diff_items) == 1 and diff_items[0][1] == subscriber.version:
+                frames.append(diff_items[0][3])
+            else:
+                frames.append(self._merged_diff_frame(subscriber.version))
+
+        if subscriber.profile_id and (overflowed or len(rank_items) > 1):
+            frames.append(self._current_rank_frame(subscriber.profile_id))
+        elif rank_items:
+            frames.append(rank_items[0][3])
+
+        versions = [item[2] for item in diff_items + rank_items]
+        if overflowed:
+            subscriber.version = self.service.get_snapshot().version
+        elif versions:
+            subscriber.version = max(versions + [subscriber.version])
+        return frames
+
+    async def events(self, request, subscriber: StreamSubscriber):
+        """
+        Async generator of SSE frames for one connection
+
+        Starts with a 'hello' event (current version and total); a subscriber that
+        resumed from an older version first gets the delta it missed.
+        """
+        try:
+            snapshot = self.service.get_snapshot()
+            yield encode_event('hello', {'version': snapshot.version, 'total': len(snapshot)})
+            if subscriber.version != snapshot.version:
+                if subscriber.diffs:
+                    yield self._merged_diff_frame(subscriber.version)
+                subscriber.version = snapshot.version
+            if subscriber.profile_id:
+                yield self._current_rank_frame(subscriber.profile_id)
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield HEARTBEAT_FRAME
+                    continue
+
+                # Let a burst of rebuilds/patches settle, then send it as one update
+                await asyncio.sleep(STREAM_COALESCE_SECONDS)
+                items = [item]
+                while not subscriber.queue.empty():
+                    items.append(subscriber.queue.get_nowait())
+                if any(queued[0] == 'close' for queued in items):
+                    break
+
+                for frame in self._coalesce(subscriber, items):
+                    yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+
+# Global instance started from server.py's startup hook
+leaderboard_stream = LeaderboardStream(ranking_service)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+LLM Call Ledger for Hybrid House
+Latency, time-to-first-token and token usage of every interview model call,
+aggregated into histograms and optionally persisted to the llm_call_ledger table
+"""
+
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+# Set LLM_LEDGER_PERSIST=1 to write every call to the llm_call_ledger table
+PERSIST_ENABLED = os.environ.get('LLM_LEDGER_PERSIST', '0').lower() in ('1', 'true', 'yes')
+
+# Calls buffered for the ledger table; the oldest are dropped if writes fall behind
+LEDGER_BUFFER_SIZE = int(os.environ.get('LLM_LEDGER_BUFFER_SIZE', '5000'))
+
+# How often buffered calls are written, and the most written per insert
+LEDGER_FLUSH_SECONDS = float(os.environ.get('LLM_LEDGER_FLUSH_SECONDS', '10'))
+LEDGER_BATCH_SIZE = 500
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (not thread-safe; LLMLedger holds its lock)"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms: float):
+        index = next((i for i, bound in enumerate(self.bounds) if value_ms <= bound), len(self.bounds))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def merge(self, other: 'Histogram'):
+        """Add another histogram with the same bounds into this one"""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the quantile, capped at the largest value seen"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(float(self.bounds[i]), self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 1) if self.count else None,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'max_ms': round(self.max, 1) if self.count else None,
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class CallTracker:
+    """Timing and usage of one model call; created by LLMLedger.track()"""
+
+    def __init__(self, endpoint: str, model: str, session_id: Optional[str], streamed: bool,
+                 previous_response_id: Optional[str], route: Optional[str]):
+        self.started_at = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self.record = {
+            'endpoint': endpoint,
+            'model': model,
+            'route': route,
+            'session_id': session_id,
+            'streamed': streamed,
+            'used_previous_response_id': bool(previous_response_id),
+            'response_id': None,
+            'input_tokens': None,
+            'cached_input_tokens': None,
+            'output_tokens': None,
+            'status': 'ok',
+            'error': None
+        }
+
+    def first_token(self):
+        """Mark the first streamed text delta (later calls are ignored)"""
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+
+    def response(self, response_id: Optional[str] = None, usage=None):
+        """Attach the response id and the Responses API usage object, when known"""
+        if response_id:
+            self.record['response_id'] = response_id
+        if usage is not None:
+            self.record['input_tokens'] = getattr(usage, 'input_tokens', None)
+            self.record['output_tokens'] = getattr(usage, 'output_tokens', None)
+            details = getattr(usage, 'input_tokens_details', None)
+            self.record['cached_input_tokens'] = getattr(details, 'cached_tokens', None) if details else None
+
+
+class LLMLedger:
+    """
+    Records every interview model call.
+
+    track() wraps a responses.create call and measures wall time, time to
+    first token for streams, token usage, model, route, session and whether
+    previous_response_id was used. Calls are aggregated per endpoint, model
+    and route into latency histograms and token totals (served by the
+    metrics endpoints; routes() merges them per routing decision), and with
+    LLM_LEDGER_PERSIST=1 are batched into the llm_call_ledger table from a
+    background task, off the request path.
+    """
+
+    def __init__(self, persist: bool = PERSIST_ENABLED):
+        self.persist = persist
+        self.supabase = None
+        self._stats: Dict[str, Dict] = {}
+        self._pending: deque = deque(maxlen=LEDGER_BUFFER_SIZE)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @contextmanager
+    def track(self, endpoint: str, model: str, session_id: Optional[str] = None, streamed: bool = False,
+              previous_response_id: Optional[str] = None, route: Optional[str] = None):
+        """
+        Measure one model call; failures are recorded and re-raised
+
+            with llm_ledger.track('hybrid_chat', model, session_id, streamed=True) as call:
+                ...
+                call.first_token()
+                call.response(response.id, response.usage)
+        """
+        call = CallTracker(endpoint, model, session_id, streamed, previous_response_id, route)
+        try:
+            yield call
+        except Exception as e:
+            call.record['status'] = 'error'
+            call.record['error'] = str(e)[:500]
+            raise
+        finally:
+            self._record(call)
+
+    def _record(self, call: CallTracker):
+        finished_at = time.monotonic()
+        record = call.record
+        record['wall_ms'] = round((finished_at - call.started_at) * 1000, 1)
+        record['ttft_ms'] = round((call.first_token_at - call.started_at) * 1000, 1) if call.first_token_at else None
+        record['created_at'] = datetime.utcnow().isoformat()
+
+        key = f"{record['endpoint']}:{record['model']}:{record['route'] or ''}"
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    'endpoint': record['endpoint'],
+                    'model': record['model'],
+                    'route': record['route'],
+                    'calls': 0,
+                    'errors': 0,
+                    'chained_calls': 0,
+                    'input_tokens': 0,
+                    'cached_input_tokens': 0,
+                    'output_tokens': 0,
+                    'wall': Histogram(),
+                    'ttft': Histogram()
+                }
+            stats['calls'] += 1
+            stats['errors'] += 1 if record['status'] == 'error' else 0
+            stats['chained_calls'] += 1 if record['used_previous_response_id'] else 0
+            stats['input_tokens'] += record['input_tokens'] or 0
+            stats['cached_input_tokens'] += record['cached_input_tokens'] or 0
+            stats['output_tokens'] += record['output_tokens'] or 0
+            stats['wall'].add(record['wall_ms'])
+            if record['ttft_ms'] is not None:
+                stats['ttft'].add(record['ttft_ms'])
+            if self.persist:
+                self._pending.append(record)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            calls = [
+                {
+                    **{name: value for name, value in stats.items() if name not in ('wall', 'ttft')},
+                    'wall': stats['wall'].to_dict(),
+                    'ttft': stats['ttft'].to_dict()
+                }
+                for stats in self._stats.values()
+            ]
+            pending = len(self._pending)
+        return {'persist': self.persist, 'pending_writes': pending, 'calls': calls}
+
+    def routes(self) -> Dict[str, Dict]:
+        """Calls tagged with a route, merged across endpoints: counts per model, latency and token totals"""
+        with self._lock:
+            merged: Dict[str, Dict] = {}
+            for stats in self._stats.values():
+                if not stats['route']:
+                    continue
+                route = merged.setdefault(stats['route'], {
+                    'calls': 0,
+                    'errors': 0,
+                    'models': {},
+                    'input_tokens': 0,
+                    'output_tokens': 0,
+                    'wall': Histogram()
+                })
+                route['calls'] += stats['calls']
+                route['errors'] += stats['errors']
+                route['models'][stats['model']] = route['models'].get(stats['model'], 0) + stats['calls']
+                route['input_tokens'] += stats['input_tokens']
+                route['output_tokens'] += stats['output_tokens']
+                route['wall'].merge(stats['wall'])
+        return {
+            name: {
+                **{key: value for key, value in route.items() if key != 'wall'},
+                'avg_output_tokens': round(route['output_tokens'] / route['calls'], 1) if route['calls'] else None,
+                'wall': route['wall'].to_dict()
+            }
+            for name, route in merged.items()
+        }
+
+    def flush(self):
+        """Write buffered calls to llm_call_ledger; a failed batch is put back for the next flush"""
+        if self.supabase is None:
+            return
+        while True:
+            with self._lock:
+                batch = [self._pending.popleft() for _ in range(min(LEDGER_BATCH_SIZE, len(self._pending)))]
+            if not batch:
+                return
+            try:
+                self.supabase.table('llm_call_ledger').insert(batch).execute()
+            except Exception:
+                with self._lock:
+                    self._pending.extendleft(reversed(batch))
+                raise
+
+    async def start(self, client):
+        """Start writing the ledger table when persistence is on (called from the FastAPI startup hook)"""
+        self.supabase = client
+        if self.persist and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer and write what is buffered (called from the FastAPI shutdown hook)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.persist:
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                print(f"❌ LLMLedger: Final ledger write failed: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(LEDGER_FLUSH_SECONDS)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                print(f"❌ LLMLedger: Ledger write failed, will retry: {e}")
+
+
+# Global instance for use in server.py and the interview modules
+llm_ledger = LLMLedger()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+OpenAI Stand-in for Hybrid House
+Offline replacement for the Responses API calls the interview endpoints make,
+with scripted or recorded replies and configurable latency, for benchmarking without network
+"""
+
+import os
+import re
+import json
+import math
+import time
+import uuid
+import random
+import itertools
+import threading
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional
+
+from openai import OpenAI
+
+from .interview_extractor import HYBRID_QUESTIONS, extract_interview_fields
+from .interview_router import FINISH_WORDS
+from .athlete_profile_parser import SENTINEL
+
+# Latency specs are "<distribution>:<params in ms>":
+#   fixed:300, uniform:200:900, normal:600:150 (mean, stddev), lognormal:600:0.5 (median, sigma)
+# Time to first token of every response
+DEFAULT_FIRST_TOKEN_LATENCY = 'lognormal:600:0.4'
+
+# Delay between streamed deltas (non-streamed calls wait for every delta too)
+DEFAULT_DELTA_LATENCY = 'fixed:15'
+
+# Rough characters per token for the usage numbers
+CHARS_PER_TOKEN = 4
+
+# Stored responses kept for previous_response_id; the oldest are dropped first
+MAX_STORED_RESPONSES = 100000
+
+_TOKENS = re.compile(r'\s*\S+|\s+')
+
+
+class StandInError(Exception):
+    """A request the real Responses API would reject (e.g. an unknown previous_response_id)"""
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Sampler for a latency spec, returning seconds"""
+    name, _, params = (spec or 'fixed:0').partition(':')
+    try:
+        values = [float(value) for value in params.split(':') if value]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    if name == 'fixed' and len(values) == 1:
+        return lambda: values[0] / 1000
+    if name == 'uniform' and len(values) == 2:
+        return lambda: rng.uniform(values[0], values[1]) / 1000
+    if name == 'normal' and len(values) == 2:
+        return lambda: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if name == 'lognormal' and len(values) == 2 and values[0] > 0:
+        mu = math.log(values[0])
+        return lambda: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _message_text(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    return ''.join(str(message.get('content') or '') for message in messages or [])
+
+
+def _as_messages(value) -> List[Dict]:
+    if isinstance(value, str):
+        return [{"role": "user", "content": value}]
+    return [{"role": message.get('role'), "content": message.get('content')} for message in value or []]
+
+
+def _make_response(response_id: str, model: str, text: str, input_tokens: int, cached_tokens: int):
+    """Response object with the attributes the backend reads"""
+    output_tokens = _tokens(text)
+    return SimpleNamespace(
+        id=response_id,
+        object='response',
+        model=model,
+        status='completed',
+        output=[SimpleNamespace(
+            type='message',
+            role='assistant',
+            content=[SimpleNamespace(type='output_text', text=text)]
+        )],
+        output_text=text,
+        usage=SimpleNamespace(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+            input_tokens_details=SimpleNamespace(cached_tokens=cached_tokens)
+        )
+    )
+
+
+def _fit_schema(value, schema: Dict, defs: Dict):
+    """Shape a value to a strict JSON schema: every property present, non-nullable strings non-null"""
+    if '$ref' in schema:
+        schema = defs.get(schema['$ref'].rsplit('/', 1)[-1], {})
+    if 'anyOf' in schema:
+        if value is None:
+            return None
+        schema = next((option for option in schema['anyOf'] if option.get('type') != 'null'), {})
+        if '$ref' in schema:
+            schema = defs.get(schema['$ref'].rsplit('/', 1)[-1], {})
+    if schema.get('type') == 'object':
+        value = value if isinstance(value, dict) else {}
+        return {name: _fit_schema(value.get(name), prop, defs) for name, prop in schema.get('properties', {}).items()}
+    if value is None and schema.get('type') == 'string':
+        return ''
+    return value
+
+
+class ScriptedReplies:
+    """
+    Replies generated from the transcript, following the hybrid interview script
+
+    The opening turn greets and asks for the first name, every later turn asks
+    for the next field the extractor hasn't settled, and once every field is
+    settled (or the user asks to finish) the reply is ATHLETE_PROFILE::: with
+    the extracted profile. Structured-output calls get the profile as JSON.
+    """
+
+    def reply(self, messages: List[Dict], text_format: Optional[Dict], conversation: str, turn: int) -> str:
+        extraction = extract_interview_fields(messages)
+        if text_format and text_format.get('type') == 'json_schema':
+            schema = text_format.get('schema') or {}
+            return json.dumps(_fit_schema(extraction.to_profile(), schema, schema.get('$defs', {})))
+
+        if not any(message.get('role') == 'assistant' for message in messages):
+            return f"Welcome to Hybrid House! Let's build your athlete profile. {HYBRID_QUESTIONS['first_name']}"
+
+        answer = str(messages[-1].get('content') or '').strip().lower() if messages else ''
+        missing = extraction.missing
+        if extraction.complete or answer in FINISH_WORDS or not missing:
+            return f"Great work, that's everything I need! 🎉 {SENTINEL}{json.dumps(extraction.to_profile())}"
+
+        # HRV and resting HR are asked together
+        field = 'hrv_ms' if missing[0] == 'resting_hr_bpm' and 'hrv_ms' in missing else missing[0]
+        return f"Got it. {HYBRID_QUESTIONS[field]}"
+
+
+class ReplayReplies:
+    """
+    Replies replayed from recorded transcripts (a JSONL file written by RecordingOpenAI)
+
+    Each conversation's replies are served by turn. New conversations, and
+    sessions branching off a shared response such as the cached greeting, take
+    the next recorded conversation in rotation; turns beyond the end of a
+    recording fall back to the scripted replies.
+    """
+
+    def __init__(self, path: str, fallback: ScriptedReplies):
+        conversations: Dict[str, Dict[int, str]] = defaultdict(dict)
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    conversations[record['conversation']][int(record['turn'])] = record['text']
+        if not conversations:
+            raise ValueError(f"No recorded transcripts in {path}")
+        self.conversations = list(conversations.values())
+        self.fallback = fallback
+        self._rotation = itertools.cycle(range(len(self.conversations)))
+        self._assigned: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def assign(self, conversation: str) -> int:
+        with self._lock:
+            if conversation not in self._assigned:
+                self._assigned[conversation] = next(self._rotation)
+            return self._assigned[conversation]
+
+    def reply(self, messages: List[Dict], text_format: Optional[Dict], conversation: str, turn: int) -> str:
+        if not (text_format and text_format.get('type') == 'json_schema'):
+            recorded = self.conversations[self.assign(conversation)].get(turn)
+            if recorded is not None:
+                return recorded
+        return self.fallback.reply(messages, text_format, conversation, turn)
+
+
+class _Stream:
+    """Event stream returned by responses.create(stream=True); iterable and a context manager"""
+
+    def __init__(self, events: Iterator):
+        self._events = events
+
+    def __iter__(self):
+        return self._events
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self._events.close()
+
+
+class StandInResponses:
+    """The responses.create subset the backend uses: input, instructions, prompt, previous_response_id, store, text, stream"""
+
+    def __init__(self, replies, first_token_latency: Callable[[], float], delta_latency: Callable[[], float]):
+        self.replies = replies
+        self.first_token_latency = first_token_latency
+        self.delta_latency = delta_latency
+        # response id -> {history, conversation, turn, children}
+        self._stored: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _chain(self, previous_response_id: Optional[str]) -> Optional[Dict]:
+        if not previous_response_id:
+            return None
+        with self._lock:
+            parent = self._stored.get(previous_response_id)
+            if parent is None:
+                raise StandInError(f"Previous response with id '{previous_response_id}' not found.")
+            parent['children'] += 1
+            return dict(parent)
+
+    def _store(self, response_id: str, node: Dict):
+        with self._lock:
+            if len(self._stored) >= MAX_STORED_RESPONSES:
+                self._stored.pop(next(iter(self._stored)))
+            self._stored[response_id] = node
+
+    def create(self, *, model: str, input=None, instructions: Optional[str] = None, prompt: Optional[Dict] = None,
+               previous_response_id: Optional[str] = None, store: bool = True, text: Optional[Dict] = None,
+               stream: bool = False, **params):
+        messages = _as_messages(input)
+        parent = self._chain(previous_response_id)
+        response_id = f"resp_{uuid.uuid4().hex}"
+
+        if parent is not None:
+            history = parent['history']
+            turn = parent['turn'] + 1
+            # A second branch off the same response (e.g. the shared greeting) is a new conversation
+            conversation = parent['conversation'] if parent['children'] == 1 else response_id
+        else:
+            history = []
+            # Without a chain the input is the whole transcript; each assistant message is a turn already taken
+            turn = sum(1 for message in messages if message['role'] == 'assistant')
+            conversation = response_id
+
+        # The interview endpoints resend the full transcript alongside previous_response_id
+        transcript = messages if any(m['role'] == 'assistant' for m in messages) else history + messages
+        reply = self.replies.reply(transcript, (text or {}).get('format'), conversation, turn)
+
+        prefix = _tokens(instructions or '') + (_tokens(json.dumps(prompt)) if prompt else 0)
+        cached_tokens = prefix + _tokens(_message_text(history)) if parent is not None else 0
+        input_tokens = prefix + _tokens(_message_text(history)) + _tokens(_message_text(messages))
+        response = _make_response(response_id, model, reply, input_tokens, cached_tokens)
+
+        if store:
+            self._store(response_id, {
+                'history': transcript + [{"role": "assistant", "content": reply}],
+                'conversation': conversation,
+                'turn': turn,
+                'children': 0
+            })
+
+        chunks = _TOKENS.findall(reply)
+        if stream:
+            return _Stream(self._events(response, chunks))
+        time.sleep(self.first_token_latency() + sum(self.delta_latency() for _ in chunks[1:]))
+        return response
+
+    def _events(self, response, chunks: List[str]) -> Iterator:
+        sequence = itertools.count()
+        pending = SimpleNamespace(**{**vars(response), 'status': 'in_progress', 'output': [], 'output_text': '', 'usage': None})
+        yield SimpleNamespace(type='response.created', response=pending, sequence_number=next(sequence))
+        time.sleep(self.first_token_latency())
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(self.delta_latency())
+            yield SimpleNamespace(type='response.output_text.delta', delta=chunk, output_index=0, content_index=0,
+                                  item_id=f"msg_{response.id[5:]}", sequence_number=next(sequence))
+        yield SimpleNamespace(type='response.completed', response=response, sequence_number=next(sequence))
+
+
+class StandInOpenAI:
+    """
+    Offline stand-in for the OpenAI client, exposing client.responses.create
+
+    Replies are scripted from the interview transcript, or replayed from a
+    recording when a transcripts path is given. Each response waits a sampled
+    time to first token and a sampled delay per streamed delta, blocking the
+    calling thread like the real client does, so throughput and concurrency
+    limits can be measured without network access.
+    """
+
+    def __init__(self, transcripts_path: Optional[str] = None, first_token_latency: str = DEFAULT_FIRST_TOKEN_LATENCY,
+                 delta_latency: str = DEFAULT_DELTA_LATENCY, seed: Optional[int] = None):
+        rng = random.Random(seed)
+        scripted = ScriptedReplies()
+        replies = ReplayReplies(transcripts_path, scripted) if transcripts_path else scripted
+        self.responses = StandInResponses(replies, parse_latency(first_token_latency, rng), parse_latency(delta_latency, rng))
+
+
+class _RecordingStream:
+    """Wraps a real stream, recording the streamed text when it is closed"""
+
+    def __init__(self, stream, on_close: Callable[[Optional[str], str], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._response_id: Optional[str] = None
+        self._chunks: List[str] = []
+        self._closed = False
+
+    def __iter__(self):
+        for event in self._stream:
+            if event.type in ('response.created', 'response.completed'):
+                self._response_id = event.response.id
+            elif event.type == 'response.output_text.delta' and event.output_index == 0:
+                self._chunks.append(event.delta)
+            yield event
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._stream.close()
+            self._on_close(self._response_id, ''.join(self._chunks))
+
+
+class _RecordingResponses:
+    def __init__(self, responses, path: str):
+        self._responses = responses
+        self._path = path
+        # response id -> [conversation, turn, children]
+        self._chains: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    def create(self, **params):
+        with self._lock:
+            parent = self._chains.get(params.get('previous_response_id'))
+            if parent is not None:
+                parent[2] += 1
+                # Same branching rule as the stand-in: a second child starts a new conversation
+                conversation, turn = (parent[0] if parent[2] == 1 else None), parent[1] + 1
+        if parent is None:
+            conversation = None
+            turn = sum(1 for message in _as_messages(params.get('input')) if message['role'] == 'assistant')
+        # Structured-output calls aren't interview turns
+        is_turn = ((params.get('text') or {}).get('format') or {}).get('type') != 'json_schema'
+
+        def record(response_id: Optional[str], text: str):
+            if not response_id or not is_turn:
+                return
+            with self._lock:
+                self._chains[response_id] = [conversation or response_id, turn, 0]
+                with open(self._path, 'a', encoding='utf-8') as file:
+                    file.write(json.dumps({
+                        'conversation': conversation or response_id,
+                        'turn': turn,
+                        'model': params.get('model'),
+                        'text': text
+                    }) + '\n')
+
+        if params.get('stream'):
+            return _RecordingStream(self._responses.create(**params), record)
+        response = self._responses.create(**params)
+        record(response.id, getattr(response, 'output_text', '') or '')
+        return response
+
+
+class RecordingOpenAI:
+    """Wraps the real OpenAI client and appends every interview reply to a transcripts file for replay"""
+
+    def __init__(self, client, path: str):
+        self._client = client
+        self.responses = _RecordingResponses(client.responses, path)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def create_openai_client(api_key: Optional[str]):
+    """
+    The OpenAI client server.py uses, chosen by environment variable
+
+    OPENAI_STANDIN=scripted    scripted offline replies
+    OPENAI_STANDIN=replay      replies from OPENAI_STANDIN_TRANSCRIPTS
+    OPENAI_STANDIN_RECORD=path the real client, recording replies to path
+
+    Offline latency comes from OPENAI_STANDIN_FIRST_TOKEN_LATENCY and
+    OPENAI_STANDIN_DELTA_LATENCY (see parse_latency), seeded by OPENAI_STANDIN_SEED.
+    """
+    mode = os.environ.get('OPENAI_STANDIN', '').lower()
+    if mode in ('scripted', 'replay'):
+        transcripts_path = os.environ.get('OPENAI_STANDIN_TRANSCRIPTS') if mode == 'replay' else None
+        if mode == 'replay' and not transcripts_path:
+            raise ValueError("OPENAI_STANDIN=replay needs OPENAI_STANDIN_TRANSCRIPTS")
+        seed = os.environ.get('OPENAI_STANDIN_SEED')
+        client = StandInOpenAI(
+            transcripts_path,
+            first_token_latency=os.environ.get('OPENAI_STANDIN_FIRST_TOKEN_LATENCY', DEFAULT_FIRST_TOKEN_LATENCY),
+            delta_latency=os.environ.get('OPENAI_STANDIN_DELTA_LATENCY', DEFAULT_DELTA_LATENCY),
+            seed=int(seed) if seed else None
+        )
+        print(f"⚠️  OpenAI stand-in active ({mode}): interview replies are generated offline")
+        return client
+    if mode:
+        raise ValueError(f"Unknown OPENAI_STANDIN mode: {mode}")
+
+    client = OpenAI(api_key=api_key)
+    record_path = os.environ.get('OPENAI_STANDIN_RECORD')
+    if record_path:
+        print(f"🔧 Recording interview replies to {record_path}")
+        return RecordingOpenAI(client, record_path)
+    return client
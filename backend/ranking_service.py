@@ -5,17 +5,33 @@ Handles all ranking calculations and leaderboard logic
 """
 
 import os
-from typing import Dict, List, Optional, Tuple
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, date
-from supabase import create_client, Client
+from supabase import Client
 import json
 from dotenv import load_dotenv
 from pathlib import Path
+from .leaderboard_snapshot import LeaderboardSnapshot, get_segment_key
+from .snapshot_store import SharedSnapshotStore
+from .leaderboard_changes import SnapshotChangeLog
+from .supabase_standin import create_supabase_client, standin_enabled
 
 # Load environment variables from the backend directory
 backend_dir = Path(__file__).parent
 load_dotenv(backend_dir / '.env')
 
+# How long a built leaderboard snapshot is reused before the next rebuild
+SNAPSHOT_TTL_SECONDS = float(os.environ.get('LEADERBOARD_SNAPSHOT_TTL_SECONDS', '60'))
+
+# Memory-mapped snapshot file shared by all workers on this host (unset = per-process snapshot)
+SHARED_SNAPSHOT_PATH = os.environ.get('LEADERBOARD_SNAPSHOT_PATH')
+
+# Default rank-target projections: next rank up, top 10, and the 90th percentile
+DEFAULT_TARGET_RANKS = [10]
+DEFAULT_TARGET_PERCENTILES = [90.0]
+
 class RankingService:
     def __init__(self):
         # Initialize Supabase client using the same environment variables as server.py
@@ -25,9 +41,9 @@ class RankingService:
         print(f"🔧 RankingService init - URL exists: {bool(supabase_url)}")
         print(f"🔧 RankingService init - Key exists: {bool(supabase_key)}")
         
-        if supabase_url and supabase_key:
+        if (supabase_url and supabase_key) or standin_enabled():
             try:
-                self.supabase: Client = create_client(supabase_url, supabase_key)
+                self.supabase: Client = create_supabase_client(supabase_url, supabase_key)
                 print("✅ RankingService: Supabase client initialized successfully")
             except Exception as e:
                 print(f"❌ RankingService: Failed to create Supabase client: {e}")
@@ -35,6 +51,44 @@ class RankingService:
         else:
             print(f"❌ RankingService: Missing environment variables - URL: {bool(supabase_url)}, Key: {bool(supabase_key)}")
             self.supabase = None
+        
+        # Cached leaderboard snapshot (sorted score index), rebuilt after SNAPSHOT_TTL_SECONDS
+        self._snapshot: Optional[LeaderboardSnapshot] = None
+        self._snapshot_built_at = 0.0
+        self._snapshot_version = 0
+        self._snapshot_lock = threading.Lock()
+        # Held for the whole cold build, so concurrent first callers wait for one build
+        self._cold_build_lock = threading.Lock()
+        
+        # Set by the background refresher; when present, stale snapshots are served
+        # while the refresher rebuilds instead of rebuilding on the request path
+        self.refresh_callback: Optional[Callable[..., None]] = None
+        
+        # Cross-worker snapshot file; one worker builds, the others map it read-only
+        self.shared_store = SharedSnapshotStore(SHARED_SNAPSHOT_PATH) if SHARED_SNAPSHOT_PATH else None
+        
+        # Recent snapshot diffs for /leaderboard/changes delta sync
+        self.change_log = SnapshotChangeLog()
+        
+        # Called with each new diff (e.g. the SSE stream); must be cheap and thread-safe
+        self.diff_listeners: List[Callable[[Dict], None]] = []
+    
+    def calculate_age(self, date_of_birth: Optional[str]) -> Optional[int]:
+        """Calculate age in years from a YYYY-MM-DD or ISO datetime string"""
+        if not date_of_birth:
+            return None
+        try:
+            # Handle both date and datetime formats
+            if 'T' in date_of_birth:
+                birth_date = datetime.fromisoformat(date_of_birth.replace('Z', '+00:00')).date()
+            else:
+                birth_date = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
+            
+            today = date.today()
+            return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+        except (ValueError, TypeError) as e:
+            print(f"⚠️  Could not parse date_of_birth '{date_of_birth}': {e}")
+            return None
     
     def get_country_flag(self, country: str) -> str:
         """Get country flag emoji for a given country name"""
@@ -61,34 +115,84 @@ class RankingService:
         }
         return country_flags.get(country, country)
     
-    def get_public_leaderboard_data(self) -> List[Dict]:
-        """Get all public profiles with complete scores for leaderboard"""
+    def _public_profiles_query(self):
+        """Query builder for public athlete profiles with scores, joined to their user profiles"""
         if not self.supabase:
             raise Exception("Supabase client not initialized")
         
+        # Updated query to work with normalized structure (no personal data in athlete_profiles)
+        return self.supabase.table('athlete_profiles')\
+            .select('''
+                *,
+                user_profiles!inner(
+                    user_id,
+                    name,
+                    display_name,
+                    email,
+                    date_of_birth,
+                    gender,
+                    country,
+                    height_in,
+                    weight_lb,
+                    wearables
+                )
+            ''')\
+            .eq('is_public', True)\
+            .not_.is_('hybrid_score', 'null')\
+            .order('hybrid_score', desc=True)
+    
+    def build_leaderboard_entry(self, profile: Dict) -> Optional[Dict]:
+        """Format an athlete_profiles row (joined with user_profiles) as a leaderboard entry"""
+        # Get user profile data from the joined table
+        user_profile = profile.get('user_profiles')
+        if not user_profile:
+            print(f"⚠️  No user_profiles data for athlete profile {profile.get('id')}")
+            return None
+        
+        # Calculate age from date_of_birth
+        age = self.calculate_age(user_profile.get('date_of_birth'))
+        
+        # Get country flag
+        country = user_profile.get('country')
+        country_flag = self.get_country_flag(country) if country else None
+        
+        # Extract score data
+        score_data = profile.get('score_data', {}) or {}
+        hybrid_score = profile.get('hybrid_score', 0)
+        
+        # Use display_name, fallback to name, fallback to email prefix
+        display_name = (
+            user_profile.get('display_name') or 
+            user_profile.get('name') or 
+            (user_profile.get('email', '').split('@')[0] if user_profile.get('email') else 'Anonymous')
+        )
+        
+        return {
+            'profile_id': profile.get('id'),
+            'user_id': profile.get('user_id'),
+            'display_name': display_name,
+            'score': hybrid_score,
+            'age': age,
+            'gender': user_profile.get('gender'),
+            'country': country,
+            'country_flag': country_flag,
+            'created_at': profile.get('created_at'),
+            'score_breakdown': {
+                'strengthScore': score_data.get('strengthScore') or profile.get('strength_score'),
+                'speedScore': score_data.get('speedScore') or profile.get('speed_score'),
+                'vo2Score': score_data.get('vo2Score') or profile.get('vo2_score'),
+                'distanceScore': score_data.get('distanceScore') or profile.get('distance_score'),
+                'volumeScore': score_data.get('volumeScore') or profile.get('volume_score'),
+                'recoveryScore': score_data.get('recoveryScore') or profile.get('recovery_score'),
+                'enduranceScore': score_data.get('enduranceScore') or profile.get('endurance_score')
+            }
+        }
+    
+    def get_public_leaderboard_data(self) -> List[Dict]:
+        """Get all public profiles with complete scores for leaderboard"""
         try:
             # Get all public athlete profiles with their linked user profiles
-            # Updated query to work with normalized structure (no personal data in athlete_profiles)
-            profiles_response = self.supabase.table('athlete_profiles')\
-                .select('''
-                    *,
-                    user_profiles!inner(
-                        user_id,
-                        name,
-                        display_name,
-                        email,
-                        date_of_birth,
-                        gender,
-                        country,
-                        height_in,
-                        weight_lb,
-                        wearables
-                    )
-                ''')\
-                .eq('is_public', True)\
-                .not_.is_('hybrid_score', 'null')\
-                .order('hybrid_score', desc=True)\
-                .execute()
+            profiles_response = self._public_profiles_query().execute()
             
             if not profiles_response.data:
                 print("⚠️  No public profiles found")
@@ -106,65 +210,9 @@ class RankingService:
                     
                 seen_users.add(user_id)
                 
-                # Get user profile data from the joined table
-                user_profile = profile.get('user_profiles')
-                if not user_profile:
-                    print(f"⚠️  No user_profiles data for athlete profile {profile.get('id')}")
-                    continue
-                
-                # Calculate age from date_of_birth
-                age = None
-                if user_profile.get('date_of_birth'):
-                    try:
-                        birth_date_str = user_profile['date_of_birth']
-                        # Handle both date and datetime formats
-                        if 'T' in birth_date_str:
-                            birth_date = datetime.fromisoformat(birth_date_str.replace('Z', '+00:00')).date()
-                        else:
-                            birth_date = datetime.strptime(birth_date_str, '%Y-%m-%d').date()
-                        
-                        today = date.today()
-                        age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-                    except (ValueError, TypeError) as e:
-                        print(f"⚠️  Could not parse date_of_birth '{user_profile.get('date_of_birth')}': {e}")
-                
-                # Get country flag
-                country = user_profile.get('country')
-                country_flag = self.get_country_flag(country) if country else None
-                
-                # Extract score data
-                score_data = profile.get('score_data', {}) or {}
-                hybrid_score = profile.get('hybrid_score', 0)
-                
-                # Use display_name, fallback to name, fallback to email prefix
-                display_name = (
-                    user_profile.get('display_name') or 
-                    user_profile.get('name') or 
-                    (user_profile.get('email', '').split('@')[0] if user_profile.get('email') else 'Anonymous')
-                )
-                
-                leaderboard_entry = {
-                    'profile_id': profile.get('id'),
-                    'user_id': user_id,
-                    'display_name': display_name,
-                    'score': hybrid_score,
-                    'age': age,
-                    'gender': user_profile.get('gender'),
-                    'country': country,
-                    'country_flag': country_flag,
-                    'created_at': profile.get('created_at'),
-                    'score_breakdown': {
-                        'strengthScore': score_data.get('strengthScore') or profile.get('strength_score'),
-                        'speedScore': score_data.get('speedScore') or profile.get('speed_score'),
-                        'vo2Score': score_data.get('vo2Score') or profile.get('vo2_score'),
-                        'distanceScore': score_data.get('distanceScore') or profile.get('distance_score'),
-                        'volumeScore': score_data.get('volumeScore') or profile.get('volume_score'),
-                        'recoveryScore': score_data.get('recoveryScore') or profile.get('recovery_score'),
-                        'enduranceScore': score_data.get('enduranceScore') or profile.get('endurance_score')
-                    }
-                }
-                
-                leaderboard_data.append(leaderboard_entry)
+                leaderboard_entry = self.build_leaderboard_entry(profile)
+                if leaderboard_entry:
+                    leaderboard_data.append(leaderboard_entry)
             
             print(f"✅ Successfully processed {len(leaderboard_data)} unique leaderboard entries")
             return leaderboard_data
@@ -173,6 +221,374 @@ class RankingService:
             print(f"❌ Error fetching leaderboard data: {str(e)}")
             raise
     
+    def get_user_leaderboard_entry(self, user_id: str) -> Optional[Dict]:
+        """Get a single user's leaderboard entry (their best public score), None if not on the board"""
+        profiles_response = self._public_profiles_query().eq('user_id', user_id).limit(1).execute()
+        if not profiles_response.data:
+            return None
+        return self.build_leaderboard_entry(profiles_response.data[0])
+    
+    def apply_user_change(self, user_id: str) -> Optional[LeaderboardSnapshot]:
+        """
+        Incrementally patch the snapshot after a user's scores, privacy or profile changed
+        
+        Re-reads only that user's best public entry and swaps in a patched copy of
+        the current snapshot, so long TTLs don't serve stale ranks. Returns the
+        patched snapshot, or None if there was nothing to patch yet.
+        """
+        if self._snapshot is None:
+            return None
+        
+        entry = self.get_user_leaderboard_entry(user_id)
+        
+        with self._snapshot_lock:
+            current = self._snapshot
+            # Keep the original build time so the scheduled full rebuild still happens
+            patched = self._install_snapshot(
+                lambda version: current.with_user_entry(user_id, entry, version=version)
+            )
+        if patched is None:
+            return None
+        
+        print(f"✅ Patched leaderboard snapshot v{patched.version} for user {user_id}")
+        return patched
+    
+    def _install_snapshot(self, make_snapshot: Callable[[int], LeaderboardSnapshot]) -> Optional[LeaderboardSnapshot]:
+        """
+        Allocate the next version, build the snapshot for it and swap it in (caller holds _snapshot_lock)
+        
+        In shared mode the version is taken and the file published under the
+        store's publish lock, so two workers never publish the same version.
+        Returns None if the store refused the snapshot.
+        """
+        if not self.shared_store:
+            self._snapshot_version += 1
+            snapshot = make_snapshot(self._snapshot_version)
+            self._swap_snapshot(snapshot)
+            return snapshot
+        
+        with self.shared_store.publish_lock():
+            # Keep versions increasing across workers
+            self._snapshot_version = max(self._snapshot_version, self.shared_store.published_version()) + 1
+            snapshot = make_snapshot(self._snapshot_version)
+            if not self.shared_store.publish(snapshot):
+                return None
+        self._swap_snapshot(snapshot)
+        return snapshot
+    
+    def _swap_snapshot(self, snapshot: LeaderboardSnapshot):
+        """Install a new snapshot (caller holds _snapshot_lock) and record its diff for delta sync"""
+        previous = self._snapshot
+        # Readers holding the previous snapshot keep using it; the swap is a single assignment
+        self._snapshot = snapshot
+        diff = self.change_log.record(previous, snapshot)
+        if diff:
+            for listener in self.diff_listeners:
+                try:
+                    listener(diff)
+                except Exception as e:
+                    print(f"❌ RankingService: Diff listener failed: {e}")
+    
+    def get_leaderboard_changes(self, since: int) -> Dict:
+        """Inserted/updated/removed entries and rank shifts since a snapshot version (see SnapshotChangeLog)"""
+        return self.change_log.changes_since(since, self.get_snapshot())
+    
+    def is_snapshot_stale(self) -> bool:
+        """Whether the cached snapshot is missing or older than SNAPSHOT_TTL_SECONDS"""
+        return self._snapshot is None or time.monotonic() - self._snapshot_built_at > SNAPSHOT_TTL_SECONDS
+    
+    def rebuild_snapshot(self) -> LeaderboardSnapshot:
+        """Build a fresh leaderboard snapshot and swap it in for new readers (publishing it when shared)"""
+        with self._snapshot_lock:
+            leaderboard_data = self.get_public_leaderboard_data()
+            snapshot = self._install_snapshot(
+                lambda version: LeaderboardSnapshot(leaderboard_data, version=version)
+            )
+            if snapshot is None:
+                return self._snapshot
+            self._snapshot_built_at = time.monotonic()
+            print(f"✅ Built leaderboard snapshot v{snapshot.version} with {len(snapshot)} entries")
+            return snapshot
+    
+    def _adopt_shared_snapshot(self) -> bool:
+        """Swap in a newer snapshot published by another worker, if any"""
+        snapshot = self.shared_store.load_if_changed()
+        if not snapshot or (self._snapshot and snapshot.version <= self._snapshot.version):
+            return False
+        
+        with self._snapshot_lock:
+            self._snapshot_version = max(self._snapshot_version, snapshot.version)
+            self._swap_snapshot(snapshot)
+            self._snapshot_built_at = time.monotonic() - (self.shared_store.published_age() or 0)
+        return True
+    
+    def refresh_snapshot(self, force: bool = False) -> Optional[LeaderboardSnapshot]:
+        """
+        Refresh entry point for the background refresher
+        
+        Per-process mode always rebuilds. In shared mode, a newer published
+        snapshot is adopted first, and only the worker holding the build lock
+        rebuilds - when forced or once the published snapshot is older than
+        SNAPSHOT_TTL_SECONDS.
+        """
+        if not self.shared_store:
+            return self.rebuild_snapshot()
+        
+        self._adopt_shared_snapshot()
+        
+        def published_is_stale() -> bool:
+            age = self.shared_store.published_age()
+            return age is None or age > SNAPSHOT_TTL_SECONDS
+        
+        if force or published_is_stale():
+            with self.shared_store.build_lock() as acquired:
+                # Re-check under the lock: another worker may have just published
+                if acquired and (force or published_is_stale()):
+                    return self.rebuild_snapshot()
+            self._adopt_shared_snapshot()
+        
+        return self._snapshot
+    
+    def get_snapshot(self) -> LeaderboardSnapshot:
+        """
+        Get the cached leaderboard snapshot
+        
+        With a background refresher attached, a stale snapshot is returned as-is
+        and a rebuild is requested (stale-while-revalidate). Without one, the
+        snapshot is rebuilt inline once the TTL has expired. Only a cold start
+        with no snapshot at all builds on the request path.
+        """
+        snapshot = self._snapshot
+        if snapshot is None and self.shared_store:
+            self._adopt_shared_snapshot()
+            snapshot = self._snapshot
+        if snapshot is None:
+            with self._cold_build_lock:
+                # Another caller may have finished the cold build while we waited
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = self.rebuild_snapshot()
+            return snapshot
+        
+        if self.is_snapshot_stale():
+            if self.refresh_callback:
+                self.refresh_callback()
+            else:
+                return self.rebuild_snapshot()
+        
+        return snapshot
+    
+    def get_profile_score_contexts(self, profile_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Resolve hybrid scores and segments for many profiles against one snapshot
+        
+        Public leaderboard entries are answered from the snapshot; the remaining
+        profiles (private, or not the user's best score) are fetched with a single
+        `in_` query on athlete_profiles.
+        
+        Returns:
+            Dict of profile_id -> context (profile_id, score, segment, on_leaderboard).
+            Profiles that do not exist are omitted.
+        """
+        snapshot = self.get_snapshot()
+        contexts = {}
+        missing_ids = []
+        
+        for profile_id in profile_ids:
+            entry = snapshot.by_profile_id.get(profile_id)
+            if entry:
+                contexts[profile_id] = {
+                    'profile_id': profile_id,
+                    'score': entry['score'],
+                    'segment': entry['segment'],
+                    'on_leaderboard': True
+                }
+            elif profile_id not in missing_ids:
+                missing_ids.append(profile_id)
+        
+        if not missing_ids:
+            return contexts
+        
+        if not self.supabase:
+            raise Exception("Supabase client not initialized")
+        
+        profiles_response = self.supabase.table('athlete_profiles')\
+            .select('id, hybrid_score, score_data, user_profiles(gender, date_of_birth)')\
+            .in_('id', missing_ids)\
+            .execute()
+        
+        for profile in profiles_response.data or []:
+            score_data = profile.get('score_data') or {}
+            user_profile = profile.get('user_profiles') or {}
+            contexts[profile['id']] = {
+                'profile_id': profile['id'],
+                'score': score_data.get('hybridScore') or profile.get('hybrid_score'),
+                'segment': get_segment_key(
+                    user_profile.get('gender'),
+                    self.calculate_age(user_profile.get('date_of_birth'))
+                ),
+                'on_leaderboard': False
+            }
+        
+        return contexts
+    
+    def get_profile_score_context(self, profile_id: str) -> Optional[Dict]:
+        """Resolve a single profile's score context, None if the profile does not exist"""
+        return self.get_profile_score_contexts([profile_id]).get(profile_id)
+    
+    def get_score_ranking(self, user_score: float, on_leaderboard: bool = False,
+                          snapshot: Optional[LeaderboardSnapshot] = None) -> Dict:
+        """
+        Position, total and percentile of a score on the public leaderboard
+        
+        Scores not on the leaderboard are ranked hypothetically, counting the
+        user in the total. The percentile is the snapshot's (share of scores
+        strictly below), the same one the rank-targets response reports.
+        """
+        snapshot = snapshot or self.get_snapshot()
+        total = len(snapshot) if on_leaderboard else len(snapshot) + 1
+        
+        return {
+            'position': snapshot.rank_for_score(user_score),
+            'total_athletes': total,
+            'percentile': snapshot.percentile_for_score(user_score)
+        }
+    
+    def get_batch_rankings(self, profile_ids: List[str], scores: List[float]) -> Dict:
+        """
+        Rank many profiles and raw scores against a single leaderboard snapshot
+        
+        Returns:
+            Dict with per-profile rankings, per-score rankings, ids that were not
+            found or have no score, and the snapshot version used
+        """
+        snapshot = self.get_snapshot()
+        contexts = self.get_profile_score_contexts(profile_ids) if profile_ids else {}
+        
+        profile_rankings = []
+        not_found = []
+        unscored = []
+        for profile_id in profile_ids:
+            context = contexts.get(profile_id)
+            if not context:
+                not_found.append(profile_id)
+                continue
+            if not context['score']:
+                unscored.append(profile_id)
+                continue
+            profile_rankings.append({
+                'profile_id': profile_id,
+                'hybrid_score': context['score'],
+                'on_leaderboard': context['on_leaderboard'],
+                'ranking': self.get_score_ranking(context['score'], context['on_leaderboard'], snapshot)
+            })
+        
+        score_rankings = [
+            {
+                'hybrid_score': score,
+                'ranking': self.get_score_ranking(score, snapshot=snapshot)
+            }
+            for score in scores
+        ]
+        
+        return {
+            'snapshot_version': snapshot.version,
+            'rankings': profile_rankings,
+            'score_rankings': score_rankings,
+            'not_found': not_found,
+            'unscored': unscored
+        }
+    
+    def _build_rank_target(self, snapshot: LeaderboardSnapshot, label: str, target_rank: int,
+                           user_score: float, segment: Optional[str]) -> Dict:
+        """Score threshold at a target rank and the points needed to reach it"""
+        threshold = snapshot.score_at_rank(target_rank, segment)
+        if threshold is None:
+            # Fewer athletes than the target rank - any score already qualifies
+            return {
+                'label': label,
+                'rank': target_rank,
+                'score_threshold': None,
+                'points_needed': 0,
+                'achieved': True
+            }
+        
+        return {
+            'label': label,
+            'rank': target_rank,
+            'score_threshold': threshold,
+            'points_needed': round(max(0, threshold - user_score), 2),
+            'achieved': user_score >= threshold
+        }
+    
+    def _build_leaderboard_targets(self, snapshot: LeaderboardSnapshot, user_score: float,
+                                   on_leaderboard: bool, ranks: List[int], percentiles: List[float],
+                                   segment: Optional[str] = None) -> Dict:
+        """Current standing plus rank/percentile targets on the global or a segment leaderboard"""
+        position = snapshot.rank_for_score(user_score, segment)
+        targets = []
+        
+        # Next rank up: tie the closest athlete above to take their rank
+        next_score = snapshot.next_score_above(user_score, segment)
+        if next_score is not None:
+            targets.append({
+                'label': 'next_rank',
+                'rank': snapshot.rank_for_score(next_score, segment),
+                'score_threshold': next_score,
+                'points_needed': round(next_score - user_score, 2),
+                'achieved': False
+            })
+        
+        for target_rank in ranks:
+            targets.append(self._build_rank_target(snapshot, f"top_{target_rank}", target_rank, user_score, segment))
+        
+        for percentile in percentiles:
+            target_rank = snapshot.rank_for_percentile(percentile, segment)
+            if target_rank is None:
+                continue
+            targets.append(self._build_rank_target(snapshot, f"p{percentile:g}", target_rank, user_score, segment))
+        
+        total = snapshot.total(segment)
+        return {
+            'segment': segment,
+            'position': position,
+            'total_athletes': total if on_leaderboard else total + 1,
+            'percentile': snapshot.percentile_for_score(user_score, segment),
+            'targets': targets
+        }
+    
+    def get_rank_targets(self, context: Dict, ranks: Optional[List[int]] = None,
+                         percentiles: Optional[List[float]] = None) -> Dict:
+        """
+        Project the score needed to reach target ranks and percentiles
+        
+        Args:
+            context: Profile score context from get_profile_score_context
+            ranks: Target ranks (e.g. [1, 10]); defaults to DEFAULT_TARGET_RANKS
+            percentiles: Target percentiles (e.g. [90]); defaults to DEFAULT_TARGET_PERCENTILES
+            
+        Returns:
+            Dict with global and segment standings, each with its list of targets
+        """
+        snapshot = self.get_snapshot()
+        ranks = ranks or DEFAULT_TARGET_RANKS
+        percentiles = percentiles or DEFAULT_TARGET_PERCENTILES
+        user_score = context['score']
+        
+        segment_targets = None
+        if context.get('segment'):
+            segment_targets = self._build_leaderboard_targets(
+                snapshot, user_score, context['on_leaderboard'], ranks, percentiles, context['segment']
+            )
+        
+        return {
+            'snapshot_version': snapshot.version,
+            'global': self._build_leaderboard_targets(
+                snapshot, user_score, context['on_leaderboard'], ranks, percentiles
+            ),
+            'segment': segment_targets
+        }
+    
     def calculate_hybrid_ranking(self, user_score: float, user_profile_id: str) -> Tuple[Optional[int], int]:
         """
         Calculate where user ranks among all public profiles
@@ -183,66 +599,47 @@ class RankingService:
             - total_athletes: Total number of athletes to compare against
         """
         try:
-            leaderboard_data = self.get_public_leaderboard_data()
-            
-            # Check if user is on public leaderboard
-            user_position = None
-            for i, entry in enumerate(leaderboard_data):
-                if entry['profile_id'] == user_profile_id:
-                    user_position = entry['rank']
-                    break
-            
-            if user_position is not None:
-                # User is on public leaderboard - return actual position
-                return user_position, len(leaderboard_data)
-            else:
-                # User is not on public leaderboard (private profile)
-                # Calculate hypothetical position
-                hypothetical_position = 1
-                for entry in leaderboard_data:
-                    if entry['score'] > user_score:
-                        hypothetical_position += 1
-                    else:
-                        break  # Since leaderboard is sorted, we can break early
-                
-                # Return hypothetical position with total including the user
-                return hypothetical_position, len(leaderboard_data) + 1
+            snapshot = self.get_snapshot()
+            on_leaderboard = user_profile_id in snapshot.by_profile_id
+            ranking = self.get_score_ranking(user_score, on_leaderboard, snapshot)
+            return ranking['position'], ranking['total_athletes']
                 
         except Exception as e:
             print(f"Error calculating hybrid ranking: {str(e)}")
             return None, 0
     
-    def get_leaderboard_stats(self) -> Dict:
+    def get_leaderboard_stats(self, snapshot: Optional[LeaderboardSnapshot] = None) -> Dict:
         """Get comprehensive leaderboard statistics"""
         try:
-            leaderboard_data = self.get_public_leaderboard_data()
+            snapshot = snapshot or self.get_snapshot()
             
-            if not leaderboard_data:
+            if not len(snapshot):
                 return {
                     'total_public_athletes': 0,
                     'score_range': {'min': 0, 'max': 0},
                     'avg_score': 0,
                     'percentile_breakpoints': {},
-                    'last_updated': datetime.utcnow().isoformat()
+                    'last_updated': snapshot.built_at
                 }
             
-            scores = [entry['score'] for entry in leaderboard_data]
+            # Ascending score column; no entries need decoding
+            scores = snapshot.scores()
             
-            # Calculate percentiles
+            # Calculate percentiles (indexed from the highest score, as the leaderboard is ordered)
             percentiles = {}
             for p in [25, 50, 75, 90, 95]:
                 index = int((p / 100) * (len(scores) - 1))
-                percentiles[f'p{p}'] = scores[index]
+                percentiles[f'p{p}'] = scores[len(scores) - 1 - index]
             
             return {
-                'total_public_athletes': len(leaderboard_data),
+                'total_public_athletes': len(snapshot),
                 'score_range': {
-                    'min': min(scores),
-                    'max': max(scores)
+                    'min': scores[0],
+                    'max': scores[-1]
                 },
                 'avg_score': sum(scores) / len(scores),
                 'percentile_breakpoints': percentiles,
-                'last_updated': datetime.utcnow().isoformat()
+                'last_updated': snapshot.built_at
             }
             
         except Exception as e:
@@ -280,19 +677,12 @@ class RankingService:
     def get_user_percentile(self, user_score: float) -> Optional[float]:
         """Calculate what percentile the user's score represents"""
         try:
-            leaderboard_data = self.get_public_leaderboard_data()
+            snapshot = self.get_snapshot()
             
-            if not leaderboard_data:
+            if not len(snapshot):
                 return None
-                
-            scores = [entry['score'] for entry in leaderboard_data]
-            scores.append(user_score)  # Add user's score
-            scores.sort(reverse=True)  # Sort highest to lowest
-            
-            user_position = scores.index(user_score) + 1
-            percentile = ((len(scores) - user_position) / len(scores)) * 100
             
-            return round(percentile, 1)
+            return self.get_score_ranking(user_score, snapshot=snapshot)['percentile']
             
         except Exception as e:
             print(f"Error calculating user percentile: {str(e)}")
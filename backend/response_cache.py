@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Encoded Response Cache for Hybrid House
+Pre-serialized, pre-compressed JSON bodies with strong ETags, keyed by snapshot version
+"""
+
+import os
+import gzip
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Cache-Control sent with cached JSON bodies
+RESPONSE_CACHE_CONTROL = os.environ.get('LEADERBOARD_CACHE_CONTROL', 'public, max-age=15, stale-while-revalidate=60')
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+
+def _accepted_encodings(request: Request) -> set:
+    """Content codings the client accepts (q=0 entries excluded)"""
+    accepted = set()
+    for part in request.headers.get('accept-encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.lower())
+    return accepted
+
+
+class EncodedBody:
+    """One serialized JSON body plus lazily built gzip/brotli variants"""
+
+    def __init__(self, payload: Any):
+        self.raw = orjson.dumps(payload, default=str)
+        self.tag = hashlib.blake2b(self.raw, digest_size=12).hexdigest()
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """Strong ETag; each content coding gets its own validator"""
+        return f'"{self.tag}-{encoding}"' if encoding else f'"{self.tag}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header names any variant of this body"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        for candidate in if_none_match.split(','):
+            candidate = candidate.strip()
+            if candidate.startswith('W/'):
+                candidate = candidate[2:]
+            if candidate.strip('"').split('-')[0] == self.tag:
+                return True
+        return False
+
+    def variant(self, encoding: Optional[str]) -> bytes:
+        """Body bytes for a content coding (None = identity)"""
+        if encoding is None:
+            return self.raw
+        with self._lock:
+            if encoding not in self._variants:
+                if encoding == 'br':
+                    self._variants[encoding] = brotli.compress(self.raw, quality=9)
+                else:
+                    self._variants[encoding] = gzip.compress(self.raw, compresslevel=6)
+            return self._variants[encoding]
+
+    def to_response(self, request: Request, cache_control: str = RESPONSE_CACHE_CONTROL) -> Response:
+        """304 if the client's validator matches, else the best-compressed cached body"""
+        headers = {
+            'Cache-Control': cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+
+        encoding = None
+        if len(self.raw) >= MIN_COMPRESS_BYTES:
+            accepted = _accepted_encodings(request)
+            if brotli is not None and 'br' in accepted:
+                encoding = 'br'
+            elif 'gzip' in accepted:
+                encoding = 'gzip'
+
+        headers['ETag'] = self.etag(encoding)
+
+        if self.matches(request.headers.get('if-none-match')):
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(content=self.variant(encoding), media_type='application/json', headers=headers)
+
+
+class ResponseCache:
+    """
+    Encoded bodies keyed by (cache key, snapshot version).
+
+    Only the latest version per key is kept; a new snapshot version simply
+    replaces the entry on the next request.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, EncodedBody]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: int, build_payload: Callable[[], Any]) -> EncodedBody:
+        """Cached body for key at version, serializing build_payload() on a miss"""
+        cached = self._entries.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        body = EncodedBody(build_payload())
+        with self._lock:
+            current = self._entries.get(key)
+            # Never replace a newer version with an older one
+            if not current or current[0] <= version:
+                self._entries[key] = (version, body)
+        return body
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Global instance for use in server.py
+response_cache = ResponseCache()
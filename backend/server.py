@@ -1,19 +1,43 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Header, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import Client
 from jose import jwt, JWTError
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable
 from emergentintegrations.llm.chat import LlmChat, UserMessage
-from openai import OpenAI
 from .ranking_service import ranking_service
+from .snapshot_refresher import snapshot_refresher
+from .invalidation_bus import invalidation_bus, postgres_listener
+from .response_cache import EncodedBody, response_cache
+from .leaderboard_stream import leaderboard_stream
+from .leaderboard_search import search_index_cache
+from .leaderboard_facets import leaderboard_facets
+from .conditional_get import ConditionalRequest
+from .interview_sessions import InterviewSessionStore, SessionVersionConflict, load_session_messages
+from .session_sweeper import InterviewSessionSweeper
+from .interview_greetings import GreetingCache
+from .athlete_profile_parser import (
+    AthleteProfileStreamParser, ProfileParseError, parse_athlete_profile, profile_response_format, validate_profile
+)
+from .interview_router import FAST_MODEL, LARGE_MODEL, ROUTING_ENABLED, RouteDecision, route_turn
+from .llm_ledger import llm_ledger
+from .openai_standin import create_openai_client
+from .supabase_standin import create_supabase_client
+from .interview_extractor import (
+    safe_int, safe_decimal, convert_time_to_seconds, extract_weight_from_object,
+    extract_interview_fields, local_reply
+)
 import os
 import uuid
 import json
+import time
+import hmac
 import asyncio
+import threading
+from contextlib import aclosing
 from datetime import datetime
 import requests
 from PIL import Image
@@ -31,13 +55,29 @@ SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')
 SUPABASE_JWT_SECRET = os.environ.get('SUPABASE_JWT_SECRET')
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+
+# Users who may read the internal metrics endpoints (comma-separated user ids), besides
+# users whose Supabase app_metadata role is "admin"
+ADMIN_USER_IDS = {user_id.strip() for user_id in os.environ.get('ADMIN_USER_IDS', '').split(',') if user_id.strip()}
+
+# Shared secret internal callers (monitoring, load tests) send as X-Internal-Token instead of a user token
+INTERNAL_API_TOKEN = os.environ.get('INTERNAL_API_TOKEN')
 WEBHOOK_URL = "https://wavewisdom.app.n8n.cloud/webhook/b820bc30-989d-4c9b-9b0d-78b89b19b42c"
 
-# OpenAI client for Responses API
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# OpenAI client for Responses API (OPENAI_STANDIN selects an offline stand-in for benchmarks)
+openai_client = create_openai_client(OPENAI_API_KEY)
+
+# Supabase client with service key for backend operations (SUPABASE_STANDIN=memory selects in-memory tables)
+supabase: Client = create_supabase_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+# Active interview sessions served from memory; messages are written behind
+interview_session_store = InterviewSessionStore(supabase)
+
+# Deletes superseded and abandoned interview sessions in the background
+interview_session_sweeper = InterviewSessionSweeper(supabase, interview_session_store)
 
-# Supabase client with service key for backend operations
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# Opening interview messages, generated once per prompt and shared by every new session
+interview_greetings = GreetingCache(openai_client)
 
 # CORS middleware
 app.add_middleware(
@@ -91,9 +131,11 @@ class UserMessageRequest(BaseModel):
 # JWT verification
 async def verify_jwt(credentials: HTTPBearer = Depends(security)):
     """Verify JWT token"""
+    return decode_jwt(credentials.credentials)
+
+def decode_jwt(token: str) -> dict:
+    """Decode and verify a Supabase JWT (also used by the WebSocket routes, which have no Authorization header)"""
     try:
-        token = credentials.credentials
-        
         # Debug: Check token format
         print(f"Received token: {token[:50]}..." if len(token) > 50 else f"Received token: {token}")
         print(f"Token segments: {len(token.split('.'))}")
@@ -134,6 +176,28 @@ async def get_current_user(payload: dict = Depends(verify_jwt)):
             detail="Could not validate credentials"
         )
 
+async def verify_admin_or_internal(
+    authorization: Optional[str] = Header(None),
+    internal_token: Optional[str] = Header(None, alias="X-Internal-Token")
+) -> dict:
+    """Allow internal callers holding INTERNAL_API_TOKEN, and admins (ADMIN_USER_IDS or app_metadata role)"""
+    if INTERNAL_API_TOKEN and internal_token and hmac.compare_digest(internal_token, INTERNAL_API_TOKEN):
+        return {"sub": None, "internal": True}
+    
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+    payload = decode_jwt(token)
+    if payload.get("sub") in ADMIN_USER_IDS or (payload.get("app_metadata") or {}).get("role") == "admin":
+        return payload
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Admin access required"
+    )
+
 # Routes
 @api_router.get("/")
 async def read_root():
@@ -315,48 +379,8 @@ async def get_all_user_interviews(user: dict = Depends(verify_jwt)):
 
 def extract_individual_fields(profile_json: dict, score_data: dict = None) -> dict:
     """Extract individual fields from profile JSON for optimized database storage"""
-    
-    def safe_int(value):
-        """Safely convert to integer"""
-        if not value:
-            return None
-        try:
-            return int(float(str(value)))
-        except (ValueError, TypeError):
-            return None
-    
-    def safe_decimal(value):
-        """Safely convert to decimal"""
-        if not value:
-            return None
-        try:
-            return float(str(value))
-        except (ValueError, TypeError):
-            return None
-    
-    def convert_time_to_seconds(time_str):
-        """Convert time string like '7:43' to seconds"""
-        if not time_str:
-            return None
-        try:
-            if ':' in str(time_str):
-                parts = str(time_str).split(':')
-                if len(parts) == 2:
-                    minutes = int(parts[0])
-                    seconds = int(parts[1])
-                    return minutes * 60 + seconds
-            return safe_int(time_str)
-        except (ValueError, TypeError):
-            return None
-    
-    def extract_weight_from_object(obj):
-        """Extract weight from object format like {weight_lb: 225, reps: 5, sets: 3}"""
-        if not obj:
-            return None
-        if isinstance(obj, dict):
-            return safe_decimal(obj.get('weight_lb') or obj.get('weight'))
-        return safe_decimal(obj)
-    
+    # safe_int / safe_decimal / convert_time_to_seconds / extract_weight_from_object
+    # come from interview_extractor so interview answers are converted the same way
     individual_fields = {}
     
     # Body metrics (performance/fitness data only - personal attributes go to user_profiles)
@@ -472,10 +496,17 @@ async def handle_signup(signup_data: dict):
 
 
 @api_router.get("/user-profile/me")
-async def get_user_profile(current_user: dict = Depends(verify_jwt)):
+async def get_user_profile(current_user: dict = Depends(verify_jwt), conditional: ConditionalRequest = Depends()):
     try:
         user_id = current_user['sub']
         
+        # Cheap validator probe - answer 304 before reading the full row
+        probe = supabase.table('user_profiles').select('id, updated_at').eq('user_id', user_id).execute()
+        if probe.data:
+            not_modified = conditional.evaluate('user-profile-me', probe.data)
+            if not_modified:
+                return not_modified
+        
         # Get user_profiles record (normalized structure)
         user_profile_result = supabase.table('user_profiles').select('*').eq('user_id', user_id).execute()
         
@@ -547,6 +578,7 @@ async def update_my_user_profile(profile_update: UserProfileUpdate, user: dict =
             
             if result.data:
                 print(f"✅ Profile updated successfully: {result.data[0]['id']}")
+                invalidation_bus.publish_user_profile_change(user_id, result.data[0].get('updated_at'))
                 return {
                     "message": "Profile updated successfully",
                     "user_profile": result.data[0]
@@ -572,6 +604,7 @@ async def update_my_user_profile(profile_update: UserProfileUpdate, user: dict =
                     
                     if result.data:
                         print(f"✅ Profile updated successfully (without {problematic_column}): {result.data[0]['id']}")
+                        invalidation_bus.publish_user_profile_change(user_id, result.data[0].get('updated_at'))
                         return {
                             "message": f"Profile updated successfully (field '{problematic_column}' skipped - column not available)",
                             "user_profile": result.data[0],
@@ -608,6 +641,7 @@ async def update_my_user_profile(profile_update: UserProfileUpdate, user: dict =
             
             if create_result.data:
                 print(f"✅ Profile created successfully: {create_result.data[0]['id']}")
+                invalidation_bus.publish_user_profile_change(user_id)
                 return {
                     "message": "Profile created successfully",
                     "profile": create_result.data[0]
@@ -632,6 +666,7 @@ async def update_my_user_profile(profile_update: UserProfileUpdate, user: dict =
                 
                 if create_result.data:
                     print(f"✅ Profile created successfully (without {problematic_column}): {create_result.data[0]['id']}")
+                    invalidation_bus.publish_user_profile_change(user_id)
                     return {
                         "message": f"Profile created successfully (field '{problematic_column}' skipped - column not available)",
                         "profile": create_result.data[0],
@@ -719,11 +754,17 @@ async def upload_avatar(file: UploadFile = File(...), user: dict = Depends(verif
         )
 
 @api_router.get("/user-profile/me/athlete-profiles")
-async def get_my_athlete_profiles(user: dict = Depends(verify_jwt)):
+async def get_my_athlete_profiles(user: dict = Depends(verify_jwt), conditional: ConditionalRequest = Depends()):
     """Get all athlete profiles for the current user with complete scores only"""
     try:
         user_id = user.get('sub')
         
+        # Validator probe over the same rows - any insert, delete or update changes the ETag
+        probe = supabase.table('athlete_profiles').select('id, updated_at').eq('user_id', user_id).not_.is_('score_data', 'null').order('created_at', desc=True).execute()
+        not_modified = conditional.evaluate('my-athlete-profiles', probe.data or [])
+        if not_modified:
+            return not_modified
+        
         # Get athlete profiles linked to this user with complete scores
         profiles_result = supabase.table('athlete_profiles').select('*').eq('user_id', user_id).not_.is_('score_data', 'null').order('created_at', desc=True).execute()
         
@@ -1210,6 +1251,9 @@ async def update_athlete_profile(profile_id: str, profile_data: dict, user: dict
                 detail="Profile not found"
             )
         
+        # Clearing score_data can drop the profile from the leaderboard
+        invalidation_bus.publish_athlete_profile_change('update', user_id, profile_id, update_result.data[0].get('updated_at'))
+        
         return {
             "message": "Profile updated successfully",
             "profile_id": profile_id,
@@ -1257,6 +1301,8 @@ async def update_athlete_profile_privacy(profile_id: str, privacy_data: dict, us
                 detail="Failed to update profile privacy"
             )
         
+        invalidation_bus.publish_athlete_profile_change('update', user_id, profile_id, update_result.data[0].get('updated_at'))
+        
         return {
             "success": True,
             "message": f"Profile privacy updated to {'public' if is_public else 'private'}",
@@ -1291,6 +1337,9 @@ async def delete_athlete_profile(profile_id: str, user: dict = Depends(verify_jw
         # Delete the profile
         delete_result = supabase.table('athlete_profiles').delete().eq('id', profile_id).eq('user_id', user_id).execute()
         
+        if delete_result.data:
+            invalidation_bus.publish_athlete_profile_change('delete', user_id, profile_id, delete_result.data[0].get('updated_at'))
+        
         return {
             "message": "Profile deleted successfully",
             "profile_id": profile_id
@@ -1306,9 +1355,19 @@ async def delete_athlete_profile(profile_id: str, user: dict = Depends(verify_jw
         )
 
 @api_router.get("/athlete-profile/{profile_id}")
-async def get_athlete_profile(profile_id: str):
+async def get_athlete_profile(profile_id: str, conditional: ConditionalRequest = Depends()):
     """Get athlete profile and score data by profile ID, including user display name"""
     try:
+        # Validator probe: the body includes both the athlete and the user profile row
+        probe = supabase.table('athlete_profiles').select('id, updated_at, user_profiles(user_id, updated_at)').eq('id', profile_id).execute()
+        if probe.data:
+            probe_rows = [probe.data[0]]
+            if probe.data[0].get('user_profiles'):
+                probe_rows.append(probe.data[0]['user_profiles'])
+            not_modified = conditional.evaluate('athlete-profile', probe_rows, cache_control='public, no-cache')
+            if not_modified:
+                return not_modified
+        
         # Get athlete profile with user_id
         profile_result = supabase.table('athlete_profiles').select('*').eq('id', profile_id).execute()
         
@@ -1390,6 +1449,10 @@ async def update_athlete_profile_score(profile_id: str, score_data: dict):
                 detail="Profile not found"
             )
         
+        invalidation_bus.publish_athlete_profile_change(
+            'update', current_profile.get('user_id'), profile_id, update_result.data[0].get('updated_at')
+        )
+        
         return {
             "message": "Score data updated successfully",
             "profile_id": profile_id,
@@ -1646,15 +1709,201 @@ When all fields above have a value (or null) **or** user types **done**:
 
 **End of prompt.**"""
 
+async def complete_hybrid_interview(user_id: str, session_id: str, profile_json: dict) -> dict:
+    """
+    Persist a completed hybrid interview profile and close the session
+    
+    Shared by the ATHLETE_PROFILE::: completion and locally built profiles
+    (FORCE_COMPLETE or a stalled model). Returns the completion response.
+    """
+    # Add session metadata
+    profile_json["meta_session_id"] = session_id
+    profile_json["schema_version"] = "v1.0"
+    profile_json["interview_type"] = "hybrid"
+    
+    # Extract personal data for user_profiles table (normalized structure)
+    personal_data = {
+        'name': f"{profile_json.get('first_name', '')} {profile_json.get('last_name', '')}".strip()[:50],  # Limit to 50 chars
+        'display_name': profile_json.get('first_name', 'Athlete')[:20],  # Limit to 20 chars (likely the constraint)
+        'email': profile_json.get('email', '')[:50],  # Increase email limit
+        'gender': profile_json.get('sex', '').lower()[:10] if profile_json.get('sex') else None,  # Limit to 10 chars
+        'country': profile_json.get('country', '')[:2],  # Limit to 2 chars for country code
+        'updated_at': datetime.utcnow().isoformat()
+    }
+    
+    # Extract height and weight from body_metrics for user_profiles
+    body_metrics = profile_json.get('body_metrics', {})
+    if isinstance(body_metrics, dict):
+        # Height in inches
+        if body_metrics.get('height_in'):
+            personal_data['height_in'] = body_metrics.get('height_in')
+        
+        # Weight in pounds  
+        if body_metrics.get('weight_lb'):
+            personal_data['weight_lb'] = body_metrics.get('weight_lb')
+    
+    # Handle date of birth conversion
+    if profile_json.get('dob'):
+        try:
+            # Convert MM/DD/YYYY to YYYY-MM-DD
+            dob_parts = profile_json.get('dob').split('/')
+            if len(dob_parts) == 3:
+                month, day, year = dob_parts
+                personal_data['date_of_birth'] = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+        except Exception as e:
+            print(f"Error converting date of birth: {e}")
+    
+    # Handle wearables - truncate if too long
+    if profile_json.get('wearables'):
+        wearables = profile_json.get('wearables')
+        if isinstance(wearables, list):
+            # Truncate each wearable name if needed
+            truncated_wearables = [w[:20] if isinstance(w, str) else w for w in wearables]
+            personal_data['wearables'] = truncated_wearables
+        else:
+            personal_data['wearables'] = wearables
+    
+    # Extract individual fields for optimized storage (performance data only)
+    individual_fields = extract_individual_fields(profile_json)
+    
+    # Save athlete profile with both JSON and individual fields
+    profile_data = {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "profile_json": profile_json,
+        **individual_fields,  # Add extracted individual fields
+        "completed_at": datetime.utcnow().isoformat(),
+        "created_at": datetime.utcnow().isoformat(),
+        "updated_at": datetime.utcnow().isoformat()
+    }
+    
+    def save_user_profile():
+        # One upsert on the unique user_id instead of select-then-update/insert; None values
+        # and empty strings are left out so they never overwrite stored data
+        user_profile = {'user_id': user_id, **personal_data}
+        user_profile = {k: v for k, v in user_profile.items() if v is not None and v != ''}
+        print(f"Upserting user profile: {user_profile}")
+        try:
+            upsert_result = supabase.table('user_profiles').upsert(user_profile, on_conflict='user_id').execute()
+            print(f"Upserted user profile for user_id: {user_id} - Result: {upsert_result}")
+        except Exception as e:
+            print(f"Error creating/updating user profile: {e}")
+            print(f"Personal data that caused error: {personal_data}")
+            print(f"User ID: {user_id}")
+            # The athlete profile is saved even if the user profile fails
+            # This ensures the interview completion doesn't fail entirely
+    
+    def save_athlete_profile():
+        try:
+            profile_result = supabase.table('athlete_profiles').insert(profile_data).execute()
+            print(f"Profile created with ID: {profile_data['id']}")
+            print(f"Profile result: {profile_result}")
+            
+            if not profile_result.data:
+                raise Exception("No data returned from athlete_profiles insert")
+                
+        except Exception as profile_error:
+            print(f"Error creating athlete profile: {profile_error}")
+            
+            # If foreign key constraint fails, try creating without user_id
+            if "violates foreign key constraint" in str(profile_error):
+                print("Foreign key constraint failed, creating profile without user_id link")
+                profile_data_fallback = {
+                    "id": profile_data["id"],
+                    "profile_json": profile_json,
+                    **individual_fields,
+                    "completed_at": datetime.utcnow().isoformat(),
+                    "created_at": datetime.utcnow().isoformat(),
+                    "updated_at": datetime.utcnow().isoformat()
+                }
+                profile_result = supabase.table('athlete_profiles').insert(profile_data_fallback).execute()
+                print(f"Fallback profile created without user_id: {profile_result}")
+            else:
+                raise profile_error
+    
+    # athlete_profiles.user_id references user_profiles.user_id, so the user profile is written
+    # first: for a first-time user the athlete insert would otherwise fail the foreign key and
+    # fall back to an unlinked profile. The athlete insert and the session update are independent
+    # and run concurrently. PostgREST has no cross-table transaction, so a failed athlete profile
+    # insert re-marks the already completed session as errored.
+    await asyncio.to_thread(save_user_profile)
+    profile_outcome, session_outcome = await asyncio.gather(
+        asyncio.to_thread(save_athlete_profile),
+        # Update session status (and write its pending messages)
+        asyncio.to_thread(interview_session_store.finish, session_id, "complete"),
+        return_exceptions=True
+    )
+    if isinstance(session_outcome, Exception):
+        print(f"Error updating interview session status: {session_outcome}")
+    if isinstance(profile_outcome, Exception):
+        await asyncio.to_thread(interview_session_store.finish, session_id, "error")
+        raise profile_outcome
+    
+    # Note: Frontend handles webhook calls to display results immediately
+    # Backend doesn't trigger webhook to avoid duplicate calls
+    
+    completion_response = {
+        "response": f"Thanks, {profile_json.get('first_name', 'there')}! Your hybrid score essentials are complete. Your Hybrid Score will hit your inbox in minutes! 🚀",
+        "completed": True,
+        "profile_id": profile_data["id"],
+        "profile_data": profile_json
+    }
+    
+    print(f"Returning completion response: {completion_response}")
+    return completion_response
+
+# Instructions for the structured-output profile synthesis (the JSON schema does the formatting)
+PROFILE_SYNTHESIS_INSTRUCTIONS = (
+    "Build the athlete profile from the hybrid interview so far. Use the athlete's own answers only; "
+    "use null for anything they skipped or didn't give. Convert kg to lb and km to miles. "
+    "Lifts are 1-rep maxes in lb; running times are mm:ss."
+)
+
+def synthesize_hybrid_profile(conversation_input: list, previous_response_id: Optional[str] = None,
+                              session_id: Optional[str] = None) -> dict:
+    """
+    Generate the completion profile with a structured-output call
+    
+    Used when the ATHLETE_PROFILE::: payload can't be parsed: the response is
+    constrained to AthleteProfile's JSON schema and validated against the model,
+    so the interview completes instead of being marked as errored.
+    """
+    api_params = {
+        "model": LARGE_MODEL,
+        "input": conversation_input,
+        "instructions": PROFILE_SYNTHESIS_INSTRUCTIONS,
+        "text": {"format": profile_response_format(AthleteProfile)},
+        "store": False,
+        "temperature": 0
+    }
+    if previous_response_id:
+        api_params["previous_response_id"] = previous_response_id
+    
+    route = RouteDecision('structured_synthesis', LARGE_MODEL, 'unparseable ATHLETE_PROFILE::: payload')
+    with llm_ledger.track('profile_synthesis', LARGE_MODEL, session_id,
+                          previous_response_id=previous_response_id, route=route.route) as call:
+        response = openai_client.responses.create(**api_params)
+        call.response(response.id, response.usage)
+    profile_json = validate_profile(AthleteProfile, response.output_text)
+    
+    print(f"Structured profile synthesis successful! Response ID: {response.id}")
+    return profile_json
+
 # Hybrid Interview Flow Routes (Essential Questions Only)
+# Hybrid interview greeting, shared by every session started at /hybrid-interview/start
+HYBRID_GREETING_KEY = interview_greetings.register(
+    model="gpt-4.1",
+    prompt={"id": "pmpt_6877b2c356e881949e5f4575482b0e1a04e796de3893b2a5"}
+)
+
 @api_router.post("/hybrid-interview/start")
 async def start_hybrid_interview(user: dict = Depends(verify_jwt)):
     """Start a new hybrid interview session - always starts fresh with essential questions only"""
     try:
         user_id = user['sub']
         
-        # Delete any existing active sessions for this user
-        supabase.table('interview_sessions').delete().eq('user_id', user_id).eq('status', 'active').execute()
+        # Drop this user's other active sessions from memory; the sweeper deletes their rows
+        interview_session_store.discard_user_sessions(user_id)
         
         # Create new session
         session_data = {
@@ -1672,77 +1921,37 @@ async def start_hybrid_interview(user: dict = Depends(verify_jwt)):
             raise Exception("Failed to create session")
         
         session_id = result.data[0]['id']
+        interview_session_store.create(result.data[0])
+        interview_session_sweeper.supersede(user_id, session_id)
+        
+        # Cached greeting: no model round trip on start. The session chains from the shared
+        # greeting response; without one, the first chat turn starts the chain from the transcript.
+        greeting = interview_greetings.get(HYBRID_GREETING_KEY)
+        if greeting:
+            response_text = greeting["text"]
+            response_id = greeting["response_id"]
+        else:
+            print("Hybrid interview - Greeting not generated yet, using fallback greeting")
+            response_text = "Welcome to Hybrid Lab! I'm your coach for a quick hybrid score assessment. Let's gather the essential data—first, what's your name?"
+            response_id = None
         
-        try:
-            print("Getting first message from OpenAI...")
-            response = openai_client.responses.create(
-                model="gpt-4.1",
-                input=[{"role": "user", "content": "start"}],  # Minimal input to trigger first message
-                prompt={"id": "pmpt_6877b2c356e881949e5f4575482b0e1a04e796de3893b2a5"},
-                store=True,  # Store the initial message
-                temperature=0.7
-            )
-            
-            print(f"OpenAI API call successful! Response ID: {response.id}")
-            
-            # Extract response text - use ONLY the first output message
-            if response.output and len(response.output) > 0:
-                first_output = response.output[0]
-                if hasattr(first_output, 'content') and first_output.content:
-                    response_text = first_output.content[0].text if first_output.content else ""
-                else:
-                    response_text = ""
-            else:
-                response_text = ""
-            
-            if not response_text:
-                response_text = "Welcome to Hybrid Lab! I'm your coach for a quick hybrid score assessment. Let's gather the essential data—first, what's your name?"
-            
-            # Store the initial response and response_id
-            initial_message = {
-                "role": "assistant",
-                "content": response_text,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            updated_messages = [initial_message]
-            
-            # Update session with initial message and response_id
-            supabase.table('interview_sessions').update({
-                "messages": updated_messages,
-                "last_response_id": response.id,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq('id', session_id).execute()
-            
-            return {
-                "session_id": session_id,
-                "messages": updated_messages,
-                "current_index": 0,
-                "status": "started"
-            }
-            
-        except Exception as e:
-            print(f"Error with OpenAI: {e}")
-            # Fallback message if OpenAI fails
-            fallback_message = {
-                "role": "assistant",
-                "content": "Welcome to Hybrid Lab! I'm your coach for a quick hybrid score assessment. Let's gather the essential data—first, what's your name?",
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            updated_messages = [fallback_message]
-            
-            supabase.table('interview_sessions').update({
-                "messages": updated_messages,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq('id', session_id).execute()
-            
-            return {
-                "session_id": session_id,
-                "messages": updated_messages,
-                "current_index": 0,
-                "status": "started"
-            }
+        initial_message = {
+            "role": "assistant",
+            "content": response_text,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+        updated_messages = [initial_message]
+        
+        # Record initial message and response_id (written behind)
+        await asyncio.to_thread(interview_session_store.record_turn, session_id, updated_messages, last_response_id=response_id)
+        
+        return {
+            "session_id": session_id,
+            "messages": updated_messages,
+            "current_index": 0,
+            "status": "started"
+        }
             
     except Exception as e:
         print(f"Error starting hybrid interview: {e}")
@@ -1751,24 +1960,146 @@ async def start_hybrid_interview(user: dict = Depends(verify_jwt)):
             detail=f"Error starting hybrid interview: {str(e)}"
         )
 
+@api_router.get("/interview/llm-metrics")
+async def get_interview_llm_metrics(caller: dict = Depends(verify_admin_or_internal)):
+    """Latency histograms (wall time, time to first token) and token totals per endpoint and model"""
+    return llm_ledger.snapshot()
+
+@api_router.get("/hybrid-interview/routing-metrics")
+async def get_hybrid_interview_routing_metrics(caller: dict = Depends(verify_admin_or_internal)):
+    """Per-route call counts, latency and token totals for tuning the model routing (from the LLM ledger)"""
+    return {
+        "routing_enabled": ROUTING_ENABLED,
+        "fast_model": FAST_MODEL,
+        "large_model": LARGE_MODEL,
+        "routes": llm_ledger.routes()
+    }
+
 @api_router.post("/hybrid-interview/chat")
-async def hybrid_interview_chat(user_message: UserMessageRequest, user: dict = Depends(verify_jwt)):
-    """Send message to hybrid interview session"""
+async def hybrid_interview_chat(
+    user_message: UserMessageRequest,
+    user: dict = Depends(verify_jwt),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Send message to hybrid interview session
+    
+    Turns on a session run one at a time. A request repeating an earlier
+    turn's Idempotency-Key (double tap, client retry) gets that turn's
+    result back without another model call.
+    """
+    return await serve_hybrid_interview_turn(user_message, user['sub'], idempotency_key)
+
+async def serve_hybrid_interview_turn(
+    user_message: UserMessageRequest,
+    user_id: str,
+    idempotency_key: Optional[str] = None,
+    on_delta: Optional[Callable[[str], Awaitable[None]]] = None
+) -> dict:
+    """Run a hybrid interview turn under the session's turn lock, replaying Idempotency-Key repeats"""
+    session_id = user_message.session_id
+    
+    turn_lock = interview_session_store.turn_lock(session_id)
+    async with turn_lock:
+        if idempotency_key:
+            cached_result = interview_session_store.turn_result(user_id, session_id, idempotency_key)
+            if cached_result is not None:
+                print(f"Hybrid interview - Replaying turn for Idempotency-Key {idempotency_key}")
+                return cached_result
+        
+        result = await run_hybrid_interview_turn(user_message, user_id, on_delta)
+        
+        # Errors aren't kept, so a retry runs the turn again
+        if idempotency_key and not result.get("error"):
+            interview_session_store.remember_turn(user_id, session_id, idempotency_key, result)
+        return result
+
+async def commit_interview_turn(session_id: str, messages: List[dict], response_id: Optional[str],
+                                previous_response_id: Optional[str]):
+    """
+    Record a model turn, committing its response id before the reply is returned
+    
+    Raises 409 when another worker advanced the session during the turn; the
+    turn's messages are still kept, after the other worker's.
+    """
+    try:
+        await asyncio.to_thread(
+            interview_session_store.record_turn, session_id, messages,
+            last_response_id=response_id, previous_response_id=previous_response_id
+        )
+    except SessionVersionConflict as e:
+        print(f"⚠️  Interview turn conflict: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This interview was continued elsewhere. Reload it to keep going."
+        )
+
+# Marks the end of a stream handed over by iterate_in_thread
+_STREAM_END = object()
+
+async def iterate_in_thread(open_stream: Callable[[], Any]):
+    """
+    Iterate a blocking stream without blocking the event loop
+    
+    The sync OpenAI client blocks on every streamed event, so a worker thread
+    opens and consumes the stream and hands each event to the loop through a
+    queue. Errors raised in the thread are re-raised here. Closing the
+    generator (see contextlib.aclosing) stops the thread at its next event.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+    
+    def pump():
+        error = None
+        try:
+            with open_stream() as stream:
+                for event in stream:
+                    if stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, (event, None))
+        except Exception as e:
+            error = e
+        loop.call_soon_threadsafe(queue.put_nowait, (_STREAM_END, error))
+    
+    # Not awaited on the way out: a thread blocked on the API shouldn't hold up the turn
+    asyncio.ensure_future(asyncio.to_thread(pump))
+    try:
+        while True:
+            event, error = await queue.get()
+            if event is _STREAM_END:
+                if error:
+                    raise error
+                return
+            yield event
+    finally:
+        stopped.set()
+
+async def run_hybrid_interview_turn(
+    user_message: UserMessageRequest,
+    user_id: str,
+    on_delta: Optional[Callable[[str], Awaitable[None]]] = None
+) -> dict:
+    """
+    One hybrid interview chat turn (called with the session's turn lock held)
+    
+    on_delta, when given, receives the reply text as it streams in; the
+    ATHLETE_PROFILE::: payload is never passed to it.
+    """
     try:
-        user_id = user['sub']
         session_id = user_message.session_id
         
-        # Get current session
-        session_result = supabase.table('interview_sessions').select('*').eq('id', session_id).eq('user_id', user_id).execute()
+        # Get current session (from memory unless evicted; only the owner gets it)
+        session = interview_session_store.get(session_id, user_id)
         
-        if not session_result.data:
+        if not session:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found"
             )
         
-        session = session_result.data[0]
-        messages = session.get('messages', [])
+        # Work on a copy; the turn is recorded only once the assistant has replied
+        messages = list(session.get('messages', []))
         
         # Add user message to session
         messages.append({
@@ -1777,6 +2108,40 @@ async def hybrid_interview_chat(user_message: UserMessageRequest, user: dict = D
             "timestamp": datetime.utcnow().isoformat()
         })
         
+        # Parse the answers given so far (no model call) to track which fields are filled
+        extraction = extract_interview_fields(messages)
+        
+        # Check for force completion trigger - build the profile from the parsed answers
+        if "FORCE_COMPLETE" in user_message.messages[0].content and extraction.values.get('first_name'):
+            print(f"Force completion triggered - building profile locally (missing: {extraction.missing})")
+            try:
+                return await complete_hybrid_interview(user_id, session_id, extraction.to_profile())
+            except Exception as e:
+                print(f"Error in force completion: {e}")
+                return {
+                    "response": "Error processing your profile. Please try again.",
+                    "error": True
+                }
+        
+        # "Ready for the next piece?" -> "yes" needs no model: ask the next missing field's question
+        local_text = local_reply(messages)
+        if local_text:
+            print(f"Hybrid interview - Answered confirmation turn locally: {local_text}")
+            messages.append({
+                "role": "assistant",
+                "content": local_text,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+            await asyncio.to_thread(interview_session_store.record_turn, session_id, messages[-2:])
+            
+            return {
+                "response": local_text,
+                "completed": False,
+                "current_index": len([m for m in messages if m["role"] == "user"]),
+                "milestone_detected": False,
+                "streak_detected": False
+            }
+        
         # Create OpenAI responses API call using GPT-4.1
         try:
             # Prepare conversation messages for Responses API
@@ -1792,9 +2157,13 @@ async def hybrid_interview_chat(user_message: UserMessageRequest, user: dict = D
             print(f"Hybrid interview - Sending to OpenAI (cleaned): {conversation_input}")
             print(f"Using previous_response_id: {session.get('last_response_id')}")
             
+            # Scripted turns go to the fast model; synthesis and ambiguous answers to the large one
+            route = route_turn(messages, extraction)
+            print(f"Hybrid interview - Routing to {route.model} ({route.route}: {route.reason})")
+            
             # Create the response using OpenAI Responses API
             api_params = {
-                "model": "gpt-4.1",
+                "model": route.model,
                 "input": conversation_input,
                 "store": True,
                 "temperature": 0.7,
@@ -1805,29 +2174,58 @@ async def hybrid_interview_chat(user_message: UserMessageRequest, user: dict = D
             if session.get('last_response_id'):
                 api_params["previous_response_id"] = session['last_response_id']
             
-            response = openai_client.responses.create(**api_params)
-            
-            print(f"Hybrid interview - OpenAI API call successful! Response ID: {response.id}")
-            
-            # Extract response text - use ONLY the first output message
-            if response.output and len(response.output) > 0:
-                first_output = response.output[0]
-                if hasattr(first_output, 'content') and first_output.content:
-                    response_text = first_output.content[0].text if first_output.content else ""
-                else:
-                    response_text = ""
-            else:
-                response_text = ""
-                
+            # Stream the response; a completion payload is parsed as soon as it closes and the
+            # remaining events are drained without being forwarded
+            profile_parser = AthleteProfileStreamParser()
+            response_id = None
+            output_count = 0
+            usage = None
+            profile_closed = False
+            with llm_ledger.track('hybrid_interview_chat', route.model, session_id, streamed=True,
+                                  previous_response_id=api_params.get("previous_response_id"),
+                                  route=route.route) as call:
+                streamed_length = 0
+                # Consumed in a worker thread so other requests keep running while the model streams
+                async with aclosing(iterate_in_thread(
+                        lambda: openai_client.responses.create(**api_params, stream=True))) as events:
+                    async for event in events:
+                        if event.type == "response.created":
+                            response_id = event.response.id
+                        elif event.type == "response.output_text.delta" and event.output_index == 0:
+                            call.first_token()
+                            if profile_closed:
+                                # Drained only so response.completed (and its usage) is seen
+                                continue
+                            # Use ONLY the first output message
+                            if profile_parser.feed(event.delta) is not None:
+                                print("Hybrid interview - ATHLETE_PROFILE::: object closed, draining rest of stream")
+                                profile_closed = True
+                                continue
+                            if on_delta:
+                                visible_text = profile_parser.visible_text
+                                if len(visible_text) > streamed_length:
+                                    await on_delta(visible_text[streamed_length:])
+                                    streamed_length = len(visible_text)
+                        elif event.type == "response.completed":
+                            response_id = event.response.id
+                            output_count = len(event.response.output or [])
+                            usage = event.response.usage
+                        elif event.type in ("response.failed", "error"):
+                            raise Exception(f"OpenAI stream failed: {event}")
+                # Usage is only known once response.completed arrives, hence the drain above
+                call.response(response_id, usage)
+            
+            response_text = profile_parser.text
+            print(f"Hybrid interview - OpenAI API call successful! Response ID: {response_id}")
             print(f"Hybrid interview - Using FIRST output message only: {response_text[:100]}...")
             print(f"Full response text length: {len(response_text)}")
             
             if not response_text:
                 raise Exception("No response text generated")
                 
-            print(f"Hybrid interview - Number of output items: {len(response.output) if response.output else 0}")
-            if len(response.output) > 1:
-                print(f"WARNING: OpenAI returned {len(response.output)} output messages for hybrid interview, using only the first one")
+            print(f"Hybrid interview - Number of output items: {output_count}")
+            if output_count > 1:
+                print(f"WARNING: OpenAI returned {output_count} output messages for hybrid interview, using only the first one")
             
             # Check for confetti milestones and streak tracking
             milestone_detected = False
@@ -1841,241 +2239,34 @@ async def hybrid_interview_chat(user_message: UserMessageRequest, user: dict = D
             if "🔥" in response_text:
                 streak_detected = True
                 
-            # Check for force completion trigger
-            if "FORCE_COMPLETE" in user_message.messages[0].content:
-                print("Force completion triggered - attempting to generate athlete profile")
-                
-                # Try to extract data from conversation history
-                profile_data = {}
-                for msg in messages:
-                    if msg.get("role") == "user":
-                        content = msg.get("content", "")
-                        # Simple extraction logic - this is a fallback
-                        if "name:" in content.lower() or "kyle" in content.lower():
-                            profile_data["first_name"] = "Kyle"
-                        if "male" in content.lower():
-                            profile_data["sex"] = "Male"
-                        if "163" in content:
-                            profile_data["body_metrics"] = content
-                        if "7:43" in content:
-                            profile_data["pb_mile"] = "7:43"
-                        if "15 miles" in content:
-                            profile_data["weekly_miles"] = 15
-                        if "7 longest" in content:
-                            profile_data["long_run"] = 7
-                        if "225" in content:
-                            profile_data["pb_bench_1rm"] = "225 lbs x 3 reps"
-                
-                # Add missing required fields
-                if profile_data:
-                    profile_data.update({
-                        "pb_squat_1rm": None,
-                        "pb_deadlift_1rm": None,
-                        "schema_version": "v1.0",
-                        "meta_session_id": session_id
-                    })
-                    
-                    # Create profile in database
-                    profile_db_data = {
-                        "id": str(uuid.uuid4()),
-                        "user_id": user_id,
-                        "profile_json": profile_data,
-                        "completed_at": datetime.utcnow().isoformat(),
-                        "created_at": datetime.utcnow().isoformat(),
-                        "updated_at": datetime.utcnow().isoformat()
-                    }
-                    
-                    try:
-                        profile_result = supabase.table('athlete_profiles').insert(profile_db_data).execute()
-                        print(f"Force completion - Profile created with ID: {profile_db_data['id']}")
-                        
-                        # Update session status
-                        supabase.table('interview_sessions').update({
-                            "status": "complete",
-                            "updated_at": datetime.utcnow().isoformat()
-                        }).eq('id', session_id).execute()
-                        
-                        return {
-                            "response": f"Thanks, {profile_data.get('first_name', 'there')}! Your hybrid score essentials are complete. Your Hybrid Score will hit your inbox in minutes! 🚀",
-                            "completed": True,
-                            "profile_id": profile_db_data["id"],
-                            "profile_data": profile_data
-                        }
-                    except Exception as e:
-                        print(f"Error in force completion: {e}")
-                        return {
-                            "response": "Error processing your profile. Please try again.",
-                            "error": True
-                        }
-            
             # Check if hybrid interview is complete - look for the new ATHLETE_PROFILE::: trigger
-            if "ATHLETE_PROFILE:::" in response_text:
-                # Parse the JSON profile
+            if profile_parser.detected:
+                # The parser has the JSON profile already, or repairs a truncated one
                 try:
                     print(f"ATHLETE_PROFILE::: detected in response: {response_text[:200]}...")
-                    # Split on ATHLETE_PROFILE::: and get the JSON part
-                    json_part = response_text.split("ATHLETE_PROFILE:::")[1].strip()
-                    print(f"JSON part extracted: {json_part}")
-                    profile_json = json.loads(json_part)
-                    print(f"Profile JSON parsed: {profile_json}")
-                    
-                    # Add session metadata
-                    profile_json["meta_session_id"] = session_id
-                    profile_json["schema_version"] = "v1.0"
-                    profile_json["interview_type"] = "hybrid"
-                    
-                    # Extract personal data for user_profiles table (normalized structure)
-                    personal_data = {
-                        'name': f"{profile_json.get('first_name', '')} {profile_json.get('last_name', '')}".strip()[:50],  # Limit to 50 chars
-                        'display_name': profile_json.get('first_name', 'Athlete')[:20],  # Limit to 20 chars (likely the constraint)
-                        'email': profile_json.get('email', '')[:50],  # Increase email limit
-                        'gender': profile_json.get('sex', '').lower()[:10] if profile_json.get('sex') else None,  # Limit to 10 chars
-                        'country': profile_json.get('country', '')[:2],  # Limit to 2 chars for country code
-                        'updated_at': datetime.utcnow().isoformat()
-                    }
-                    
-                    # Extract height and weight from body_metrics for user_profiles
-                    body_metrics = profile_json.get('body_metrics', {})
-                    if isinstance(body_metrics, dict):
-                        # Height in inches
-                        if body_metrics.get('height_in'):
-                            personal_data['height_in'] = body_metrics.get('height_in')
-                        
-                        # Weight in pounds  
-                        if body_metrics.get('weight_lb'):
-                            personal_data['weight_lb'] = body_metrics.get('weight_lb')
-                    
-                    # Handle date of birth conversion
-                    if profile_json.get('dob'):
-                        try:
-                            # Convert MM/DD/YYYY to YYYY-MM-DD
-                            dob_parts = profile_json.get('dob').split('/')
-                            if len(dob_parts) == 3:
-                                month, day, year = dob_parts
-                                personal_data['date_of_birth'] = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                        except Exception as e:
-                            print(f"Error converting date of birth: {e}")
-                    
-                    # Handle wearables - truncate if too long
-                    if profile_json.get('wearables'):
-                        wearables = profile_json.get('wearables')
-                        if isinstance(wearables, list):
-                            # Truncate each wearable name if needed
-                            truncated_wearables = [w[:20] if isinstance(w, str) else w for w in wearables]
-                            personal_data['wearables'] = truncated_wearables
-                        else:
-                            personal_data['wearables'] = wearables
-                    
-                    # Create or update user profile with personal data
                     try:
-                        print(f"Creating/updating user profile with data: {personal_data}")
-                        
-                        # Debug: Check each field length
-                        for key, value in personal_data.items():
-                            if isinstance(value, str):
-                                print(f"Field '{key}': length={len(value)}, value='{value}'")
-                        
-                        # Check if user profile exists
-                        user_profile_result = supabase.table('user_profiles').select('id').eq('user_id', user_id).execute()
-                        
-                        if user_profile_result.data:
-                            # Update existing user profile
-                            update_result = supabase.table('user_profiles').update(personal_data).eq('user_id', user_id).execute()
-                            print(f"Updated user profile for user_id: {user_id} - Result: {update_result}")
-                        else:
-                            # Create new user profile
-                            new_user_profile = {
-                                'user_id': user_id,
-                                'created_at': datetime.utcnow().isoformat(),
-                                **personal_data
-                            }
-                            # Remove None values and empty strings
-                            new_user_profile = {k: v for k, v in new_user_profile.items() if v is not None and v != ''}
-                            print(f"Creating new user profile: {new_user_profile}")
-                            
-                            # Debug: Check each field length in final payload
-                            for key, value in new_user_profile.items():
-                                if isinstance(value, str):
-                                    print(f"Final field '{key}': length={len(value)}, value='{value}'")
-                            
-                            insert_result = supabase.table('user_profiles').insert(new_user_profile).execute()
-                            print(f"Created user profile for user_id: {user_id} - Result: {insert_result}")
-                            
-                    except Exception as e:
-                        print(f"Error creating/updating user profile: {e}")
-                        print(f"Personal data that caused error: {personal_data}")
-                        print(f"User ID: {user_id}")
-                        # Continue with athlete profile creation even if user profile fails
-                        # This ensures the interview completion doesn't fail entirely
-                    
-                    # Extract individual fields for optimized storage (performance data only)
-                    individual_fields = extract_individual_fields(profile_json)
-                    
-                    # Save athlete profile with both JSON and individual fields
-                    profile_data = {
-                        "id": str(uuid.uuid4()),
-                        "user_id": user_id,
-                        "profile_json": profile_json,
-                        **individual_fields,  # Add extracted individual fields
-                        "completed_at": datetime.utcnow().isoformat(),
-                        "created_at": datetime.utcnow().isoformat(),
-                        "updated_at": datetime.utcnow().isoformat()
-                    }
-                    
-                    try:
-                        profile_result = supabase.table('athlete_profiles').insert(profile_data).execute()
-                        print(f"Profile created with ID: {profile_data['id']}")
-                        print(f"Profile result: {profile_result}")
-                        
-                        if not profile_result.data:
-                            raise Exception("No data returned from athlete_profiles insert")
-                            
-                    except Exception as profile_error:
-                        print(f"Error creating athlete profile: {profile_error}")
-                        
-                        # If foreign key constraint fails, try creating without user_id
-                        if "violates foreign key constraint" in str(profile_error):
-                            print("Foreign key constraint failed, creating profile without user_id link")
-                            profile_data_fallback = {
-                                "id": profile_data["id"],
-                                "profile_json": profile_json,
-                                **individual_fields,
-                                "completed_at": datetime.utcnow().isoformat(),
-                                "created_at": datetime.utcnow().isoformat(),
-                                "updated_at": datetime.utcnow().isoformat()
-                            }
-                            profile_result = supabase.table('athlete_profiles').insert(profile_data_fallback).execute()
-                            print(f"Fallback profile created without user_id: {profile_result}")
-                        else:
-                            raise profile_error
-                    
-                    # Note: Frontend handles webhook calls to display results immediately
-                    # Backend doesn't trigger webhook to avoid duplicate calls
-                    
-                    # Update session status
-                    supabase.table('interview_sessions').update({
-                        "status": "complete",
-                        "updated_at": datetime.utcnow().isoformat()
-                    }).eq('id', session_id).execute()
-                    
-                    completion_response = {
-                        "response": f"Thanks, {profile_json.get('first_name', 'there')}! Your hybrid score essentials are complete. Your Hybrid Score will hit your inbox in minutes! 🚀",
-                        "completed": True,
-                        "profile_id": profile_data["id"],
-                        "profile_data": profile_json
-                    }
+                        profile_json = profile_parser.finish()
+                    except ProfileParseError as e:
+                        print(f"Profile JSON unusable ({e}), synthesizing with structured output")
+                        try:
+                            profile_json = await asyncio.to_thread(
+                                synthesize_hybrid_profile, conversation_input, session.get('last_response_id'), session_id
+                            )
+                        except Exception as synthesis_error:
+                            # Fall back to the answers parsed from the transcript
+                            if not extraction.complete:
+                                raise
+                            print(f"Structured synthesis failed ({synthesis_error}), using locally extracted profile")
+                            profile_json = extraction.to_profile()
+                    print(f"Profile JSON parsed: {profile_json}")
                     
-                    print(f"Returning completion response: {completion_response}")
-                    return completion_response
+                    return await complete_hybrid_interview(user_id, session_id, profile_json)
                     
                 except Exception as e:
                     print(f"Error parsing hybrid interview completion response: {e}")
                     print(f"Failed to parse response_text: {response_text}")
                     # Mark session as error
-                    supabase.table('interview_sessions').update({
-                        "status": "error",
-                        "updated_at": datetime.utcnow().isoformat()
-                    }).eq('id', session_id).execute()
+                    await asyncio.to_thread(interview_session_store.finish, session_id, "error")
                     
                     return {
                         "response": "I apologize, but there was an error processing your hybrid profile. Please try again.",
@@ -2091,13 +2282,8 @@ async def hybrid_interview_chat(user_message: UserMessageRequest, user: dict = D
             
             messages.append(assistant_message)
             
-            # Update session with both user and assistant messages and new response ID
-            supabase.table('interview_sessions').update({
-                "messages": messages,
-                "current_index": len([m for m in messages if m["role"] == "user"]),
-                "last_response_id": response.id,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq('id', session_id).execute()
+            # Commit the new response ID, then write both messages behind
+            await commit_interview_turn(session_id, messages[-2:], response_id, session.get('last_response_id'))
             
             return {
                 "response": response_text,
@@ -2107,13 +2293,23 @@ async def hybrid_interview_chat(user_message: UserMessageRequest, user: dict = D
                 "streak_detected": streak_detected
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error with OpenAI Responses API: {e}")
+            
+            # The model stalled, but every essential answer is already parsed - finish locally
+            if extraction.complete:
+                print("Hybrid interview - Completing with locally extracted profile")
+                return await complete_hybrid_interview(user_id, session_id, extraction.to_profile())
+            
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error with OpenAI Responses API: {str(e)}"
             )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in hybrid interview chat: {e}")
         raise HTTPException(
@@ -2122,6 +2318,129 @@ async def hybrid_interview_chat(user_message: UserMessageRequest, user: dict = D
         )
 
 # Full Interview Flow Routes
+# Seconds a new WebSocket connection has to send its auth frame
+WS_AUTH_TIMEOUT_SECONDS = 10
+
+@api_router.websocket("/hybrid-interview/ws")
+async def hybrid_interview_socket(websocket: WebSocket):
+    """
+    Hybrid interview over one WebSocket connection
+    
+    The connection authenticates once and keeps the user and session, so a
+    turn costs only the model call: no JWT check or session lookup per
+    message. Messages are still written behind by interview_session_store.
+    
+    Client frames (JSON):
+        {"type": "auth", "token": "<supabase jwt>"}           first frame, required
+        {"type": "start"}                                      new interview
+        {"type": "resume", "session_id": "..."}                continue an existing one
+        {"type": "message", "content": "...", "idempotency_key": "..."}
+        {"type": "typing"}                                     client typing indicator
+        {"type": "ping"}
+    Server frames:
+        ready, session (session_id, messages, current_index), typing (active),
+        delta (text, streamed reply), turn (same body as POST /hybrid-interview/chat),
+        error (detail), pong
+    """
+    await websocket.accept()
+    
+    try:
+        auth_frame = await asyncio.wait_for(websocket.receive_json(), timeout=WS_AUTH_TIMEOUT_SECONDS)
+        if not isinstance(auth_frame, dict) or auth_frame.get("type") != "auth":
+            raise ValueError("First frame must be auth")
+        user = decode_jwt(auth_frame.get("token") or "")
+    except WebSocketDisconnect:
+        return
+    except (asyncio.TimeoutError, HTTPException, ValueError) as e:
+        print(f"Hybrid interview socket - Authentication failed: {e}")
+        await websocket.close(code=4401)
+        return
+    
+    user_id = user['sub']
+    session_id = None
+    await websocket.send_json({"type": "ready"})
+    
+    async def send_delta(text: str):
+        await websocket.send_json({"type": "delta", "text": text})
+    
+    try:
+        while True:
+            try:
+                frame = await websocket.receive_json()
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Frames must be JSON objects"})
+                continue
+            frame_type = frame.get("type") if isinstance(frame, dict) else None
+            
+            # The token was only checked once; stop serving it once it expires
+            if user.get("exp") and time.time() >= user["exp"]:
+                await websocket.send_json({"type": "error", "detail": "Authentication token expired"})
+                await websocket.close(code=4401)
+                return
+            
+            if frame_type == "ping":
+                await websocket.send_json({"type": "pong"})
+            
+            elif frame_type == "typing":
+                # Nothing to do server side; accepted so clients can send it freely
+                continue
+            
+            elif frame_type == "start":
+                try:
+                    started = await start_hybrid_interview(user)
+                except HTTPException as e:
+                    await websocket.send_json({"type": "error", "detail": e.detail})
+                    continue
+                session_id = started["session_id"]
+                await websocket.send_json({"type": "session", **started})
+            
+            elif frame_type == "resume":
+                session = interview_session_store.get(frame.get("session_id") or "", user_id)
+                if not session or session.get("status") != "active":
+                    await websocket.send_json({"type": "error", "detail": "Session not found"})
+                    continue
+                session_id = session["id"]
+                await websocket.send_json({
+                    "type": "session",
+                    "session_id": session_id,
+                    "messages": session.get("messages", []),
+                    "current_index": session.get("current_index") or 0,
+                    "status": "resumed"
+                })
+            
+            elif frame_type == "message":
+                if not session_id:
+                    await websocket.send_json({"type": "error", "detail": "Start or resume a session first"})
+                    continue
+                
+                user_message = UserMessageRequest(
+                    session_id=session_id,
+                    messages=[InterviewMessage(role="user", content=str(frame.get("content") or ""))]
+                )
+                await websocket.send_json({"type": "typing", "active": True})
+                try:
+                    result = await serve_hybrid_interview_turn(
+                        user_message, user_id, frame.get("idempotency_key"), on_delta=send_delta
+                    )
+                except HTTPException as e:
+                    await websocket.send_json({"type": "typing", "active": False})
+                    await websocket.send_json({"type": "error", "detail": e.detail})
+                    continue
+                
+                await websocket.send_json({"type": "typing", "active": False})
+                await websocket.send_json({"type": "turn", **result})
+                if result.get("completed"):
+                    session_id = None
+            
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown frame type: {frame_type}"})
+    
+    except WebSocketDisconnect:
+        print(f"Hybrid interview socket - Client disconnected (session {session_id})")
+
+# Interview greeting, shared by every session started at /interview/start
+INTERVIEW_GREETING_KEY = interview_greetings.register(model="gpt-4.1", instructions=INTERVIEW_SYSTEM_MESSAGE)
+
 @api_router.post("/interview/start")
 async def start_interview(user: dict = Depends(verify_jwt)):
     """Start a new interview session - always starts fresh"""
@@ -2129,8 +2448,8 @@ async def start_interview(user: dict = Depends(verify_jwt)):
     session_id = str(uuid.uuid4())
     
     try:
-        # Delete any existing active sessions for this user (start fresh every time)
-        supabase.table('interview_sessions').delete().eq('user_id', user_id).eq('status', 'active').execute()
+        # Start fresh every time: drop this user's other active sessions from memory; the sweeper deletes their rows
+        interview_session_store.discard_user_sessions(user_id)
         
         # Create new session with empty messages - OpenAI will generate the first message
         initial_messages = []
@@ -2146,66 +2465,36 @@ async def start_interview(user: dict = Depends(verify_jwt)):
         }
         
         result = supabase.table('interview_sessions').insert(session_data).execute()
+        interview_session_store.create(result.data[0] if result.data else session_data)
+        interview_session_sweeper.supersede(user_id, session_id)
+        
+        # Cached greeting: no model round trip on start (see start_hybrid_interview)
+        greeting = interview_greetings.get(INTERVIEW_GREETING_KEY)
+        if greeting:
+            first_message_text = greeting["text"]
+            response_id = greeting["response_id"]
+        else:
+            print("Interview - Greeting not generated yet, using fallback greeting")
+            first_message_text = "Hi! I'm your Hybrid Lab Coach. I'll ask you a few quick questions to build your athlete profile. Let's start with the basics - what's your first name?"
+            response_id = None
         
-        # Get the first message from OpenAI
-        try:
-            print("Getting first message from OpenAI...")
-            response = openai_client.responses.create(
-                model="gpt-4.1",  # Updated to gpt-4.1 from gpt-4.1-mini
-                input=[{"role": "user", "content": "start"}],  # Minimal input to trigger first message
-                instructions=INTERVIEW_SYSTEM_MESSAGE,
-                store=True,  # Store the initial message
-                temperature=0.7
-            )
-            print(f"OpenAI first message call successful! Response ID: {response.id}")
-            
-            first_message_text = response.output_text
-            print(f"First message: {first_message_text[:100]}...")
-            
-            # Add the first assistant message to the session (don't include the "start" trigger)
-            first_message = {
-                "role": "assistant",
-                "content": first_message_text,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            updated_messages = [first_message]
-            
-            # Update session with first message and response ID
-            supabase.table('interview_sessions').update({
-                "messages": updated_messages,
-                "last_response_id": response.id,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq('id', session_id).execute()
-            
-            return {
-                "session_id": session_id,
-                "messages": updated_messages,
-                "current_index": 0,
-                "status": "started"
-            }
-            
-        except Exception as e:
-            print(f"Error getting first message from OpenAI: {e}")
-            # Fall back to a simple message if OpenAI fails
-            fallback_message = {
-                "role": "assistant", 
-                "content": "Hi! I'm your Hybrid Lab Coach. I'll ask you a few quick questions to build your athlete profile. Let's start with the basics - what's your first name?",
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            updated_messages = [fallback_message]
-            supabase.table('interview_sessions').update({
-                "messages": updated_messages,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq('id', session_id).execute()
-            
-            return {
-                "session_id": session_id,
-                "messages": updated_messages,
-                "current_index": 0,
-                "status": "started"
-            }
+        first_message = {
+            "role": "assistant",
+            "content": first_message_text,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+        updated_messages = [first_message]
+        
+        # Record first message and response ID (written behind)
+        await asyncio.to_thread(interview_session_store.record_turn, session_id, updated_messages, last_response_id=response_id)
+        
+        return {
+            "session_id": session_id,
+            "messages": updated_messages,
+            "current_index": 0,
+            "status": "started"
+        }
         
     except Exception as e:
         print(f"Error starting interview: {e}")
@@ -2219,30 +2508,33 @@ async def chat_interview(
     request: InterviewRequest,
     user: dict = Depends(verify_jwt)
 ):
-    """Stream chat responses for interview"""
-    user_id = user["sub"]
-    session_id = request.session_id
-    
-    if not session_id:
+    """Stream chat responses for interview (turns on a session run one at a time)"""
+    if not request.session_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Session ID is required"
         )
     
+    turn_lock = interview_session_store.turn_lock(request.session_id)
+    async with turn_lock:
+        return await run_interview_chat_turn(request, user["sub"])
+
+async def run_interview_chat_turn(request: InterviewRequest, user_id: str) -> dict:
+    """One interview chat turn (called with the session's turn lock held)"""
+    session_id = request.session_id
+    
     try:
-        # Get session from database
-        session_result = supabase.table('interview_sessions').select("*").eq('id', session_id).eq('user_id', user_id).execute()
+        # Get session (from memory unless evicted; only the owner gets it)
+        session = interview_session_store.get(session_id, user_id)
         
-        if not session_result.data:
+        if not session:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Interview session not found"
             )
         
-        session = session_result.data[0]
-        
-        # Add user message to session
-        messages = session["messages"]
+        # Add user message to a copy; the turn is recorded once the assistant has replied
+        messages = list(session["messages"])
         user_message = request.messages[-1]  # Get the latest user message
         
         # Check for force completion trigger
@@ -2284,11 +2576,8 @@ async def chat_interview(
             # Note: For hybrid interviews, webhook is called by frontend to display results immediately
             # Backend doesn't trigger webhook to avoid duplicate calls
             
-            # Update session status
-            supabase.table('interview_sessions').update({
-                "status": "complete",
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq('id', session_id).execute()
+            # Update session status (and write its pending messages)
+            await asyncio.to_thread(interview_session_store.finish, session_id, "complete")
             
             return {
                 "response": f"Thanks, {profile_json.get('first_name', 'there')}! I've created your profile with the information provided. Your Hybrid Score will be ready shortly! 🚀",
@@ -2337,7 +2626,10 @@ async def chat_interview(
             if session.get('last_response_id'):
                 api_params["previous_response_id"] = session['last_response_id']
             
-            response = openai_client.responses.create(**api_params)
+            with llm_ledger.track('interview_chat', api_params["model"], session_id,
+                                  previous_response_id=api_params.get("previous_response_id")) as call:
+                response = openai_client.responses.create(**api_params)
+                call.response(response.id, response.usage)
             
             print(f"OpenAI API call successful! Response ID: {response.id}")
             
@@ -2385,11 +2677,9 @@ async def chat_interview(
         
         # Check if interview is complete - look for the new ATHLETE_PROFILE::: trigger
         if "ATHLETE_PROFILE:::" in response_text:
-            # Parse the JSON profile
+            # Parse the JSON profile (repairing a truncated payload)
             try:
-                # Split on ATHLETE_PROFILE::: and get the JSON part
-                json_part = response_text.split("ATHLETE_PROFILE:::")[1].strip()
-                profile_json = json.loads(json_part)
+                profile_json = parse_athlete_profile(response_text)
                 
                 # Add session metadata
                 profile_json["meta_session_id"] = session_id
@@ -2410,11 +2700,8 @@ async def chat_interview(
                 # Note: For hybrid interviews, webhook is called by frontend to display results immediately
                 # Backend doesn't trigger webhook to avoid duplicate calls
                 
-                # Update session status
-                supabase.table('interview_sessions').update({
-                    "status": "complete",
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq('id', session_id).execute()
+                # Update session status (and write its pending messages)
+                await asyncio.to_thread(interview_session_store.finish, session_id, "complete")
                 
                 return {
                     "response": f"Thanks, {profile_json.get('first_name', 'there')}! Your hybrid athlete profile is complete. Your Hybrid Score will hit your inbox in minutes! 🚀",
@@ -2426,10 +2713,7 @@ async def chat_interview(
             except Exception as e:
                 print(f"Error parsing completion response: {e}")
                 # Mark session as error
-                supabase.table('interview_sessions').update({
-                    "status": "error",
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq('id', session_id).execute()
+                await asyncio.to_thread(interview_session_store.finish, session_id, "error")
                 
                 return {
                     "response": "I apologize, but there was an error processing your profile. Please try again.",
@@ -2445,13 +2729,8 @@ async def chat_interview(
         
         messages.append(assistant_message)
         
-        # Update session with both user and assistant messages and new response ID
-        supabase.table('interview_sessions').update({
-            "messages": messages,
-            "current_index": len([m for m in messages if m["role"] == "user"]),
-            "last_response_id": response.id,
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq('id', session_id).execute()
+        # Commit the new response ID, then write both messages behind
+        await commit_interview_turn(session_id, messages[-2:], response.id, session.get('last_response_id'))
         
         return {
             "response": response_text,
@@ -2461,6 +2740,8 @@ async def chat_interview(
             "streak_detected": streak_detected
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in chat interview: {e}")
         raise HTTPException(
@@ -2477,6 +2758,16 @@ async def get_interview_session(
     user_id = user["sub"]
     
     try:
+        # Only the owner may trigger a write of the session
+        owned = supabase.table('interview_sessions').select('id').eq('id', session_id).eq('user_id', user_id).execute()
+        if not owned.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Interview session not found"
+            )
+        
+        # Write any pending messages first so the row is complete
+        await asyncio.to_thread(interview_session_store.flush, session_id)
         result = supabase.table('interview_sessions').select("*").eq('id', session_id).eq('user_id', user_id).execute()
         
         if not result.data:
@@ -2485,8 +2776,16 @@ async def get_interview_session(
                 detail="Interview session not found"
             )
         
-        return result.data[0]
+        # Messages come from interview_messages; unmigrated sessions keep their JSONB array
+        session = result.data[0]
+        messages = load_session_messages(supabase, session_id)
+        if messages is not None:
+            session['messages'] = messages
+        
+        return session
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting interview session: {e}")
         raise HTTPException(
@@ -2565,24 +2864,42 @@ async def trigger_score_computation(profile_id: str, profile_json: dict):
         # Don't raise exception as this is a background task
 
 @api_router.get("/leaderboard")
-async def get_leaderboard():
-    """Get leaderboard with enhanced ranking metadata"""
+async def get_leaderboard(request: Request, offset: int = Query(0, ge=0),
+                          limit: Optional[int] = Query(None, ge=1, le=500)):
+    """
+    Get leaderboard with enhanced ranking metadata
+    
+    Without `limit` the whole leaderboard is returned; with it, one page of
+    entries in rank order starting at `offset`, so only those rows are decoded.
+    """
     try:
-        # Use the new ranking service
-        leaderboard_data = ranking_service.get_public_leaderboard_data()
-        leaderboard_stats = ranking_service.get_leaderboard_stats()
+        # Serve the cached snapshot; rebuilds happen in the background refresher
+        snapshot = ranking_service.get_snapshot()
         
-        return {
-            "leaderboard": leaderboard_data,
-            "total": len(leaderboard_data),
-            "total_public_athletes": leaderboard_stats['total_public_athletes'],
-            "ranking_metadata": {
-                "score_range": leaderboard_stats['score_range'],
-                "avg_score": leaderboard_stats['avg_score'],
-                "percentile_breakpoints": leaderboard_stats['percentile_breakpoints'],
-                "last_updated": leaderboard_stats['last_updated']
+        def build_payload():
+            leaderboard_data = snapshot.entries if limit is None else snapshot.page(offset, limit)
+            leaderboard_stats = ranking_service.get_leaderboard_stats(snapshot)
+            
+            return {
+                "leaderboard": leaderboard_data,
+                "total": len(snapshot),
+                "snapshot_version": snapshot.version,
+                "total_public_athletes": leaderboard_stats['total_public_athletes'],
+                "ranking_metadata": {
+                    "score_range": leaderboard_stats['score_range'],
+                    "avg_score": leaderboard_stats['avg_score'],
+                    "percentile_breakpoints": leaderboard_stats['percentile_breakpoints'],
+                    "last_updated": leaderboard_stats['last_updated']
+                }
             }
-        }
+        
+        if limit is not None:
+            # Pages are cheap to build and too many to cache; the ETag still gives a 304
+            return EncodedBody(build_payload()).to_response(request)
+        
+        # Serialized and compressed once per snapshot version; repeat visits get a 304
+        body = response_cache.get('leaderboard', snapshot.version, build_payload)
+        return body.to_response(request)
     except Exception as e:
         print(f"Error in get_leaderboard: {str(e)}")
         return {
@@ -2598,6 +2915,91 @@ async def get_leaderboard():
             }
         }
 
+@api_router.get("/leaderboard/changes")
+async def get_leaderboard_changes(request: Request, since: int = Query(..., ge=0)):
+    """
+    Delta sync for clients holding the leaderboard at snapshot version `since`
+    
+    Returns inserted/updated entries, removed profile ids and rank shifts up to the
+    current version. When `since` is older than the recent-diff buffer (or otherwise
+    unknown to this worker), full_reload_required is set and the client should
+    re-fetch /leaderboard.
+    """
+    try:
+        changes = ranking_service.get_leaderboard_changes(since)
+        return EncodedBody(changes).to_response(request)
+    except Exception as e:
+        print(f"Error in get_leaderboard_changes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting leaderboard changes: {str(e)}"
+        )
+
+@api_router.get("/leaderboard/facets")
+async def get_leaderboard_facets(request: Request):
+    """Counts by country, gender, age bracket and score band for the leaderboard filters"""
+    try:
+        snapshot = ranking_service.get_snapshot()
+        body = response_cache.get(
+            'leaderboard-facets',
+            snapshot.version,
+            lambda: leaderboard_facets.for_snapshot(snapshot)
+        )
+        return body.to_response(request)
+    except Exception as e:
+        print(f"Error in get_leaderboard_facets: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting leaderboard facets: {str(e)}"
+        )
+
+@api_router.get("/leaderboard/search")
+async def search_leaderboard(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=20)):
+    """Search leaderboard athletes by display name (prefix matches first, then fuzzy matches)"""
+    try:
+        snapshot = ranking_service.get_snapshot()
+        # The index may trail the snapshot briefly after a swap; ranks always come from the snapshot
+        index = search_index_cache.get(snapshot)
+        results = index.search(q, limit=limit, entries=snapshot.by_profile_id)
+        
+        return {
+            "query": q,
+            "results": results,
+            "total": len(snapshot),
+            "snapshot_version": snapshot.version
+        }
+    except Exception as e:
+        print(f"Error in search_leaderboard: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error searching leaderboard: {str(e)}"
+        )
+
+@api_router.get("/leaderboard/stream")
+async def stream_leaderboard(request: Request, profile_id: Optional[str] = None, diffs: bool = True,
+                             since: Optional[int] = Query(None, ge=0)):
+    """
+    Server-Sent Events stream of leaderboard changes
+    
+    Events: 'hello' (current version), 'diff' (same shape as /leaderboard/changes,
+    bursts coalesced) and, when profile_id is given, 'rank' for that profile.
+    diffs=false limits the stream to rank events. Reconnecting clients resume from
+    the Last-Event-ID header (or `since`).
+    """
+    last_event_id = request.headers.get('last-event-id')
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    
+    subscriber = leaderboard_stream.subscribe(profile_id=profile_id, diffs=diffs, since=since)
+    return StreamingResponse(
+        leaderboard_stream.events(request, subscriber),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @api_router.get("/ranking/{profile_id}")
 async def get_profile_ranking(profile_id: str):
     """Get ranking information for a specific profile"""
@@ -2652,6 +3054,86 @@ async def get_profile_ranking(profile_id: str):
             detail=f"Error getting profile ranking: {str(e)}"
         )
 
+# Upper bound on profile ids + scores resolved by a single batch ranking call
+MAX_BATCH_RANKING_SIZE = 100
+
+class RankingBatchRequest(BaseModel):
+    profile_ids: List[str] = []
+    scores: List[float] = []
+
+@api_router.post("/ranking/batch")
+async def get_batch_rankings(batch_request: RankingBatchRequest):
+    """Get ranking information for many profiles (or raw scores) against a single leaderboard snapshot"""
+    try:
+        if not batch_request.profile_ids and not batch_request.scores:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="profile_ids or scores are required"
+            )
+        
+        if len(batch_request.profile_ids) + len(batch_request.scores) > MAX_BATCH_RANKING_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {MAX_BATCH_RANKING_SIZE} profile ids and scores per request"
+            )
+        
+        return ranking_service.get_batch_rankings(batch_request.profile_ids, batch_request.scores)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting batch rankings: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting batch rankings: {str(e)}"
+        )
+
+@api_router.get("/ranking/{profile_id}/targets")
+async def get_profile_rank_targets(
+    profile_id: str,
+    rank: List[int] = Query(default=[]),
+    percentile: List[float] = Query(default=[])
+):
+    """Points a profile needs to reach target ranks/percentiles on the global and segment leaderboards"""
+    try:
+        if any(r < 1 for r in rank) or any(p <= 0 or p >= 100 for p in percentile):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ranks must be >= 1 and percentiles between 0 and 100"
+            )
+        
+        context = ranking_service.get_profile_score_context(profile_id)
+        
+        if not context:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Profile not found"
+            )
+        
+        if not context['score']:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Profile does not have complete score data"
+            )
+        
+        targets = ranking_service.get_rank_targets(context, ranks=rank, percentiles=percentile)
+        
+        return {
+            "profile_id": profile_id,
+            "hybrid_score": context['score'],
+            "on_leaderboard": context['on_leaderboard'],
+            **targets
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting profile rank targets: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting profile rank targets: {str(e)}"
+        )
+
 # Pydantic models for webhook data
 class BodyMetrics(BaseModel):
     weight_lb: Optional[float] = None
@@ -3122,9 +3604,22 @@ async def handle_score_callback(score_data: List[ScoreData]):
         )
 
 @api_router.get("/public-profile/{user_id}")
-async def get_public_profile(user_id: str):
+async def get_public_profile(user_id: str, conditional: ConditionalRequest = Depends()):
     """Get public profile information for a specific user"""
     try:
+        # Validator probe over the user row and their public athlete profiles
+        user_probe = supabase.table('user_profiles').select('user_id, updated_at').eq('user_id', user_id).execute()
+        if user_probe.data:
+            profiles_probe = supabase.table('athlete_profiles').select('id, updated_at').eq('user_id', user_id).eq('is_public', True).execute()
+            not_modified = conditional.evaluate(
+                'public-profile',
+                user_probe.data + (profiles_probe.data or []),
+                cache_control='public, no-cache',
+                extra=datetime.utcnow().date().isoformat()  # age is computed per day
+            )
+            if not_modified:
+                return not_modified
+        
         # Get user profile (public info only)
         user_profile_result = supabase.table('user_profiles').select('*').eq('user_id', user_id).execute()
         
@@ -3140,7 +3635,6 @@ async def get_public_profile(user_id: str):
         age = None
         if user_profile.get('date_of_birth'):
             try:
-                from datetime import datetime
                 birth_date = datetime.fromisoformat(user_profile['date_of_birth'].replace('Z', '+00:00'))
                 today = datetime.now()
                 age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
@@ -3262,7 +3756,39 @@ async def startup_event():
         print("✅ Successfully connected to Supabase")
     except Exception as e:
         print(f"❌ Failed to connect to Supabase: {e}")
+    
+    # Warm the leaderboard snapshot and keep it fresh off the request path
+    await snapshot_refresher.start()
+    
+    # Deliver cache invalidation events to subscribers off the request path
+    await invalidation_bus.start()
+    
+    # Pick up out-of-band writes (n8n, SQL) when a database URL is configured
+    await postgres_listener.start()
+    
+    # Push snapshot changes to /leaderboard/stream subscribers
+    leaderboard_stream.start()
+    
+    # Write interview messages behind the chat turns
+    await interview_session_store.start()
+    
+    # Delete superseded and abandoned interview sessions off the request path
+    await interview_session_sweeper.start()
+    
+    # Generate the interview greetings off the request path
+    await interview_greetings.start()
+    
+    # Batch interview model call records into llm_call_ledger (when LLM_LEDGER_PERSIST=1)
+    await llm_ledger.start(supabase)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     print("Shutting down Hybrid Lab API...")
+    await interview_greetings.stop()
+    await llm_ledger.stop()
+    await interview_session_sweeper.stop()
+    await interview_session_store.stop()
+    leaderboard_stream.stop()
+    await postgres_listener.stop()
+    await invalidation_bus.stop()
+    await snapshot_refresher.stop()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Interview Session Sweeper for Hybrid House
+Deletes abandoned and superseded interview sessions in batches, off the request path
+"""
+
+import os
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from .interview_sessions import InterviewSessionStore
+
+# Active sessions untouched for this long are abandoned and deleted
+SESSION_TTL_HOURS = float(os.environ.get('INTERVIEW_SESSION_TTL_HOURS', '24'))
+
+# How often expired sessions are looked for (superseded sessions are deleted as soon as they're queued)
+SWEEP_INTERVAL_SECONDS = float(os.environ.get('INTERVIEW_SWEEP_INTERVAL_SECONDS', '600'))
+
+# Sessions deleted per statement, and the most statements per sweep
+SWEEP_BATCH_SIZE = int(os.environ.get('INTERVIEW_SWEEP_BATCH_SIZE', '200'))
+MAX_BATCHES_PER_SWEEP = 50
+
+
+class InterviewSessionSweeper:
+    """
+    Keeps interview_sessions small without a delete on the /start path.
+
+    /start used to delete the user's other active sessions before creating a
+    new one. It now calls supersede() instead, which queues the user and wakes
+    the sweeper to delete their older active sessions moments later. Every
+    SWEEP_INTERVAL_SECONDS the sweeper also deletes active sessions not updated
+    for SESSION_TTL_HOURS (users who never came back), SWEEP_BATCH_SIZE ids per
+    statement. interview_messages rows go with their session (ON DELETE CASCADE).
+    """
+
+    def __init__(self, client, store: InterviewSessionStore, ttl_hours: float = SESSION_TTL_HOURS,
+                 interval: float = SWEEP_INTERVAL_SECONDS):
+        self.supabase = client
+        self.store = store
+        self.ttl = timedelta(hours=ttl_hours)
+        self.interval = interval
+        self._superseded: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def supersede(self, user_id: str, keep_session_id: str):
+        """Queue deletion of a user's active sessions other than the one just started"""
+        with self._lock:
+            self._superseded[user_id] = keep_session_id
+        if self._loop and self._wake and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def delete_superseded(self) -> int:
+        """Delete the queued users' older active sessions; returns how many were deleted"""
+        with self._lock:
+            queued, self._superseded = self._superseded, {}
+
+        deleted = 0
+        for user_id, keep_session_id in queued.items():
+            try:
+                result = self.supabase.table('interview_sessions').delete()\
+                    .eq('user_id', user_id).eq('status', 'active').neq('id', keep_session_id).execute()
+                deleted += len(result.data or [])
+            except Exception as e:
+                print(f"❌ InterviewSessionSweeper: Failed to delete superseded sessions for {user_id}: {e}")
+                with self._lock:
+                    # Retry on the next pass unless the user has started yet another session
+                    self._superseded.setdefault(user_id, keep_session_id)
+        return deleted
+
+    def delete_expired(self) -> int:
+        """Delete active sessions idle for longer than the TTL, in batches; returns how many were deleted"""
+        cutoff = (datetime.utcnow() - self.ttl).isoformat()
+        deleted = 0
+        for _ in range(MAX_BATCHES_PER_SWEEP):
+            result = self.supabase.table('interview_sessions').select('id')\
+                .eq('status', 'active').lt('updated_at', cutoff).limit(SWEEP_BATCH_SIZE).execute()
+            session_ids = [row['id'] for row in result.data or []]
+            if not session_ids:
+                break
+
+            self.supabase.table('interview_sessions').delete().in_('id', session_ids).execute()
+            self.store.discard_sessions(session_ids)
+            deleted += len(session_ids)
+            if len(session_ids) < SWEEP_BATCH_SIZE:
+                break
+        return deleted
+
+    def sweep(self, expire: bool) -> Tuple[int, int]:
+        """One pass: superseded sessions always, expired ones when `expire` is set"""
+        superseded = self.delete_superseded()
+        expired = self.delete_expired() if expire else 0
+        if superseded or expired:
+            print(f"🔧 InterviewSessionSweeper: Deleted {superseded} superseded and {expired} expired sessions")
+        return superseded, expired
+
+    async def start(self):
+        """Start the sweep loop (called from the FastAPI startup hook)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the sweep loop and delete what is still queued (called from the FastAPI shutdown hook)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.delete_superseded)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        # First expiry pass right after startup
+        next_expiry = loop.time()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, next_expiry - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            expire = loop.time() >= next_expiry
+            if expire:
+                next_expiry = loop.time() + self.interval
+            try:
+                await asyncio.to_thread(self.sweep, expire)
+            except Exception as e:
+                print(f"❌ InterviewSessionSweeper: Sweep failed: {e}")
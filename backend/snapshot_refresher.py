@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Background Leaderboard Snapshot Refresher for Hybrid House
+Warms the leaderboard snapshot at startup and rebuilds it off the request path
+"""
+
+import os
+import asyncio
+from typing import Optional
+
+from .ranking_service import ranking_service, RankingService, SNAPSHOT_TTL_SECONDS
+
+# Scheduled rebuild interval; invalidations wake the refresher earlier
+REFRESH_INTERVAL_SECONDS = float(os.environ.get('LEADERBOARD_REFRESH_INTERVAL_SECONDS', str(SNAPSHOT_TTL_SECONDS)))
+
+# How often workers check for a snapshot published by another worker in shared mode
+SHARED_POLL_SECONDS = float(os.environ.get('LEADERBOARD_SHARED_POLL_SECONDS', '1'))
+
+# Delay before retrying after a failed rebuild (the previous snapshot keeps serving)
+REFRESH_RETRY_SECONDS = 5.0
+
+
+class SnapshotRefresher:
+    """
+    Keeps RankingService's leaderboard snapshot fresh from a background task.
+
+    The rebuild (a blocking Supabase scan) runs in a worker thread, and readers
+    keep getting the previous snapshot until the new one is swapped in. With a
+    shared snapshot file, the loop ticks every SHARED_POLL_SECONDS to pick up
+    snapshots published by other workers and only rebuilds when they are stale.
+    """
+
+    def __init__(self, service: RankingService, interval: Optional[float] = None):
+        self.service = service
+        if interval is None:
+            interval = SHARED_POLL_SECONDS if service.shared_store else REFRESH_INTERVAL_SECONDS
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._force = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Warm the snapshot and start the refresh loop (called from the FastAPI startup hook)"""
+        if self.running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+
+        try:
+            snapshot = await asyncio.to_thread(self.service.refresh_snapshot)
+            if snapshot is None:
+                # Another worker holds the build lock; pick up its snapshot on the next tick
+                self._wake.set()
+            else:
+                print("✅ SnapshotRefresher: Leaderboard snapshot warmed")
+        except Exception as e:
+            print(f"⚠️  SnapshotRefresher: Warm-up failed, will retry in background: {e}")
+            self._wake.set()
+
+        self.service.refresh_callback = self.request_refresh
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the refresh loop (called from the FastAPI shutdown hook)"""
+        self.service.refresh_callback = None
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def request_refresh(self, force: bool = False):
+        """
+        Ask for a refresh as soon as possible; safe to call from any thread
+
+        Args:
+            force: Rebuild even if a shared snapshot published by another worker is still fresh
+        """
+        if self._loop and self._wake and not self._loop.is_closed():
+            self._force = self._force or force
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            force, self._force = self._force, False
+
+            try:
+                await asyncio.to_thread(self.service.refresh_snapshot, force)
+            except Exception as e:
+                print(f"❌ SnapshotRefresher: Rebuild failed, serving previous snapshot: {e}")
+                await asyncio.sleep(REFRESH_RETRY_SECONDS)
+
+
+# Global instance started from server.py's startup hook
+snapshot_refresher = SnapshotRefresher(ranking_service)
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Shared Leaderboard Snapshot Store for Hybrid House
+Publishes the leaderboard snapshot to a file shared by all uvicorn workers
+"""
+
+import os
+import json
+import mmap
+import time
+import fcntl
+import bisect
+import struct
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence
+
+from .leaderboard_snapshot import LeaderboardSnapshot
+
+# File layout (little-endian):
+#   header           magic, format, snapshot version, count, id width, segment count,
+#                    segment score count, meta/entries byte lengths
+#   scores           float64[count], ascending (bisect-ready, served straight from the mapping)
+#   segment scores   float64[segment score count], one ascending run per segment
+#   entry offsets    uint64[count + 1], where each entry starts in the entries blob
+#   segment offsets  uint32[segment count + 1], where each segment's run starts
+#   id positions     uint32[count], rank-order position of each id in the id column
+#   ids              bytes[count * id width], profile ids sorted ascending, NUL-padded
+#   meta             JSON {"built_at": ..., "segments": [...]}
+#   entries          one JSON object per entry, highest score first
+SNAPSHOT_MAGIC = b'HHLB'
+SNAPSHOT_FORMAT = 3
+HEADER = struct.Struct('<4sIQIIIIQQ')
+HEADER_SIZE = 64  # padded so the float64 columns are 8-byte aligned
+
+
+class _IdColumn(Sequence):
+    """Fixed-width, NUL-padded profile ids read from the mapping (bisect-ready)"""
+
+    def __init__(self, view: memoryview, count: int, width: int):
+        self._view = view
+        self._count = count
+        self._width = width
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> bytes:
+        start = index * self._width
+        return self._view[start:start + self._width].tobytes()
+
+    def key(self, profile_id: str) -> Optional[bytes]:
+        """A profile id padded to the column width, None if it can't be in the column"""
+        encoded = str(profile_id).encode('utf-8')
+        if len(encoded) > self._width:
+            return None
+        return encoded.ljust(self._width, b'\0')
+
+
+class _MappedProfiles(Mapping):
+    """profile_id -> entry over the id column; only looked-up entries are decoded"""
+
+    def __init__(self, snapshot: 'MappedLeaderboardSnapshot'):
+        self._snapshot = snapshot
+
+    def __getitem__(self, profile_id: str) -> Dict:
+        index = self._snapshot.index_of(profile_id)
+        if index is None:
+            raise KeyError(profile_id)
+        return self._snapshot.entry_at(index)
+
+    def __contains__(self, profile_id) -> bool:
+        return self._snapshot.index_of(profile_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        ids = self._snapshot.ids
+        for index in range(len(ids)):
+            yield ids[index].rstrip(b'\0').decode('utf-8')
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+
+class MappedLeaderboardSnapshot(LeaderboardSnapshot):
+    """
+    LeaderboardSnapshot served from a mapped snapshot file.
+
+    Rank, threshold and percentile lookups bisect the score columns in place,
+    profile lookups bisect the id column, and an entry's JSON is only decoded
+    when that row is served (a page, a profile lookup). `entries` decodes every
+    row, once, for full-leaderboard payloads and index rebuilds.
+    """
+
+    def __init__(self, mapped: mmap.mmap, version: int, built_at: Optional[str], count: int,
+                 scores_asc: memoryview, segment_scores_asc: Dict[str, memoryview],
+                 entry_offsets: memoryview, entries_blob: memoryview,
+                 ids: _IdColumn, id_positions: memoryview):
+        self._mapped = mapped
+        self.version = version
+        self.built_at = built_at
+        self._count = count
+        self._scores_asc = scores_asc
+        self._segment_scores_asc = segment_scores_asc
+        self._entry_offsets = entry_offsets
+        self._entries_blob = entries_blob
+        self.ids = ids
+        self._id_positions = id_positions
+        self._entries: Optional[List[Dict]] = None
+        self.by_profile_id = _MappedProfiles(self)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def entries(self) -> List[Dict]:
+        if self._entries is None:
+            self._entries = [self._decode(index) for index in range(self._count)]
+        return self._entries
+
+    def _decode(self, index: int) -> Dict:
+        return json.loads(self._entries_blob[self._entry_offsets[index]:self._entry_offsets[index + 1]].tobytes())
+
+    def entry_at(self, index: int) -> Dict:
+        if self._entries is not None:
+            return self._entries[index]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._decode(index)
+
+    def page(self, offset: int, limit: int) -> List[Dict]:
+        return [self.entry_at(index) for index in range(offset, min(self._count, offset + limit))]
+
+    def index_of(self, profile_id: str) -> Optional[int]:
+        """Rank-order position of a profile, None if it is not on this snapshot"""
+        key = self.ids.key(profile_id)
+        if key is None:
+            return None
+        position = bisect.bisect_left(self.ids, key)
+        if position == len(self.ids) or self.ids[position] != key:
+            return None
+        return self._id_positions[position]
+
+
+class SharedSnapshotStore:
+    """
+    Leaderboard snapshot file shared across worker processes.
+
+    One worker (whoever holds the build lock) builds and publishes; the file is
+    written to a temp path and atomically renamed, so readers only ever map a
+    complete snapshot. Readers map the file read-only and reload when the
+    published inode changes.
+
+    Loading copies nothing: the snapshot reads its score, id and segment
+    columns straight from the mapping and decodes entries row by row.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.publish_lock_path = f"{path}.publish.lock"
+        self._mapped_inode: Optional[int] = None
+        self._mapped_version = 0
+
+    @contextmanager
+    def publish_lock(self) -> Iterator[None]:
+        """
+        Serialize version allocation and publishing across workers
+
+        Hold it from reading published_version() through publish(), so two
+        workers can't both take the same next version.
+        """
+        with open(self.publish_lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def publish(self, snapshot: LeaderboardSnapshot) -> bool:
+        """
+        Write the snapshot to a temp file and atomically swap it into place
+
+        Callers take the version under publish_lock(); the published version is
+        re-checked before the rename so an older or duplicate version is never
+        swapped in.
+
+        Returns:
+            Whether the snapshot was published
+        """
+        entries = snapshot.entries
+        count = len(entries)
+        scores = snapshot.scores()
+        segments = sorted(snapshot.segment_keys())
+
+        segment_offsets = [0]
+        segment_scores = []
+        for segment in segments:
+            segment_scores.extend(snapshot.scores(segment))
+            segment_offsets.append(len(segment_scores))
+
+        entry_blobs = [json.dumps(entry, default=str).encode('utf-8') for entry in entries]
+        entry_offsets = [0]
+        for blob in entry_blobs:
+            entry_offsets.append(entry_offsets[-1] + len(blob))
+
+        ids = [str(entry['profile_id']).encode('utf-8') for entry in entries]
+        id_width = max((len(profile_id) for profile_id in ids), default=0)
+        id_order = sorted(range(count), key=lambda index: ids[index])
+
+        meta = json.dumps({'built_at': snapshot.built_at, 'segments': segments}).encode('utf-8')
+        header = HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, snapshot.version, count, id_width,
+            len(segments), len(segment_scores), len(meta), entry_offsets[-1]
+        )
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.write(struct.pack(f'<{count}d', *scores))
+            f.write(struct.pack(f'<{len(segment_scores)}d', *segment_scores))
+            f.write(struct.pack(f'<{count + 1}Q', *entry_offsets))
+            f.write(struct.pack(f'<{len(segment_offsets)}I', *segment_offsets))
+            f.write(struct.pack(f'<{count}I', *id_order))
+            f.write(b''.join(ids[index].ljust(id_width, b'\0') for index in id_order))
+            f.write(meta)
+            f.writelines(entry_blobs)
+            f.flush()
+            os.fsync(f.fileno())
+
+        published = self.published_version()
+        if snapshot.version <= published:
+            os.unlink(tmp_path)
+            print(f"⚠️  SharedSnapshotStore: Not publishing v{snapshot.version}, v{published} is already published")
+            return False
+        os.replace(tmp_path, self.path)
+        print(f"✅ SharedSnapshotStore: Published snapshot v{snapshot.version} to {self.path}")
+        return True
+
+    def published_version(self) -> int:
+        """Version of the currently published snapshot, 0 if none"""
+        try:
+            with open(self.path, 'rb') as f:
+                header = f.read(HEADER.size)
+            magic, file_format, version = HEADER.unpack(header)[:3]
+            if magic != SNAPSHOT_MAGIC or file_format != SNAPSHOT_FORMAT:
+                return 0
+            return version
+        except (FileNotFoundError, struct.error):
+            return 0
+
+    def published_age(self) -> Optional[float]:
+        """Seconds since the current snapshot was published, None if none"""
+        try:
+            return max(0.0, time.time() - os.stat(self.path).st_mtime)
+        except FileNotFoundError:
+            return None
+
+    def load_if_changed(self) -> Optional[LeaderboardSnapshot]:
+        """
+        Map the published snapshot if it changed since the last load
+
+        Returns:
+            A MappedLeaderboardSnapshot reading the mapped file in place, or
+            None if nothing newer has been published
+        """
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+
+        try:
+            inode = os.fstat(fd).st_ino
+            if inode == self._mapped_inode:
+                return None
+            # The mapping outlives the descriptor and stays valid after later renames
+            mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+
+        (magic, file_format, version, count, id_width, segment_count,
+         segment_score_count, meta_len, entries_len) = HEADER.unpack_from(mapped, 0)
+        if magic != SNAPSHOT_MAGIC or file_format != SNAPSHOT_FORMAT:
+            print(f"⚠️  SharedSnapshotStore: Ignoring unrecognised snapshot file {self.path}")
+            return None
+        if version <= self._mapped_version:
+            self._mapped_inode = inode
+            return None
+
+        view = memoryview(mapped)
+        offset = HEADER_SIZE
+
+        def column(length: int, item_size: int, code: str) -> memoryview:
+            nonlocal offset
+            start, offset = offset, offset + length * item_size
+            return view[start:offset].cast(code)
+
+        scores_asc = column(count, 8, 'd')
+        segment_scores = column(segment_score_count, 8, 'd')
+        entry_offsets = column(count + 1, 8, 'Q')
+        segment_offsets = column(segment_count + 1, 4, 'I')
+        id_positions = column(count, 4, 'I')
+        ids = _IdColumn(column(count * id_width, 1, 'B'), count, id_width)
+        meta = json.loads(view[offset:offset + meta_len].tobytes())
+        offset += meta_len
+        entries_blob = view[offset:offset + entries_len]
+
+        segment_scores_asc = {
+            segment: segment_scores[segment_offsets[index]:segment_offsets[index + 1]]
+            for index, segment in enumerate(meta.get('segments', []))
+        }
+
+        self._mapped_inode = inode
+        self._mapped_version = version
+        return MappedLeaderboardSnapshot(
+            mapped, version, meta.get('built_at'), count, scores_asc, segment_scores_asc,
+            entry_offsets, entries_blob, ids, id_positions
+        )
+
+    @contextmanager
+    def build_lock(self) -> Iterator[bool]:
+        """Try to become the single builder for this refresh; yields whether the lock was acquired"""
+        with open(self.lock_path, 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,861 @@
+#!/usr/bin/env python3
+"""
+Supabase Stand-in for Hybrid House
+In-memory tables built from the repo's .sql schema files, behind the subset of the
+supabase-py query builder the backend uses, for running the API without a hosted project
+"""
+
+import os
+import re
+import copy
+import glob
+import json
+import uuid
+import importlib
+import itertools
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from supabase import create_client
+
+# Directory holding the .sql schema and migration files (the repo root by default)
+SCHEMA_DIR = os.environ.get(
+    'SUPABASE_STANDIN_SCHEMA_DIR',
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# Schema the hosted project has that no .sql file records, applied after the files.
+# complete_database_normalization.py links athlete_profiles.user_id to user_profiles.user_id
+# (the leaderboard embeds user_profiles!inner(...) through it); PostgREST only embeds when
+# exactly one foreign key joins the two tables, so the older user_profile_id one is dropped.
+STANDIN_SCHEMA_SQL = """
+ALTER TABLE athlete_profiles DROP CONSTRAINT IF EXISTS fk_athlete_profiles_user_profile_id;
+ALTER TABLE athlete_profiles ADD CONSTRAINT fk_athlete_user_profiles
+    FOREIGN KEY (user_id) REFERENCES user_profiles(user_id) ON DELETE CASCADE ON UPDATE CASCADE;
+"""
+
+_COMMENTS = re.compile(r'--[^\n]*')
+_DOLLAR_QUOTED = re.compile(r'\$(\w*)\$.*?\$\1\$', re.S)
+_CREATE_TABLE = re.compile(r'^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w."]+)\s*\((.*)\)\s*$', re.S | re.I)
+_ALTER_TABLE = re.compile(r'^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?([\w."]+)\s+(.*)$', re.S | re.I)
+_UPDATED_AT_TRIGGER = re.compile(r'^CREATE\s+TRIGGER\s.*?\bBEFORE\s+UPDATE\b.*?\bON\s+([\w."]+).*update_updated_at_column', re.S | re.I)
+_UNIQUE_INDEX = re.compile(r'^CREATE\s+UNIQUE\s+INDEX\s.*?\bON\s+([\w."]+)\s*\(([^)]*)\)\s*$', re.S | re.I)
+_REFERENCES = re.compile(r'\bREFERENCES\s+([\w."]+)\s*\(([^)]*)\)(.*)$', re.S | re.I)
+_DEFAULT = re.compile(
+    r'\bDEFAULT\s+(.+?)(?=\s+(?:NOT\s+NULL|NULL|CHECK|REFERENCES|UNIQUE|PRIMARY|CONSTRAINT|GENERATED)\b|$)',
+    re.S | re.I
+)
+_TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}')
+
+
+class StandInAPIError(Exception):
+    """A request PostgREST would reject; code is the Postgres/PostgREST error code"""
+
+    def __init__(self, message: str, code: Optional[str] = None, details: Optional[str] = None):
+        self.message = message
+        self.code = code
+        self.details = details
+        self.hint = None
+        super().__init__(str({'message': message, 'code': code, 'hint': None, 'details': details}))
+
+
+class Column(NamedTuple):
+    name: str
+    type: str
+    default: Optional[Callable[[], Any]]
+
+
+class ForeignKey(NamedTuple):
+    name: str
+    columns: Tuple[str, ...]
+    ref_table: str
+    ref_columns: Tuple[str, ...]
+    on_delete: str  # 'cascade', 'set null' or 'restrict'
+
+
+class TableSchema:
+    """Columns, keys and constraints of one table, merged from every .sql file that defines it"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.columns: Dict[str, Column] = {}
+        self.primary_key: Tuple[str, ...] = ()
+        self.unique: Dict[str, Tuple[str, ...]] = {}
+        self.foreign_keys: Dict[str, ForeignKey] = {}
+        self.touch_updated_at = False
+
+    def constraint_keys(self) -> List[Tuple[str, ...]]:
+        return ([self.primary_key] if self.primary_key else []) + list(self.unique.values())
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _name(identifier: str) -> Optional[str]:
+    """Table name without quotes or the public schema; None for other schemas (auth.users)"""
+    identifier = identifier.replace('"', '')
+    schema, _, table = identifier.rpartition('.')
+    return table if schema in ('', 'public') else None
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and quotes"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for index, ch in enumerate(text):
+        if ch == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _column_list(text: str) -> Tuple[str, ...]:
+    return tuple(column.strip().strip('"') for column in text.split(',') if column.strip())
+
+
+def _default_factory(expression: str, column_type: str) -> Optional[Callable[[], Any]]:
+    """Python callable for a column DEFAULT expression (None when it can't be evaluated)"""
+    expression = expression.strip()
+    lowered = expression.lower()
+    if 'gen_random_uuid' in lowered or 'uuid_generate' in lowered:
+        return lambda: str(uuid.uuid4())
+    if 'now()' in lowered or 'current_timestamp' in lowered:
+        return _now
+    if lowered == 'null':
+        return None
+    if lowered in ('true', 'false'):
+        value = lowered == 'true'
+        return lambda: value
+    literal = re.match(r"^'((?:[^']|'')*)'(?:::[\w\s]+)?$", expression)
+    if literal:
+        text = literal.group(1).replace("''", "'")
+        if column_type in ('json', 'jsonb') or '::json' in lowered:
+            parsed = json.loads(text)
+            return lambda: copy.deepcopy(parsed)
+        return lambda: text
+    try:
+        number = int(expression)
+    except ValueError:
+        try:
+            number = float(expression)
+        except ValueError:
+            return None
+    return lambda: number
+
+
+def _foreign_key(name: str, columns: Tuple[str, ...], references: re.Match) -> Optional[ForeignKey]:
+    ref_table = _name(references.group(1))
+    if ref_table is None:
+        return None
+    rest = references.group(3).lower()
+    on_delete = re.search(r'on\s+delete\s+(cascade|set\s+null)', rest)
+    return ForeignKey(
+        name, columns, ref_table, _column_list(references.group(2)),
+        re.sub(r'\s+', ' ', on_delete.group(1)) if on_delete else 'restrict'
+    )
+
+
+class SchemaLoader:
+    """
+    Builds table schemas from CREATE TABLE / ALTER TABLE statements
+
+    CREATE TABLE statements are merged across files (each file's definition
+    adds the columns the others lack), then ALTER TABLE, unique index and
+    updated_at trigger statements are applied in file-name order, followed by
+    any extra SQL given to load(). Function bodies, data updates, RLS policies
+    and plain indexes are ignored.
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, TableSchema] = {}
+
+    def load(self, paths: List[str], extra_sql: str = '') -> Dict[str, TableSchema]:
+        statements = []
+        for path in sorted(paths):
+            with open(path, encoding='utf-8') as file:
+                statements.extend(self._statements(file.read()))
+        statements.extend(self._statements(extra_sql))
+
+        for statement in statements:
+            match = _CREATE_TABLE.match(statement)
+            if match and _name(match.group(1)):
+                self._create_table(_name(match.group(1)), match.group(2))
+        for statement in statements:
+            self._apply(statement)
+        return self.tables
+
+    @staticmethod
+    def _statements(sql: str) -> List[str]:
+        sql = _DOLLAR_QUOTED.sub("''", _COMMENTS.sub('', sql))
+        return [statement.strip() for statement in sql.split(';') if statement.strip()]
+
+    def _table(self, name: str) -> TableSchema:
+        if name not in self.tables:
+            self.tables[name] = TableSchema(name)
+        return self.tables[name]
+
+    def _create_table(self, name: str, body: str):
+        table = self._table(name)
+        for item in _split_top_level(body):
+            if re.match(r'^(CONSTRAINT|PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CHECK|EXCLUDE)\b', item, re.I):
+                self._add_constraint(table, item)
+            else:
+                self._add_column(table, item)
+
+    def _add_column(self, table: TableSchema, definition: str):
+        match = re.match(r'^("?[\w]+"?)\s+(\w+)(.*)$', definition, re.S)
+        if not match:
+            return
+        name, column_type, rest = match.group(1).strip('"'), match.group(2).lower(), match.group(3)
+        if name in table.columns:
+            return
+
+        default = None
+        if column_type in ('serial', 'bigserial', 'smallserial'):
+            counter = itertools.count(1)
+            default = lambda: next(counter)
+        else:
+            default_match = _DEFAULT.search(rest)
+            if default_match:
+                default = _default_factory(default_match.group(1), column_type)
+        table.columns[name] = Column(name, column_type, default)
+
+        if re.search(r'\bPRIMARY\s+KEY\b', rest, re.I):
+            table.primary_key = (name,)
+        if re.search(r'\bUNIQUE\b', rest, re.I):
+            table.unique[f"{table.name}_{name}_key"] = (name,)
+        references = _REFERENCES.search(rest)
+        if references:
+            foreign_key = _foreign_key(f"{table.name}_{name}_fkey", (name,), references)
+            if foreign_key:
+                table.foreign_keys[foreign_key.name] = foreign_key
+
+    def _add_constraint(self, table: TableSchema, definition: str):
+        named = re.match(r'^CONSTRAINT\s+("?\w+"?)\s+(.*)$', definition, re.S | re.I)
+        name, body = (named.group(1).strip('"'), named.group(2)) if named else (None, definition)
+
+        primary = re.match(r'^PRIMARY\s+KEY\s*\(([^)]*)\)', body, re.I)
+        unique = re.match(r'^UNIQUE\s*\(([^)]*)\)', body, re.I)
+        foreign = re.match(r'^FOREIGN\s+KEY\s*\(([^)]*)\)\s*(.*)$', body, re.S | re.I)
+        if primary:
+            table.primary_key = _column_list(primary.group(1))
+        elif unique:
+            columns = _column_list(unique.group(1))
+            table.unique[name or f"{table.name}_{'_'.join(columns)}_key"] = columns
+        elif foreign:
+            columns = _column_list(foreign.group(1))
+            references = _REFERENCES.search(foreign.group(2))
+            foreign_key = references and _foreign_key(name or f"{table.name}_{'_'.join(columns)}_fkey", columns, references)
+            if foreign_key:
+                table.foreign_keys[foreign_key.name] = foreign_key
+
+    def _apply(self, statement: str):
+        match = _ALTER_TABLE.match(statement)
+        if match:
+            name = _name(match.group(1))
+            if name in self.tables:
+                for action in _split_top_level(match.group(2)):
+                    self._alter(self.tables[name], action)
+            return
+
+        match = _UPDATED_AT_TRIGGER.match(statement)
+        if match and _name(match.group(1)) in self.tables:
+            self.tables[_name(match.group(1))].touch_updated_at = True
+            return
+
+        match = _UNIQUE_INDEX.match(statement)
+        if match and _name(match.group(1)) in self.tables and not re.search(r'\bWHERE\b', statement, re.I):
+            index_name = re.search(r'INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?("?\w+"?)', statement, re.I).group(1).strip('"')
+            self.tables[_name(match.group(1))].unique[index_name] = _column_list(match.group(2))
+
+    def _alter(self, table: TableSchema, action: str):
+        drop_constraint = re.match(r'^DROP\s+CONSTRAINT\s+(?:IF\s+EXISTS\s+)?("?\w+"?)', action, re.I)
+        drop_column = re.match(r'^DROP\s+(?:COLUMN\s+)?(?:IF\s+EXISTS\s+)?("?\w+"?)', action, re.I)
+        add_column = re.match(r'^ADD\s+(?:COLUMN\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(.*)$', action, re.S | re.I)
+        if drop_constraint:
+            name = drop_constraint.group(1).strip('"')
+            table.foreign_keys.pop(name, None)
+            table.unique.pop(name, None)
+        elif drop_column:
+            table.columns.pop(drop_column.group(1).strip('"'), None)
+        elif re.match(r'^ADD\s+(CONSTRAINT|PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CHECK)\b', action, re.I):
+            self._add_constraint(table, action[3:].strip())
+        elif add_column:
+            self._add_column(table, add_column.group(1))
+
+
+def load_schema(schema_dir: str = SCHEMA_DIR) -> Dict[str, TableSchema]:
+    """Table schemas from every .sql file in a directory, plus STANDIN_SCHEMA_SQL"""
+    return SchemaLoader().load(glob.glob(os.path.join(schema_dir, '*.sql')), STANDIN_SCHEMA_SQL)
+
+
+def _text(value) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'), sort_keys=True)
+    return str(value)
+
+
+def _sort_key(value) -> Tuple:
+    """Comparable form of a value: numbers, booleans and timestamps by value, everything else as text"""
+    if isinstance(value, (bool, int, float)):
+        return (1, float(value))
+    if isinstance(value, str):
+        if _TIMESTAMP.match(value):
+            try:
+                parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                if parsed.tzinfo is None:
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+                return (1, parsed.timestamp())
+            except ValueError:
+                pass
+        try:
+            return (1, float(value))
+        except ValueError:
+            pass
+        if value in ('true', 'false'):
+            return (1, float(value == 'true'))
+    return (2, _text(value))
+
+
+def _matches(row: Dict, column: str, operator: str, value) -> bool:
+    current = row.get(column)
+    if operator == 'is':
+        target = {'null': None, 'true': True, 'false': False}.get(_text(value).lower(), value)
+        return current is target if target is None else current == target
+    if current is None:
+        return False
+    if operator == 'in':
+        return any(_sort_key(current) == _sort_key(candidate) for candidate in value)
+    key, target = _sort_key(current), _sort_key(value)
+    if operator in ('eq', 'neq'):
+        return (key == target) == (operator == 'eq')
+    if key[0] != target[0]:
+        return False
+    return {'gt': key > target, 'gte': key >= target, 'lt': key < target, 'lte': key <= target}[operator]
+
+
+class _Column(NamedTuple):
+    name: str
+    alias: str
+
+
+class _Embed(NamedTuple):
+    alias: str
+    table: str
+    hint: Optional[str]
+    inner: bool
+    nodes: Tuple
+
+
+def _alias(text: str) -> Tuple[str, str]:
+    """'alias:name' -> ('alias', 'name'); a '::' cast is not an alias"""
+    match = re.match(r'^(\w+):(?!:)(.*)$', text)
+    return (match.group(1), match.group(2)) if match else ('', text)
+
+
+@lru_cache(maxsize=512)
+def _parse_select(columns: str) -> Tuple:
+    """Parse a PostgREST select string ('*, user_profiles!inner(name, email)') into nodes"""
+    nodes = []
+    for item in _split_top_level(re.sub(r'\s+', '', columns or '*')):
+        if '(' in item:
+            alias, head = _alias(item[:item.index('(')])
+            table, _, hint = head.partition('!')
+            inner = item[item.index('(') + 1:item.rindex(')')]
+            nodes.append(_Embed(alias or table, table, hint if hint not in ('', 'inner', 'left') else None,
+                                hint == 'inner', _parse_select(inner or '*')))
+        else:
+            alias, target = _alias(item)
+            name = target.split('::', 1)[0]
+            nodes.append(_Column(name, alias or name))
+    return tuple(nodes)
+
+
+def _response(data: List[Dict], count: Optional[int] = None):
+    return SimpleNamespace(data=data, count=count)
+
+
+class InMemoryDatabase:
+    """
+    Tables held in memory behind a single lock
+
+    Primary keys, unique constraints and foreign keys to loaded tables are
+    enforced (with Postgres error codes and messages, so the API's fallbacks
+    behave as they do against the hosted database), ON DELETE CASCADE / SET
+    NULL are applied, and updated_at is refreshed on tables with the
+    update_updated_at_column trigger. NOT NULL and CHECK constraints are not
+    enforced, and columns written but missing from the schema files are added
+    on first use (with a warning) since the hosted tables have drifted from them.
+    """
+
+    def __init__(self, tables: Dict[str, TableSchema]):
+        self.tables = tables
+        self.rows: Dict[str, Dict[Tuple, Dict]] = {name: {} for name in tables}
+        self.functions: Dict[str, Callable] = {}
+        self.lock = threading.RLock()
+        self._row_ids = itertools.count(1)
+        self._relationships: Dict[Tuple, Tuple[str, ForeignKey]] = {}
+
+    def schema(self, table: str) -> TableSchema:
+        schema = self.tables.get(table)
+        if schema is None:
+            raise StandInAPIError(f'relation "public.{table}" does not exist', '42P01')
+        return schema
+
+    def _ensure_columns(self, schema: TableSchema, row: Dict):
+        for column in row:
+            if column not in schema.columns:
+                print(f"⚠️  Supabase stand-in: column {schema.name}.{column} is not in the schema files, adding it")
+                schema.columns[column] = Column(column, 'unknown', None)
+
+    def _key(self, schema: TableSchema, row: Dict) -> Tuple:
+        if schema.primary_key:
+            return tuple(_text(row.get(column)) for column in schema.primary_key)
+        return (next(self._row_ids),)
+
+    def _conflict(self, schema: TableSchema, row: Dict, columns: Tuple[str, ...], ignore: Optional[Tuple] = None):
+        """Existing row with the same values in a set of unique columns (NULLs never conflict)"""
+        values = [row.get(column) for column in columns]
+        if any(value is None for value in values):
+            return None
+        if columns == schema.primary_key:
+            existing = self.rows[schema.name].get(self._key(schema, row))
+            return existing if existing is not None and self._key(schema, existing) != ignore else None
+        for key, existing in self.rows[schema.name].items():
+            if key != ignore and all(_sort_key(existing.get(c)) == _sort_key(v) for c, v in zip(columns, values)):
+                return existing
+        return None
+
+    def _check_unique(self, schema: TableSchema, row: Dict, ignore: Optional[Tuple] = None):
+        for name, columns in [('pkey', schema.primary_key)] + list(schema.unique.items()):
+            if columns and self._conflict(schema, row, columns, ignore) is not None:
+                constraint = f"{schema.name}_pkey" if name == 'pkey' else name
+                raise StandInAPIError(
+                    f'duplicate key value violates unique constraint "{constraint}"', '23505',
+                    f"Key ({', '.join(columns)})=({', '.join(_text(row.get(c)) for c in columns)}) already exists."
+                )
+
+    def _check_references(self, schema: TableSchema, row: Dict):
+        for foreign_key in schema.foreign_keys.values():
+            values = [row.get(column) for column in foreign_key.columns]
+            if any(value is None for value in values) or foreign_key.ref_table not in self.tables:
+                continue
+            parent = self.tables[foreign_key.ref_table]
+            if self._conflict(parent, dict(zip(foreign_key.ref_columns, values)), foreign_key.ref_columns) is None:
+                raise StandInAPIError(
+                    f'insert or update on table "{schema.name}" violates foreign key constraint "{foreign_key.name}"',
+                    '23503',
+                    f"Key ({', '.join(foreign_key.columns)})=({', '.join(_text(v) for v in values)}) "
+                    f"is not present in table \"{foreign_key.ref_table}\"."
+                )
+
+    def insert(self, table: str, rows: List[Dict]) -> List[Dict]:
+        schema = self.schema(table)
+        prepared = []
+        for values in rows:
+            self._ensure_columns(schema, values)
+            row = {}
+            for column in schema.columns.values():
+                if column.name in values:
+                    row[column.name] = copy.deepcopy(values[column.name])
+                else:
+                    row[column.name] = column.default() if column.default else None
+            prepared.append(row)
+
+        # All or nothing, like a single INSERT statement
+        stored = dict(self.rows[table])
+        try:
+            for row in prepared:
+                self._check_unique(schema, row)
+                self._check_references(schema, row)
+                self.rows[table][self._key(schema, row)] = row
+        except StandInAPIError:
+            self.rows[table] = stored
+            raise
+        return copy.deepcopy(prepared)
+
+    def update_row(self, schema: TableSchema, key: Tuple, values: Dict) -> Dict:
+        self._ensure_columns(schema, values)
+        row = {**self.rows[schema.name][key], **copy.deepcopy(values)}
+        if schema.touch_updated_at and 'updated_at' in schema.columns:
+            row['updated_at'] = _now()
+        self._check_unique(schema, row, ignore=key)
+        if any(column in values for foreign_key in schema.foreign_keys.values() for column in foreign_key.columns):
+            self._check_references(schema, row)
+        del self.rows[schema.name][key]
+        self.rows[schema.name][self._key(schema, row)] = row
+        return row
+
+    def delete_rows(self, schema: TableSchema, keys: List[Tuple]) -> List[Dict]:
+        deleted = [self.rows[schema.name][key] for key in keys]
+        dependents = []
+        for child in self.tables.values():
+            for foreign_key in child.foreign_keys.values():
+                if foreign_key.ref_table != schema.name:
+                    continue
+                parents = {tuple(_text(row.get(c)) for c in foreign_key.ref_columns) for row in deleted}
+                referencing = [
+                    key for key, row in self.rows[child.name].items()
+                    if tuple(_text(row.get(c)) for c in foreign_key.columns) in parents
+                ]
+                if referencing and foreign_key.on_delete == 'restrict':
+                    raise StandInAPIError(
+                        f'update or delete on table "{schema.name}" violates foreign key constraint '
+                        f'"{foreign_key.name}" on table "{child.name}"', '23503'
+                    )
+                if referencing:
+                    dependents.append((child, foreign_key, referencing))
+
+        for key in keys:
+            del self.rows[schema.name][key]
+        for child, foreign_key, referencing in dependents:
+            if foreign_key.on_delete == 'cascade':
+                self.delete_rows(child, [key for key in referencing if key in self.rows[child.name]])
+            else:
+                for key in referencing:
+                    for column in foreign_key.columns:
+                        self.rows[child.name][key][column] = None
+        return deleted
+
+    def relationship(self, table: str, target: str, hint: Optional[str]) -> Tuple[str, ForeignKey]:
+        """How `target` embeds into `table`: ('one', fk on table) or ('many', fk on target)"""
+        cached = self._relationships.get((table, target, hint))
+        if cached:
+            return cached
+        candidates = [
+            ('one', foreign_key) for foreign_key in self.schema(table).foreign_keys.values()
+            if foreign_key.ref_table == target
+        ] + [
+            ('many', foreign_key) for foreign_key in self.schema(target).foreign_keys.values()
+            if foreign_key.ref_table == table
+        ]
+        if hint:
+            candidates = [(kind, fk) for kind, fk in candidates if hint in (fk.name, ','.join(fk.columns))]
+        if len(candidates) != 1:
+            raise StandInAPIError(
+                f"Could not embed '{target}' in '{table}': {len(candidates)} relationships found",
+                'PGRST200' if not candidates else 'PGRST201'
+            )
+        self._relationships[(table, target, hint)] = candidates[0]
+        return candidates[0]
+
+    def _index(self, table: str, columns: Tuple[str, ...], indexes: Dict) -> Dict[Tuple, List[Dict]]:
+        """Rows of a table grouped by the text of some columns, built once per query"""
+        index = indexes.get((table, columns))
+        if index is None:
+            index = indexes[(table, columns)] = {}
+            for row in self.rows[table].values():
+                index.setdefault(tuple(_text(row.get(c)) for c in columns), []).append(row)
+        return index
+
+    def project(self, table: str, row: Dict, nodes: Tuple, indexes: Dict) -> Optional[Dict]:
+        """Row shaped by a parsed select; None when an !inner embed has no match"""
+        result = {}
+        for node in nodes:
+            if isinstance(node, _Column):
+                if node.name == '*':
+                    result.update(copy.deepcopy(row))
+                else:
+                    result[node.alias] = copy.deepcopy(row.get(node.name))
+                continue
+
+            kind, foreign_key = self.relationship(table, node.table, node.hint)
+            local, remote = (foreign_key.columns, foreign_key.ref_columns) if kind == 'one' \
+                else (foreign_key.ref_columns, foreign_key.columns)
+            values = [row.get(c) for c in local]
+            related = [] if any(value is None for value in values) else \
+                self._index(node.table, remote, indexes).get(tuple(_text(v) for v in values), [])
+            embedded = [
+                projected for other in related
+                for projected in [self.project(node.table, other, node.nodes, indexes)] if projected is not None
+            ]
+            if not embedded and node.inner:
+                return None
+            result[node.alias] = embedded if kind == 'many' else (embedded[0] if embedded else None)
+        return result
+
+
+class StandInQuery:
+    """
+    The supabase-py query builder subset the backend uses
+
+    select (with embedded resources and !inner), insert, update, upsert
+    (on_conflict, ignore_duplicates) and delete, filtered with eq, neq, gt,
+    gte, lt, lte, in_, is_ and not_, ordered, limited and executed.
+    """
+
+    def __init__(self, db: InMemoryDatabase, table: str):
+        self.db = db
+        self.table = table
+        self._action = 'select'
+        self._columns = '*'
+        self._values: Any = None
+        self._on_conflict: Optional[str] = None
+        self._ignore_duplicates = False
+        self._returning = True
+        self._count: Optional[str] = None
+        self._filters: List[Tuple[str, str, Any, bool]] = []
+        self._negate = False
+        self._order: List[Tuple[str, bool, Optional[bool]]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    def select(self, *columns: str, count: Optional[str] = None):
+        self._columns = ','.join(columns) or '*'
+        self._count = count
+        return self
+
+    def insert(self, json, *, count: Optional[str] = None, returning=None, upsert: bool = False, **_):
+        self._action = 'upsert' if upsert else 'insert'
+        self._values = json
+        self._count = count
+        self._returning = 'minimal' not in str(returning or '').lower()
+        return self
+
+    def upsert(self, json, *, count: Optional[str] = None, returning=None, ignore_duplicates: bool = False,
+               on_conflict: str = '', **_):
+        self.insert(json, count=count, returning=returning, upsert=True)
+        self._ignore_duplicates = ignore_duplicates
+        self._on_conflict = on_conflict or None
+        return self
+
+    def update(self, json, *, count: Optional[str] = None, returning=None, **_):
+        self._action = 'update'
+        self._values = json
+        self._count = count
+        self._returning = 'minimal' not in str(returning or '').lower()
+        return self
+
+    def delete(self, *, count: Optional[str] = None, returning=None, **_):
+        self._action = 'delete'
+        self._count = count
+        self._returning = 'minimal' not in str(returning or '').lower()
+        return self
+
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _filter(self, column: str, operator: str, value):
+        if '.' in column:
+            raise StandInAPIError(f"Filters on embedded resources ({column}) are not supported by the stand-in", 'PGRST100')
+        self._filters.append((column, operator, value, self._negate))
+        self._negate = False
+        return self
+
+    def eq(self, column: str, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value):
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column: str, values):
+        return self._filter(column, 'in', list(values))
+
+    def is_(self, column: str, value):
+        return self._filter(column, 'is', value)
+
+    def match(self, query: Dict):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, **_):
+        self._order.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, **_):
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **_):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def _matching_keys(self, schema: TableSchema) -> List[Tuple]:
+        rows = self.db.rows[self.table]
+        # Primary key lookups skip the scan
+        if len(schema.primary_key) == 1:
+            for column, operator, value, negate in self._filters:
+                if column == schema.primary_key[0] and operator == 'eq' and not negate:
+                    key = (_text(value),)
+                    rows = {key: rows[key]} if key in rows else {}
+                    break
+        return [
+            key for key, row in rows.items()
+            if all(_matches(row, column, operator, value) != negate for column, operator, value, negate in self._filters)
+        ]
+
+    def _sorted(self, rows: List[Dict]) -> List[Dict]:
+        for column, desc, nullsfirst in reversed(self._order):
+            present = sorted((row for row in rows if row.get(column) is not None),
+                             key=lambda row: _sort_key(row[column]), reverse=desc)
+            nulls = [row for row in rows if row.get(column) is None]
+            rows = nulls + present if (desc if nullsfirst is None else nullsfirst) else present + nulls
+        return rows
+
+    def _select(self, schema: TableSchema, rows: List[Dict]):
+        nodes = _parse_select(self._columns)
+        indexes: Dict = {}
+        projected = [(row, self.db.project(self.table, row, nodes, indexes)) for row in rows]
+        # !inner embeds filter rows before ordering and limits, like the join they stand for
+        projected = [(row, shaped) for row, shaped in projected if shaped is not None]
+        order_by = {id(row): index for index, row in enumerate(self._sorted([row for row, _ in projected]))}
+        projected.sort(key=lambda pair: order_by[id(pair[0])])
+        count = len(projected) if self._count else None
+        end = None if self._limit is None else self._offset + self._limit
+        return _response([shaped for _, shaped in projected[self._offset:end]], count)
+
+    def execute(self):
+        with self.db.lock:
+            schema = self.db.schema(self.table)
+            if self._action == 'select':
+                return self._select(schema, [self.db.rows[self.table][key] for key in self._matching_keys(schema)])
+
+            if self._action in ('insert', 'upsert'):
+                rows = self._values if isinstance(self._values, list) else [self._values]
+                written = self._upsert(schema, rows) if self._action == 'upsert' else self.db.insert(self.table, rows)
+            elif self._action == 'update':
+                written = [copy.deepcopy(self.db.update_row(schema, key, self._values))
+                           for key in self._matching_keys(schema)]
+            else:
+                written = self.db.delete_rows(schema, self._matching_keys(schema))
+
+            nodes, indexes = _parse_select(self._columns), {}
+            data = [self.db.project(self.table, row, nodes, indexes) for row in written]
+            return _response(data if self._returning else [], len(written) if self._count else None)
+
+    def _upsert(self, schema: TableSchema, rows: List[Dict]) -> List[Dict]:
+        conflict_columns = _column_list(self._on_conflict) if self._on_conflict else schema.primary_key
+        if tuple(conflict_columns) not in schema.constraint_keys():
+            raise StandInAPIError(
+                'there is no unique or exclusion constraint matching the ON CONFLICT specification', '42P10'
+            )
+        written = []
+        for row in rows:
+            existing = self.db._conflict(schema, row, tuple(conflict_columns))
+            if existing is None:
+                written.extend(self.db.insert(self.table, [row]))
+            elif not self._ignore_duplicates:
+                written.append(copy.deepcopy(self.db.update_row(schema, self.db._key(schema, existing), row)))
+        return written
+
+
+class StandInRPC:
+    def __init__(self, db: InMemoryDatabase, name: str, params: Dict):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        function = self.db.functions.get(self.name)
+        if function is None:
+            raise StandInAPIError(f"Could not find the function public.{self.name} in the schema cache", 'PGRST202')
+        with self.db.lock:
+            return _response(function(self.db, **self.params))
+
+
+class StandInSupabase:
+    """
+    In-memory stand-in for the supabase-py Client (table(), from_() and rpc())
+
+    Tables come from the .sql files in SCHEMA_DIR. seed() loads rows and
+    register_rpc() provides Python implementations for rpc() calls, since
+    SQL function bodies aren't executed.
+    """
+
+    def __init__(self, schema_dir: str = SCHEMA_DIR):
+        self.db = InMemoryDatabase(load_schema(schema_dir))
+
+    def table(self, name: str) -> StandInQuery:
+        return StandInQuery(self.db, name)
+
+    def from_(self, name: str) -> StandInQuery:
+        return self.table(name)
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> StandInRPC:
+        return StandInRPC(self.db, name, params or {})
+
+    def seed(self, table: str, rows: List[Dict]) -> List[Dict]:
+        """Insert rows (defaults and constraints apply, so seed parents before children)"""
+        with self.db.lock:
+            return self.db.insert(table, rows)
+
+    def register_rpc(self, name: str, function: Callable):
+        """Implement an rpc() function: function(db, **params) returns the response data"""
+        self.db.functions[name] = function
+
+    def run_seed_hook(self, hook: str):
+        """
+        Seed from a JSON file ({"table": [rows], ...}, applied in file order)
+        or a "package.module:function" called with this client
+        """
+        if hook.endswith('.json'):
+            with open(hook, encoding='utf-8') as file:
+                for table, rows in json.load(file).items():
+                    self.seed(table, rows)
+            return
+        module_name, _, function_name = hook.partition(':')
+        getattr(importlib.import_module(module_name), function_name or 'seed')(self)
+
+
+_standin: Optional[StandInSupabase] = None
+_standin_lock = threading.Lock()
+
+
+def standin_enabled() -> bool:
+    """Whether SUPABASE_STANDIN=memory selects the in-memory stand-in"""
+    mode = os.environ.get('SUPABASE_STANDIN', '').lower()
+    if mode and mode != 'memory':
+        raise ValueError(f"Unknown SUPABASE_STANDIN mode: {mode}")
+    return mode == 'memory'
+
+
+def create_supabase_client(url: Optional[str], key: Optional[str]):
+    """
+    The Supabase client for server.py and the services, chosen by environment variable
+
+    With SUPABASE_STANDIN=memory every caller shares one in-memory stand-in,
+    seeded once from SUPABASE_STANDIN_SEED (a JSON file or "module:function").
+    """
+    global _standin
+    if not standin_enabled():
+        return create_client(url, key)
+
+    with _standin_lock:
+        if _standin is None:
+            standin = StandInSupabase()
+            seed_hook = os.environ.get('SUPABASE_STANDIN_SEED')
+            if seed_hook:
+                standin.run_seed_hook(seed_hook)
+            _standin = standin
+            print(f"⚠️  Supabase stand-in active: {len(standin.db.tables)} in-memory tables from {SCHEMA_DIR}")
+        return _standin
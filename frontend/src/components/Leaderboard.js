@@ -24,9 +24,11 @@ const Leaderboard = () => {
   const [searchQuery, setSearchQuery] = useState('');
   const [isDragging, setIsDragging] = useState(false);
   const [isAgeRangeDragging, setIsAgeRangeDragging] = useState('');
+  const [facets, setFacets] = useState(null);
 
   useEffect(() => {
     fetchLeaderboard();
+    fetchFacets();
   }, []);
 
   // Apply filters and sorting
@@ -119,8 +121,11 @@ const Leaderboard = () => {
     return () => window.removeEventListener('scroll', handleScroll);
   }, []);
 
-  // Get unique countries from leaderboard data
+  // Get unique countries - from server-side facet counts when available, else from leaderboard data
   const getUniqueCountries = () => {
+    if (facets?.country?.length) {
+      return facets.country.map(facet => facet.value).sort();
+    }
     const countries = leaderboardData
       .map(athlete => athlete.country)
       .filter(country => country && country.trim())
@@ -128,6 +133,21 @@ const Leaderboard = () => {
     return [...new Set(countries)].sort();
   };
 
+  const getCountryCount = (country) => {
+    const facet = facets?.country?.find(f => f.value === country);
+    return facet ? facet.count : null;
+  };
+
+  const fetchFacets = async () => {
+    try {
+      const response = await axios.get(`${BACKEND_URL}/api/leaderboard/facets`);
+      setFacets(response.data.facets || null);
+    } catch (err) {
+      // Filters fall back to values derived from the leaderboard itself
+      console.error('Error fetching leaderboard facets:', err);
+    }
+  };
+
   const fetchLeaderboard = async () => {
     try {
       setLoading(true);
@@ -777,7 +797,7 @@ const Leaderboard = () => {
               <option value="All" style={{ background: '#1A1B1F', color: '#FFFFFF' }}>All</option>
               {getUniqueCountries().map(country => (
                 <option key={country} value={country} style={{ background: '#1A1B1F', color: '#FFFFFF' }}>
-                  {country}
+                  {country}{getCountryCount(country) !== null ? ` (${getCountryCount(country)})` : ''}
                 </option>
               ))}
             </select>
@@ -61,6 +61,8 @@ const ProfilePage = () => {
   // Athlete Profile Management States
   const [profiles, setProfiles] = useState([]);
   const [isLoadingProfiles, setIsLoadingProfiles] = useState(true);
+  // Leaderboard ranking per profile id, resolved for the whole table in one batch call
+  const [profileRankings, setProfileRankings] = useState({});
   const [isGenerating, setIsGenerating] = useState(false);
   // Form state for new profile generation (updated structure)
   const [inputForm, setInputForm] = useState({
@@ -234,6 +236,42 @@ const ProfilePage = () => {
     fetchProfiles();
   }, [toast, user, session]); // Added user and session as dependencies
 
+  // Rank every scored profile against one leaderboard snapshot (one request, not one per row)
+  useEffect(() => {
+    const profileIds = profiles
+      .filter(profile => profile?.score_data?.hybridScore)
+      .map(profile => profile.id)
+      .slice(0, 100); // the batch endpoint resolves at most 100 ids per request
+
+    if (profileIds.length === 0) {
+      setProfileRankings({});
+      return;
+    }
+
+    let cancelled = false;
+    const fetchRankings = async () => {
+      try {
+        const response = await axios.post(`${BACKEND_URL}/api/ranking/batch`, {
+          profile_ids: profileIds
+        });
+        if (cancelled) return;
+        const rankings = {};
+        for (const entry of response.data.rankings || []) {
+          rankings[entry.profile_id] = entry.ranking;
+        }
+        setProfileRankings(rankings);
+      } catch (error) {
+        // Rankings are supplementary; the table still renders without them
+        console.error('Error fetching profile rankings:', error);
+      }
+    };
+
+    fetchRankings();
+    return () => {
+      cancelled = true;
+    };
+  }, [profiles]);
+
   // Load user profile data
   useEffect(() => {
     const fetchUserProfile = async () => {
@@ -2566,6 +2604,7 @@ const ProfilePage = () => {
                   <tr>
                     <th className="text-left p-3 text-xs font-semibold text-secondary">Date</th>
                     <th className="text-right p-3 text-xs font-semibold text-secondary">Hybrid</th>
+                    <th className="text-right p-3 text-xs font-semibold text-secondary">Rank</th>
                     <th className="text-right p-3 text-xs font-semibold text-secondary">Str</th>
                     <th className="text-right p-3 text-xs font-semibold text-secondary">Spd</th>
                     <th className="text-right p-3 text-xs font-semibold text-secondary">VO₂</th>
@@ -2591,7 +2630,7 @@ const ProfilePage = () => {
                 <tbody>
                   {profiles.length === 0 ? (
                     <tr>
-                      <td colSpan="19" className="text-center py-12">
+                      <td colSpan="21" className="text-center py-12">
                         <div className="text-muted">
                           <BarChart3 className="w-12 h-12 mx-auto mb-4 opacity-50" />
                           <p>No scores yet. Generate your first one above!</p>
@@ -2604,6 +2643,7 @@ const ProfilePage = () => {
                       const scoreData = profile?.score_data || {};
                       const profileJson = profile?.profile_json || {};
                       const bodyMetrics = profileJson?.body_metrics || {};
+                      const ranking = profileRankings[profile.id];
                       
                       // Helper function to format values safely
                       const formatValue = (value) => {
@@ -2670,6 +2710,15 @@ const ProfilePage = () => {
                               <span className="inline-block px-2 py-1 bg-gray-600 text-gray-200 rounded-full text-xs">Pending</span>
                             )}
                           </td>
+                          <td className="p-3 text-xs text-secondary text-right">
+                            {ranking?.position ? (
+                              <span title={ranking.percentile != null ? `${ranking.percentile}th percentile` : undefined}>
+                                #{ranking.position} / {ranking.total_athletes}
+                              </span>
+                            ) : (
+                              <span className="em-dash">—</span>
+                            )}
+                          </td>
                           <td className="p-3 text-xs sub-score">
                             {scoreData.strengthScore ? Math.round(scoreData.strengthScore) : <span className="em-dash">—</span>}
                           </td>
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def supabase():
+    """A fresh in-memory Supabase stand-in built from the repo's schema files"""
+    from backend.supabase_standin import StandInSupabase
+    return StandInSupabase()
+
+
+def seed_athlete(client, user_id, score, name=None, gender='male', date_of_birth='1995-06-01',
+                 country='US', is_public=True):
+    """Insert a user profile (if new) and one scored athlete profile; returns the athlete profile row"""
+    if not client.table('user_profiles').select('user_id').eq('user_id', user_id).execute().data:
+        client.seed('user_profiles', [{
+            'user_id': user_id,
+            'email': f"{user_id}@example.com",
+            'name': name or user_id.title(),
+            'gender': gender,
+            'date_of_birth': date_of_birth,
+            'country': country,
+        }])
+    return client.seed('athlete_profiles', [{
+        'user_id': user_id,
+        'is_public': is_public,
+        'hybrid_score': score,
+        'score_data': {'hybridScore': score} if score is not None else None,
+    }])[0]
+
+
+@pytest.fixture
+def ranking(supabase):
+    """A RankingService reading the stand-in, with no shared snapshot file or background refresher"""
+    from backend.ranking_service import RankingService
+    service = RankingService()
+    service.supabase = supabase
+    service.shared_store = None
+    service.refresh_callback = None
+    return service
+
+
+@pytest.fixture
+def server():
+    """backend.server running on the Supabase and OpenAI stand-ins (skipped without its dependencies)"""
+    pytest.importorskip('emergentintegrations')
+    os.environ.setdefault('SUPABASE_STANDIN', 'memory')
+    os.environ.setdefault('OPENAI_STANDIN', 'scripted')
+    os.environ.setdefault('OPENAI_STANDIN_FIRST_TOKEN_LATENCY', 'fixed:0')
+    os.environ.setdefault('OPENAI_STANDIN_DELTA_LATENCY', 'fixed:0')
+    from backend import server
+    from backend.supabase_standin import StandInSupabase
+    if not isinstance(server.supabase, StandInSupabase):
+        pytest.skip('backend.server was imported against a real Supabase project')
+    return server
@@ -0,0 +1,83 @@
+import pytest
+
+from backend.athlete_profile_parser import (
+    SENTINEL,
+    AthleteProfileStreamParser,
+    ProfileParseError,
+    parse_athlete_profile,
+)
+
+
+def feed_in_chunks(parser, text, size):
+    result = None
+    for start in range(0, len(text), size):
+        result = parser.feed(text[start:start + size])
+    return result
+
+
+def test_profile_closes_mid_stream():
+    parser = AthleteProfileStreamParser()
+    text = 'Thanks! ' + SENTINEL + ' {"first_name": "Ana", "pb_mile": "5:40"} trailing prose'
+    profile = feed_in_chunks(parser, text, 3)
+    assert profile == {'first_name': 'Ana', 'pb_mile': '5:40'}
+    assert parser.detected
+    assert parser.visible_text == 'Thanks! '
+
+
+def test_partial_sentinel_is_held_back():
+    parser = AthleteProfileStreamParser()
+    parser.feed('All done ATHLETE_PRO')
+    assert not parser.detected
+    assert parser.visible_text == 'All done '
+    parser.feed('FILE::: {"a": 1}')
+    assert parser.detected
+    assert parser.profile == {'a': 1}
+    assert parser.visible_text == 'All done '
+
+
+def test_text_that_only_resembles_the_sentinel_is_shown():
+    parser = AthleteProfileStreamParser()
+    parser.feed('ATHLETE_PRO')
+    parser.feed('GRESS is great')
+    assert not parser.detected
+    assert parser.visible_text == 'ATHLETE_PROGRESS is great'
+    assert parser.finish() is None
+
+
+def test_braces_inside_strings_do_not_close_the_object():
+    profile = parse_athlete_profile(SENTINEL + '{"note": "a } b { c", "n": 2}')
+    assert profile == {'note': 'a } b { c', 'n': 2}
+
+
+def test_code_fence_and_trailing_comma():
+    profile = parse_athlete_profile(SENTINEL + '\n```json\n{"a": 1, "b": [1, 2,],}\n```')
+    assert profile == {'a': 1, 'b': [1, 2]}
+
+
+def test_truncated_string_member_is_dropped():
+    parser = AthleteProfileStreamParser()
+    parser.feed(SENTINEL + '{"first_name": "Ana", "last_name": "Sm')
+    assert parser.finish() == {'first_name': 'Ana'}
+
+
+def test_truncated_number_and_nested_object_are_repaired():
+    parser = AthleteProfileStreamParser()
+    parser.feed(SENTINEL + '{"a": 1, "lifts": {"bench": 225, "squat": 31')
+    assert parser.finish() == {'a': 1, 'lifts': {'bench': 225}}
+
+
+def test_dangling_key_is_dropped():
+    parser = AthleteProfileStreamParser()
+    parser.feed(SENTINEL + '{"a": 1, "b":')
+    assert parser.finish() == {'a': 1}
+
+
+def test_missing_payload_raises():
+    parser = AthleteProfileStreamParser()
+    parser.feed('done ' + SENTINEL)
+    with pytest.raises(ProfileParseError):
+        parser.finish()
+
+
+def test_no_sentinel_returns_none():
+    assert parse_athlete_profile('Just a normal reply') is None
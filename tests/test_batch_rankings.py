@@ -0,0 +1,41 @@
+import uuid
+
+from tests.conftest import seed_athlete
+
+
+def test_batch_ranks_public_private_missing_and_unscored(supabase, ranking):
+    public = [seed_athlete(supabase, f"athlete-{index}", score) for index, score in enumerate([90, 80, 70])]
+    private = seed_athlete(supabase, 'athlete-0', 85, is_public=False)
+    unscored = seed_athlete(supabase, 'athlete-9', None)
+    missing = str(uuid.uuid4())
+
+    result = ranking.get_batch_rankings(
+        [public[1]['id'], private['id'], missing, unscored['id']], [100]
+    )
+
+    assert result['snapshot_version'] == ranking.get_snapshot().version
+    by_id = {row['profile_id']: row for row in result['rankings']}
+    assert by_id[public[1]['id']]['on_leaderboard'] is True
+    assert by_id[public[1]['id']]['ranking'] == {'position': 2, 'total_athletes': 3, 'percentile': 33.3}
+    assert by_id[private['id']]['on_leaderboard'] is False
+    assert by_id[private['id']]['ranking']['position'] == 2
+    assert by_id[private['id']]['ranking']['total_athletes'] == 4
+    assert result['not_found'] == [missing]
+    assert result['unscored'] == [unscored['id']]
+    assert result['score_rankings'] == [
+        {'hybrid_score': 100, 'ranking': {'position': 1, 'total_athletes': 4, 'percentile': 100.0}}
+    ]
+
+
+def test_batch_fetches_off_leaderboard_profiles_in_one_query(supabase, ranking, monkeypatch):
+    seed_athlete(supabase, 'athlete-0', 90)
+    private = [seed_athlete(supabase, f"private-{index}", 50 + index, is_public=False) for index in range(3)]
+    ranking.get_snapshot()
+
+    tables = []
+    table = supabase.table
+    monkeypatch.setattr(supabase, 'table', lambda name: tables.append(name) or table(name))
+    result = ranking.get_batch_rankings([profile['id'] for profile in private], [])
+
+    assert tables == ['athlete_profiles']
+    assert [row['profile_id'] for row in result['rankings']] == [profile['id'] for profile in private]
@@ -0,0 +1,59 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from backend.conditional_get import ConditionalRequest
+
+
+def make_client(rows, built):
+    app = FastAPI()
+
+    @app.get('/profiles')
+    def profiles(conditional: ConditionalRequest = Depends()):
+        not_modified = conditional.evaluate('profiles', rows)
+        if not_modified:
+            return not_modified
+        built.append(1)
+        return {'profiles': rows}
+
+    return TestClient(app)
+
+
+def test_matching_etag_skips_the_body():
+    rows, built = [{'id': 'p1', 'updated_at': '2026-10-19T08:00:00.250000+00:00'}], []
+    client = make_client(rows, built)
+
+    first = client.get('/profiles')
+    assert first.status_code == 200
+    assert first.headers['etag'].startswith('W/"')
+    assert first.headers['last-modified'] == 'Mon, 19 Oct 2026 08:00:00 GMT'
+
+    second = client.get('/profiles', headers={'If-None-Match': first.headers['etag']})
+    assert second.status_code == 304
+    assert second.headers['etag'] == first.headers['etag']
+    assert len(built) == 1
+
+
+def test_insert_or_update_changes_the_etag():
+    rows, built = [{'id': 'p1', 'updated_at': '2026-10-19T08:00:00Z'}], []
+    client = make_client(rows, built)
+    etag = client.get('/profiles').headers['etag']
+
+    rows.append({'id': 'p2', 'updated_at': '2026-10-19T07:00:00Z'})
+    inserted = client.get('/profiles', headers={'If-None-Match': etag})
+    assert inserted.status_code == 200
+
+    rows[0]['updated_at'] = '2026-10-19T09:00:00Z'
+    updated = client.get('/profiles', headers={'If-None-Match': inserted.headers['etag']})
+    assert updated.status_code == 200
+
+
+def test_if_modified_since():
+    rows, built = [{'id': 'p1', 'updated_at': '2026-10-19T08:00:00.900000+00:00'}], []
+    client = make_client(rows, built)
+
+    assert client.get('/profiles', headers={'If-Modified-Since': 'Mon, 19 Oct 2026 08:00:00 GMT'}).status_code == 304
+    assert client.get('/profiles', headers={'If-Modified-Since': 'Mon, 19 Oct 2026 07:59:59 GMT'}).status_code == 200
+    # If-None-Match wins over If-Modified-Since
+    assert client.get('/profiles', headers={
+        'If-None-Match': '"stale"', 'If-Modified-Since': 'Mon, 19 Oct 2026 08:00:00 GMT'
+    }).status_code == 200
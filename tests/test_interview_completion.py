@@ -0,0 +1,91 @@
+import asyncio
+import uuid
+
+import pytest
+
+
+def start_session(server, user_id):
+    row = server.supabase.table('interview_sessions').insert({
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'status': 'active',
+        'version': 0,
+    }).execute().data[0]
+    session = server.interview_session_store.create(row)
+    server.interview_session_store.record_turn(session['id'], [
+        {'role': 'user', 'content': 'done'},
+        {'role': 'assistant', 'content': 'ATHLETE_PROFILE:::{}'},
+    ])
+    return session
+
+
+def profile(user_id):
+    return {
+        'first_name': 'Sam',
+        'last_name': 'Jones',
+        'email': f"{user_id}@example.com",
+        'sex': 'Male',
+        'dob': '6/1/1995',
+        'country': 'US',
+        'pb_bench_1rm': 225,
+    }
+
+
+def one(server, table, column, value):
+    rows = server.supabase.table(table).select('*').eq(column, value).execute().data
+    assert len(rows) == 1
+    return rows[0]
+
+
+def test_completion_writes_the_profiles_and_closes_the_session(server):
+    user_id = f"user-{uuid.uuid4().hex}"
+    session = start_session(server, user_id)
+
+    result = asyncio.run(server.complete_hybrid_interview(user_id, session['id'], profile(user_id)))
+
+    assert result['completed'] is True
+    user_profile = one(server, 'user_profiles', 'user_id', user_id)
+    assert user_profile['name'] == 'Sam Jones'
+    assert user_profile['date_of_birth'] == '1995-06-01'
+    athlete_profile = one(server, 'athlete_profiles', 'id', result['profile_id'])
+    assert athlete_profile['user_id'] == user_id
+    assert athlete_profile['profile_json']['meta_session_id'] == session['id']
+    assert one(server, 'interview_sessions', 'id', session['id'])['status'] == 'complete'
+    assert len(server.supabase.table('interview_messages').select('seq').eq('session_id', session['id']).execute().data) == 2
+
+
+def test_repeat_completion_updates_the_user_profile_in_place(server):
+    user_id = f"user-{uuid.uuid4().hex}"
+    asyncio.run(server.complete_hybrid_interview(user_id, start_session(server, user_id)['id'], profile(user_id)))
+    second = profile(user_id)
+    second['first_name'] = 'Samuel'
+    second['country'] = ''
+    asyncio.run(server.complete_hybrid_interview(user_id, start_session(server, user_id)['id'], second))
+
+    user_profile = one(server, 'user_profiles', 'user_id', user_id)
+    assert user_profile['name'] == 'Samuel Jones'
+    # Empty answers never blank stored fields
+    assert user_profile['country'] == 'US'
+
+
+def test_failed_profile_insert_marks_the_session_errored(server, monkeypatch):
+    user_id = f"user-{uuid.uuid4().hex}"
+    session = start_session(server, user_id)
+    table = server.supabase.table
+
+    class FailingInsert:
+        def __init__(self, query):
+            self.query = query
+
+        def insert(self, *args, **kwargs):
+            raise RuntimeError('insert failed')
+
+        def __getattr__(self, name):
+            return getattr(self.query, name)
+
+    monkeypatch.setattr(server.supabase, 'table',
+                        lambda name: FailingInsert(table(name)) if name == 'athlete_profiles' else table(name))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(server.complete_hybrid_interview(user_id, session['id'], profile(user_id)))
+    assert one(server, 'interview_sessions', 'id', session['id'])['status'] == 'error'
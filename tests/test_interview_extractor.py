@@ -0,0 +1,75 @@
+from backend.interview_extractor import (
+    HYBRID_QUESTIONS,
+    InterviewExtraction,
+    is_skip,
+    parse_name,
+    question_fields,
+)
+
+
+def answer(field, text):
+    extraction = InterviewExtraction()
+    extraction.apply_answer(HYBRID_QUESTIONS[field], text)
+    return extraction
+
+
+def test_resting_hr_question_asks_only_for_resting_hr():
+    assert question_fields(HYBRID_QUESTIONS['resting_hr_bpm']) == ('resting_hr_bpm',)
+    assert question_fields(HYBRID_QUESTIONS['hrv_ms']) == ('hrv_ms', 'resting_hr_bpm')
+
+
+def test_lone_number_answers_resting_hr():
+    extraction = answer('resting_hr_bpm', '62')
+    assert extraction.values['resting_hr_bpm'] == 62
+    assert 'resting_hr_bpm' in extraction.filled
+    assert 'hrv_ms' not in extraction.filled
+
+
+def test_labeled_resting_hr():
+    assert answer('resting_hr_bpm', 'rhr is about 55 bpm').values['resting_hr_bpm'] == 55
+
+
+def test_combined_health_question_still_needs_both_numbers():
+    extraction = answer('hrv_ms', '70 and 52')
+    assert extraction.values['hrv_ms'] == 70
+    assert extraction.values['resting_hr_bpm'] == 52
+
+
+def test_skip_phrase_with_a_number_is_an_answer():
+    assert not is_skip('no idea honestly, probably 405')
+    extraction = answer('pb_squat_1rm', 'no idea honestly, probably 405')
+    assert extraction.values['pb_squat_1rm'] == 405
+
+
+def test_whole_message_skips():
+    for text in ('skip', 'Nope.', 'skip it', "I don't know", 'n/a'):
+        assert is_skip(text), text
+    extraction = answer('vo2max', 'skip')
+    assert 'vo2max' in extraction.filled
+    assert extraction.values['vo2max'] is None
+
+
+def test_skip_phrase_without_a_number_skips():
+    assert is_skip('no idea, never tested it')
+    extraction = answer('pb_bench_1rm', 'nope, I never bench')
+    assert 'pb_bench_1rm' in extraction.filled
+    assert extraction.values['pb_bench_1rm'] is None
+
+
+def test_skip_skips_every_field_of_the_question():
+    extraction = answer('hrv_ms', 'skip')
+    assert {'hrv_ms', 'resting_hr_bpm'} <= extraction.filled
+
+
+def test_parse_name_rejects_affirmations():
+    for text in ('yes', 'Yes!', 'ok', 'sure', 'hey', 'skip'):
+        assert parse_name(text) is None, text
+
+
+def test_parse_name_strips_leading_affirmation():
+    assert parse_name("yes I'm Ana") == {'first_name': 'Ana'}
+    assert parse_name('ok, Sam Jones') == {'first_name': 'Sam', 'last_name': 'Jones'}
+
+
+def test_parse_name():
+    assert parse_name('my name is jordan lee') == {'first_name': 'Jordan', 'last_name': 'Lee'}
@@ -0,0 +1,63 @@
+from backend import interview_greetings
+from backend.interview_greetings import GreetingCache, greeting_key
+from backend.openai_standin import StandInOpenAI
+
+
+def offline_client():
+    return StandInOpenAI(first_token_latency='fixed:0', delta_latency='fixed:0')
+
+
+class FailingResponses:
+    def create(self, **params):
+        raise RuntimeError('model unavailable')
+
+
+def test_keys_follow_the_prompt_or_the_instructions():
+    assert greeting_key('gpt', prompt={'id': 'pmpt_1', 'version': '2'}) == 'gpt:prompt:pmpt_1'
+    assert greeting_key('gpt', instructions='a') == greeting_key('gpt', instructions='a')
+    assert greeting_key('gpt', instructions='a') != greeting_key('gpt', instructions='b')
+
+
+def test_greeting_is_generated_once_and_shared():
+    client = offline_client()
+    cache = GreetingCache(client)
+    key = cache.register('gpt-test', instructions='Interview the athlete')
+    assert cache.get(key) is None
+
+    cache.refresh_due()
+    greeting = cache.get(key)
+    assert greeting['text'].startswith('Welcome to Hybrid House!')
+    assert cache.get(key) is greeting
+
+    # Sessions chain their first turn from the shared stored response
+    reply = client.responses.create(model='gpt-test', input=[{'role': 'user', 'content': 'Sam'}],
+                                    previous_response_id=greeting['response_id'])
+    assert reply.output_text
+
+
+def test_stale_greeting_is_regenerated():
+    cache = GreetingCache(offline_client(), refresh_interval=60)
+    key = cache.register('gpt-test', instructions='Interview the athlete')
+    first = cache.generate(key)
+    cache.refresh_due()
+    assert cache.get(key) is first
+
+    first['generated_at'] -= 61
+    cache.refresh_due()
+    assert cache.get(key)['response_id'] != first['response_id']
+
+
+def test_failed_refresh_keeps_the_previous_greeting_and_backs_off(monkeypatch):
+    client = offline_client()
+    cache = GreetingCache(client, refresh_interval=60)
+    key = cache.register('gpt-test', instructions='Interview the athlete')
+    first = cache.generate(key)
+    first['generated_at'] -= 61
+
+    client.responses = FailingResponses()
+    cache.refresh_due()
+    assert cache.get(key) is first
+    assert key not in cache._due()
+
+    monkeypatch.setattr(interview_greetings, 'GREETING_RETRY_SECONDS', 0)
+    assert key in cache._due()
@@ -0,0 +1,56 @@
+import uuid
+
+from backend.interview_sessions import (
+    InterviewSessionStore,
+    load_session_messages,
+    message_rows,
+    read_session_messages,
+)
+
+
+def legacy_session(supabase, messages):
+    return supabase.table('interview_sessions').insert({
+        'id': str(uuid.uuid4()),
+        'user_id': 'user-1',
+        'status': 'active',
+        'messages': messages,
+        'version': 0,
+    }).execute().data[0]
+
+
+def test_message_rows_number_from_the_first_new_seq():
+    rows = message_rows('s1', [{'role': 'user', 'content': 'a'}, {'role': 'assistant', 'content': 'b'}], 4)
+    assert [(row['session_id'], row['seq'], row['content']) for row in rows] == [('s1', 4, 'a'), ('s1', 5, 'b')]
+
+
+def test_unmigrated_session_falls_back_to_the_jsonb_array(supabase):
+    legacy = [{'role': 'user', 'content': 'old'}]
+    session = legacy_session(supabase, legacy)
+
+    assert load_session_messages(supabase, session['id']) is None
+    assert read_session_messages(supabase, session['id']) == (legacy, 0)
+
+
+def test_next_write_moves_legacy_messages_into_the_table(supabase):
+    session = legacy_session(supabase, [{'role': 'user', 'content': 'old'}])
+    store = InterviewSessionStore(supabase)
+    cached = store.get(session['id'], 'user-1')
+    assert cached['persisted_count'] == 0
+
+    store.record_turn(session['id'], [{'role': 'user', 'content': 'new'}])
+    store.flush()
+
+    messages = load_session_messages(supabase, session['id'])
+    assert [message['content'] for message in messages] == ['old', 'new']
+    assert read_session_messages(supabase, session['id'])[1] == 2
+
+
+def test_retried_append_does_not_duplicate_messages(supabase):
+    session = legacy_session(supabase, [])
+    rows = message_rows(session['id'], [{'role': 'user', 'content': 'once'}])
+    for _ in range(2):
+        supabase.table('interview_messages').upsert(
+            rows, on_conflict='session_id,seq', ignore_duplicates=True
+        ).execute()
+
+    assert [message['content'] for message in load_session_messages(supabase, session['id'])] == ['once']
@@ -0,0 +1,130 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from backend import interview_router
+from backend.interview_extractor import HYBRID_FIELDS, HYBRID_QUESTIONS, extract_interview_fields
+from backend.interview_router import FAST_MODEL, LARGE_MODEL, route_turn
+from backend.llm_ledger import LLMLedger
+
+
+def route(question, answer):
+    messages = [
+        {'role': 'assistant', 'content': question},
+        {'role': 'user', 'content': answer}
+    ]
+    return route_turn(messages, extract_interview_fields(messages))
+
+
+def test_parsed_answer_goes_to_the_fast_model():
+    decision = route(HYBRID_QUESTIONS['weight_lb'], '180 lb')
+    assert decision.route == 'scripted'
+    assert decision.model == FAST_MODEL
+    assert decision.reason == 'parsed weight_lb'
+
+
+def test_skip_is_a_parsed_answer():
+    assert route(HYBRID_QUESTIONS['vo2max'], 'skip').route == 'scripted'
+
+
+def test_confirmation_goes_to_the_fast_model():
+    decision = route('Nice work. Ready for the next piece? (yes/skip)', 'yes')
+    assert decision == ('scripted', FAST_MODEL, 'confirmation')
+
+
+def test_question_back_goes_to_the_large_model():
+    decision = route(HYBRID_QUESTIONS['pb_mile'], 'does a treadmill mile count?')
+    assert decision == ('ambiguous', LARGE_MODEL, 'user asked a question')
+
+
+def test_unparsed_answer_goes_to_the_large_model():
+    decision = route(HYBRID_QUESTIONS['pb_bench_1rm'], 'I mostly do dumbbells these days')
+    assert decision == ('ambiguous', LARGE_MODEL, 'answer did not parse')
+
+
+def test_off_script_question_goes_to_the_large_model():
+    decision = route('Tell me a bit about your training background.', 'mostly crossfit')
+    assert decision.route == 'ambiguous'
+    assert decision.reason.startswith('off-script question')
+
+
+@pytest.mark.parametrize('answer', ['done', 'Finish', 'force_complete'])
+def test_finish_words_go_to_synthesis(answer):
+    decision = route(HYBRID_QUESTIONS['pb_mile'], answer)
+    assert decision == ('synthesis', LARGE_MODEL, 'user asked to finish')
+
+
+def test_settled_interview_goes_to_synthesis():
+    answers = {
+        'first_name': 'Jordan', 'sex': 'male', 'weight_lb': '180', 'vo2max': 'skip', 'hrv_ms': 'skip',
+        'resting_hr_bpm': 'skip', 'pb_mile': '5:30', 'weekly_miles': '20', 'long_run': '10',
+        'pb_bench_1rm': '225', 'pb_squat_1rm': '315', 'pb_deadlift_1rm': '405'
+    }
+    messages = []
+    for field in HYBRID_FIELDS:
+        messages.append({'role': 'assistant', 'content': HYBRID_QUESTIONS[field]})
+        messages.append({'role': 'user', 'content': answers[field]})
+
+    decision = route_turn(messages, extract_interview_fields(messages))
+    assert decision == ('synthesis', LARGE_MODEL, 'all fields settled')
+
+
+def test_routing_disabled_always_uses_the_large_model(monkeypatch):
+    monkeypatch.setattr(interview_router, 'ROUTING_ENABLED', False)
+    decision = route(HYBRID_QUESTIONS['weight_lb'], '180 lb')
+    assert decision == ('large', LARGE_MODEL, 'routing disabled')
+
+
+def test_ledger_merges_calls_per_route():
+    ledger = LLMLedger(persist=False)
+    usage = SimpleNamespace(input_tokens=100, output_tokens=20, input_tokens_details=None)
+    for endpoint, model, route_name in [('hybrid_chat', FAST_MODEL, 'scripted'),
+                                        ('hybrid_chat', FAST_MODEL, 'scripted'),
+                                        ('hybrid_chat', LARGE_MODEL, 'ambiguous'),
+                                        ('hybrid_stream', LARGE_MODEL, 'ambiguous'),
+                                        ('greeting', LARGE_MODEL, None)]:
+        with ledger.track(endpoint, model, 's1', route=route_name) as call:
+            call.response('resp', usage)
+    with pytest.raises(RuntimeError):
+        with ledger.track('hybrid_chat', LARGE_MODEL, 's1', route='synthesis'):
+            raise RuntimeError('boom')
+
+    routes = ledger.routes()
+    # Untagged calls are left out of the per-route view
+    assert set(routes) == {'scripted', 'ambiguous', 'synthesis'}
+    assert routes['scripted']['models'] == {FAST_MODEL: 2}
+    assert routes['scripted']['avg_output_tokens'] == 20.0
+    # Endpoints are merged into one histogram per route
+    assert routes['ambiguous']['calls'] == 2
+    assert routes['ambiguous']['wall']['count'] == 2
+    assert routes['synthesis']['errors'] == 1
+
+
+def admin_check(server, monkeypatch, claims, internal_token=None):
+    from jose import jwt
+    monkeypatch.setattr(server, 'SUPABASE_JWT_SECRET', 'test-secret')
+    monkeypatch.setattr(server, 'ADMIN_USER_IDS', {'admin-user'})
+    monkeypatch.setattr(server, 'INTERNAL_API_TOKEN', 'internal-token')
+    token = jwt.encode({'aud': 'authenticated', **claims}, 'test-secret', algorithm='HS256')
+    return asyncio.run(server.verify_admin_or_internal(f"Bearer {token}", internal_token))
+
+
+def test_routing_metrics_need_an_admin_or_internal_caller(server, monkeypatch):
+    assert admin_check(server, monkeypatch, {'sub': 'admin-user'})['sub'] == 'admin-user'
+    assert admin_check(server, monkeypatch, {'sub': 'u1', 'app_metadata': {'role': 'admin'}})['sub'] == 'u1'
+    assert admin_check(server, monkeypatch, {'sub': 'u1'}, internal_token='internal-token')['internal'] is True
+    with pytest.raises(HTTPException) as denied:
+        admin_check(server, monkeypatch, {'sub': 'u1'}, internal_token='wrong')
+    assert denied.value.status_code == 403
+
+
+def test_routing_metrics_come_from_the_ledger(server, monkeypatch):
+    ledger = LLMLedger(persist=False)
+    with ledger.track('hybrid_chat', FAST_MODEL, 's1', route='scripted'):
+        pass
+    monkeypatch.setattr(server, 'llm_ledger', ledger)
+
+    metrics = asyncio.run(server.get_hybrid_interview_routing_metrics({'sub': None, 'internal': True}))
+    assert metrics['routes']['scripted']['calls'] == 1
@@ -0,0 +1,99 @@
+import uuid
+
+from backend.interview_sessions import InterviewSessionStore
+
+
+def new_session(supabase, store, user_id='user-1'):
+    row = supabase.table('interview_sessions').insert({
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'status': 'active',
+        'current_index': 0,
+        'version': 0,
+        'last_response_id': None,
+    }).execute().data[0]
+    return store.create(row)
+
+
+def stored_messages(supabase, session_id):
+    return [row['content'] for row in supabase.table('interview_messages').select('content, seq')
+            .eq('session_id', session_id).order('seq').execute().data]
+
+
+def row(supabase, session_id):
+    return supabase.table('interview_sessions').select('*').eq('id', session_id).execute().data[0]
+
+
+def turn(text):
+    return [{'role': 'user', 'content': text}, {'role': 'assistant', 'content': f"re: {text}"}]
+
+
+def test_cached_session_is_only_returned_to_its_owner(supabase, monkeypatch):
+    store = InterviewSessionStore(supabase)
+    session = new_session(supabase, store)
+
+    reads = []
+    table = supabase.table
+    monkeypatch.setattr(supabase, 'table', lambda name: reads.append(name) or table(name))
+    assert store.get(session['id'], 'user-1') is session
+    assert store.get(session['id'], 'someone-else') is None
+    assert reads == []
+
+
+def test_turns_are_written_behind_as_appended_messages(supabase):
+    store = InterviewSessionStore(supabase)
+    session = new_session(supabase, store)
+
+    store.record_turn(session['id'], turn('hi'))
+    assert stored_messages(supabase, session['id']) == []
+
+    store.flush(session['id'])
+    assert stored_messages(supabase, session['id']) == ['hi', 're: hi']
+    assert row(supabase, session['id'])['version'] == 1
+
+    store.record_turn(session['id'], turn('again'))
+    store.flush()
+    assert stored_messages(supabase, session['id']) == ['hi', 're: hi', 'again', 're: again']
+    assert row(supabase, session['id'])['current_index'] == 2
+
+
+def test_idle_flush_leaves_recent_turns_pending(supabase):
+    store = InterviewSessionStore(supabase)
+    session = new_session(supabase, store)
+    store.record_turn(session['id'], turn('hi'))
+
+    store.flush(idle_for=60)
+    assert stored_messages(supabase, session['id']) == []
+
+
+def test_evicted_session_is_written_and_reloaded(supabase):
+    store = InterviewSessionStore(supabase, max_size=1)
+    first = new_session(supabase, store)
+    store.record_turn(first['id'], turn('hi'))
+    new_session(supabase, store)
+
+    assert stored_messages(supabase, first['id']) == ['hi', 're: hi']
+    reloaded = store.get(first['id'], 'user-1')
+    assert reloaded is not first
+    assert [message['content'] for message in reloaded['messages']] == ['hi', 're: hi']
+    assert reloaded['persisted_count'] == 2
+
+
+def test_turn_on_a_session_that_left_the_cache_is_kept(supabase):
+    store = InterviewSessionStore(supabase)
+    session = new_session(supabase, store)
+    store.discard_sessions([session['id']])
+
+    store.record_turn(session['id'], turn('hi'))
+    store.flush()
+    assert stored_messages(supabase, session['id']) == ['hi', 're: hi']
+
+
+def test_finish_writes_pending_messages_with_the_status(supabase):
+    store = InterviewSessionStore(supabase)
+    session = new_session(supabase, store)
+    store.record_turn(session['id'], turn('done'))
+
+    store.finish(session['id'], 'completed')
+    assert row(supabase, session['id'])['status'] == 'completed'
+    assert stored_messages(supabase, session['id']) == ['done', 're: done']
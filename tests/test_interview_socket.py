@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+import uuid
+from contextlib import aclosing, contextmanager
+
+import pytest
+
+
+@contextmanager
+def blocking_stream(events, closed, delay=0.0):
+    """A sync stream like the OpenAI client's: every event blocks the calling thread"""
+    def iterate():
+        for event in events:
+            time.sleep(delay)
+            yield event
+    try:
+        yield iterate()
+    finally:
+        closed.set()
+
+
+def test_iterate_in_thread_yields_events_without_blocking_the_loop(server):
+    closed = threading.Event()
+
+    async def scenario():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker = asyncio.ensure_future(tick())
+        events = [event async for event in server.iterate_in_thread(
+            lambda: blocking_stream(['a', 'b', 'c'], closed, delay=0.03))]
+        ticker.cancel()
+        return events, ticks
+
+    events, ticks = asyncio.run(scenario())
+    assert events == ['a', 'b', 'c']
+    # The loop kept running while the thread waited on the stream
+    assert ticks > 5
+    assert closed.is_set()
+
+
+def test_iterate_in_thread_reraises_stream_errors(server):
+    def failing_stream():
+        raise ConnectionError('stream dropped')
+
+    async def scenario():
+        return [event async for event in server.iterate_in_thread(failing_stream)]
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(scenario())
+
+
+def test_closing_the_iterator_stops_the_thread(server):
+    closed = threading.Event()
+
+    async def scenario():
+        async with aclosing(server.iterate_in_thread(
+                lambda: blocking_stream(range(1000), closed, delay=0.001))) as events:
+            async for event in events:
+                if event == 2:
+                    break
+        return await asyncio.to_thread(closed.wait, 2)
+
+    assert asyncio.run(scenario())
+
+
+@pytest.fixture
+def socket_client(server, monkeypatch):
+    from fastapi.testclient import TestClient
+    monkeypatch.setattr(server, 'SUPABASE_JWT_SECRET', 'test-secret')
+    return TestClient(server.app)
+
+
+def token_for(user_id, expires_in=3600):
+    from jose import jwt
+    claims = {'sub': user_id, 'aud': 'authenticated', 'exp': int(time.time()) + expires_in}
+    return jwt.encode(claims, 'test-secret', algorithm='HS256')
+
+
+def test_socket_rejects_a_bad_token(socket_client):
+    from starlette.websockets import WebSocketDisconnect
+    with socket_client.websocket_connect('/api/hybrid-interview/ws') as socket:
+        socket.send_json({'type': 'auth', 'token': 'not-a-jwt'})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            socket.receive_json()
+    assert closed.value.code == 4401
+
+
+def test_socket_runs_an_interview_turn(socket_client):
+    user_id = f"user-{uuid.uuid4().hex}"
+    with socket_client.websocket_connect('/api/hybrid-interview/ws') as socket:
+        socket.send_json({'type': 'auth', 'token': token_for(user_id)})
+        assert socket.receive_json() == {'type': 'ready'}
+
+        socket.send_json({'type': 'message', 'content': 'Sam'})
+        assert socket.receive_json()['detail'] == 'Start or resume a session first'
+
+        socket.send_json({'type': 'start'})
+        session = socket.receive_json()
+        assert session['type'] == 'session'
+
+        socket.send_json({'type': 'message', 'content': 'Sam', 'idempotency_key': 'key-1'})
+        frames = []
+        while not frames or frames[-1]['type'] != 'turn':
+            frames.append(socket.receive_json())
+
+    assert frames[0] == {'type': 'typing', 'active': True}
+    assert frames[-2] == {'type': 'typing', 'active': False}
+    deltas = ''.join(frame['text'] for frame in frames if frame['type'] == 'delta')
+    assert deltas and deltas == frames[-1]['response']
+    assert frames[-1]['completed'] is False
@@ -0,0 +1,179 @@
+import asyncio
+import uuid
+
+import pytest
+
+from backend import interview_sessions
+from backend.interview_sessions import InterviewSessionStore, SessionVersionConflict
+
+
+def new_session(supabase, user_id='user-1'):
+    return supabase.table('interview_sessions').insert({
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'status': 'active',
+        'current_index': 0,
+        'version': 0,
+        'last_response_id': 'resp-0',
+    }).execute().data[0]
+
+
+def turn(text):
+    return [{'role': 'user', 'content': text}, {'role': 'assistant', 'content': f"re: {text}"}]
+
+
+def stored_messages(supabase, session_id):
+    return [row['content'] for row in supabase.table('interview_messages').select('content, seq')
+            .eq('session_id', session_id).order('seq').execute().data]
+
+
+def session_row(supabase, session_id):
+    return supabase.table('interview_sessions').select('*').eq('id', session_id).execute().data[0]
+
+
+def test_turn_commits_its_response_id_before_returning(supabase):
+    row = new_session(supabase)
+    store = InterviewSessionStore(supabase)
+    store.get(row['id'], 'user-1')
+
+    store.record_turn(row['id'], turn('hi'), last_response_id='resp-1', previous_response_id='resp-0')
+    committed = session_row(supabase, row['id'])
+    assert committed['last_response_id'] == 'resp-1'
+    assert committed['current_index'] == 1
+    # The messages themselves are still written behind
+    assert stored_messages(supabase, row['id']) == []
+
+
+def test_racing_turn_on_another_worker_conflicts_and_keeps_its_messages(supabase):
+    row = new_session(supabase)
+    worker_a, worker_b = InterviewSessionStore(supabase), InterviewSessionStore(supabase)
+    worker_a.get(row['id'], 'user-1')
+    worker_b.get(row['id'], 'user-1')
+
+    worker_a.record_turn(row['id'], turn('from a'), last_response_id='resp-a', previous_response_id='resp-0')
+    worker_a.flush()
+    with pytest.raises(SessionVersionConflict):
+        worker_b.record_turn(row['id'], turn('from b'), last_response_id='resp-b', previous_response_id='resp-0')
+
+    assert session_row(supabase, row['id'])['last_response_id'] == 'resp-a'
+    assert stored_messages(supabase, row['id']) == ['from a', 're: from a', 'from b', 're: from b']
+
+    # Worker B starts over from the row on its next turn
+    reloaded = worker_b.get(row['id'], 'user-1')
+    assert reloaded['last_response_id'] == 'resp-a'
+    assert len(reloaded['messages']) == 4
+
+
+def test_conflict_at_write_behind_appends_pending_messages(supabase):
+    row = new_session(supabase)
+    worker_a, worker_b = InterviewSessionStore(supabase), InterviewSessionStore(supabase)
+    worker_a.get(row['id'], 'user-1')
+    worker_b.get(row['id'], 'user-1')
+
+    worker_b.record_turn(row['id'], turn('local'))
+    worker_a.record_turn(row['id'], turn('from a'), last_response_id='resp-a', previous_response_id='resp-0')
+    worker_a.flush()
+    worker_b.flush()
+
+    assert stored_messages(supabase, row['id']) == ['from a', 're: from a', 'local', 're: local']
+
+
+def test_turn_on_a_reloaded_session_whose_chain_moved_conflicts(supabase):
+    row = new_session(supabase)
+    store = InterviewSessionStore(supabase)
+    store.get(row['id'], 'user-1')
+    store.discard_sessions([row['id']])
+    supabase.table('interview_sessions').update({'last_response_id': 'resp-elsewhere', 'version': 1})\
+        .eq('id', row['id']).execute()
+
+    with pytest.raises(SessionVersionConflict):
+        store.record_turn(row['id'], turn('stale'), last_response_id='resp-1', previous_response_id='resp-0')
+    assert session_row(supabase, row['id'])['last_response_id'] == 'resp-elsewhere'
+    assert stored_messages(supabase, row['id']) == ['stale', 're: stale']
+
+
+def test_idempotent_turn_results_expire(supabase, monkeypatch):
+    store = InterviewSessionStore(supabase)
+    store.remember_turn('user-1', 's1', 'key-1', {'response': 'hi'})
+    assert store.turn_result('user-1', 's1', 'key-1') == {'response': 'hi'}
+    assert store.turn_result('user-2', 's1', 'key-1') is None
+
+    monkeypatch.setattr(interview_sessions, 'IDEMPOTENCY_TTL_SECONDS', -1)
+    assert store.turn_result('user-1', 's1', 'key-1') is None
+
+
+def test_turn_lock_is_shared_per_session(supabase):
+    store = InterviewSessionStore(supabase)
+
+    async def scenario():
+        lock = store.turn_lock('s1')
+        assert store.turn_lock('s1') is lock
+        assert store.turn_lock('s2') is not lock
+
+    asyncio.run(scenario())
+
+
+def start_server_session(server, user_id):
+    row = server.supabase.table('interview_sessions').insert({
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'status': 'active',
+        'version': 0,
+    }).execute().data[0]
+    server.interview_session_store.create(row)
+    server.interview_session_store.record_turn(row['id'], [{'role': 'assistant', 'content': "What's your first name?"}])
+    return row['id']
+
+
+def hybrid_turn(server, session_id, text):
+    return server.UserMessageRequest(
+        session_id=session_id, messages=[server.InterviewMessage(role='user', content=text)]
+    )
+
+
+def test_repeated_idempotency_key_replays_the_turn(server):
+    user_id = f"user-{uuid.uuid4().hex}"
+    session_id = start_server_session(server, user_id)
+
+    async def scenario():
+        first = await server.serve_hybrid_interview_turn(hybrid_turn(server, session_id, 'Sam'), user_id, 'key-1')
+        replay = await server.serve_hybrid_interview_turn(hybrid_turn(server, session_id, 'Sam'), user_id, 'key-1')
+        return first, replay
+
+    first, replay = asyncio.run(scenario())
+    assert replay is first
+    session = server.interview_session_store.get(session_id, user_id)
+    assert [m['content'] for m in session['messages'] if m['role'] == 'user'] == ['Sam']
+
+
+def test_turn_racing_another_worker_gets_409(server):
+    from fastapi import HTTPException
+
+    user_id = f"user-{uuid.uuid4().hex}"
+    session_id = start_server_session(server, user_id)
+    # Another worker moves the session on after this one cached it
+    server.supabase.table('interview_sessions').update({'last_response_id': 'resp-elsewhere', 'version': 5})\
+        .eq('id', session_id).execute()
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(server.serve_hybrid_interview_turn(hybrid_turn(server, session_id, 'Sam'), user_id, 'key-2'))
+    assert raised.value.status_code == 409
+    assert 'Sam' in stored_messages(server.supabase, session_id)
+    assert server.interview_session_store.turn_result(user_id, session_id, 'key-2') is None
+
+
+def test_interview_chat_takes_the_turn_lock(server):
+    user_id = f"user-{uuid.uuid4().hex}"
+    session_id = start_server_session(server, user_id)
+    request = server.InterviewRequest(session_id=session_id, messages=[server.InterviewMessage(role='user', content='Sam')])
+
+    async def scenario():
+        lock = server.interview_session_store.turn_lock(session_id)
+        await lock.acquire()
+        turn = asyncio.ensure_future(server.chat_interview(request, {'sub': user_id}))
+        await asyncio.sleep(0.05)
+        assert not turn.done()
+        lock.release()
+        return await turn
+
+    assert asyncio.run(scenario())['completed'] is False
@@ -0,0 +1,86 @@
+import asyncio
+
+from backend.invalidation_bus import InvalidationBus, PostgresInvalidationListener, make_event, write_token
+
+
+def make_bus():
+    bus = InvalidationBus()
+    events = []
+    bus.subscribe(events.append)
+    return bus, events
+
+
+def notify(listener, **payload):
+    import json
+    listener._on_notify(None, 1, 'hybrid_house_invalidation', json.dumps(payload))
+
+
+def test_write_token_normalizes_timestamps():
+    assert write_token('2026-10-19T08:00:00.123456+00:00') == write_token('2026-10-19T08:00:00.123456Z')
+    assert write_token('2026-10-19T10:00:00.123456+02:00') == write_token('2026-10-19T08:00:00.123456')
+    assert write_token(None) is None
+
+
+def test_echo_of_a_local_write_is_dropped_once():
+    bus, events = make_bus()
+    listener = PostgresInvalidationListener(bus, dsn=None)
+    bus.publish_athlete_profile_change('update', 'u1', 'p1', '2026-10-19T08:00:00.5+00:00')
+
+    notify(listener, table='athlete_profiles', action='update', user_id='u1', profile_id='p1',
+           updated_at='2026-10-19T08:00:00.5+00:00')
+    assert [event['source'] for event in events] == ['local']
+
+    # A later write that left updated_at alone is not the same write's echo any more
+    notify(listener, table='athlete_profiles', action='update', user_id='u1', profile_id='p1',
+           updated_at='2026-10-19T08:00:00.5+00:00')
+    assert [event['source'] for event in events] == ['local', 'postgres']
+
+
+def test_out_of_band_write_right_after_a_local_one_is_delivered():
+    bus, events = make_bus()
+    listener = PostgresInvalidationListener(bus, dsn=None)
+    bus.publish_athlete_profile_change('update', 'u1', 'p1', '2026-10-19T08:00:00+00:00')
+
+    notify(listener, table='athlete_profiles', action='update', user_id='u1', profile_id='p1',
+           updated_at='2026-10-19T08:00:01+00:00')
+    notify(listener, table='athlete_profiles', action='delete', user_id='u1', profile_id='p1',
+           updated_at='2026-10-19T08:00:00+00:00')
+    assert [(event['source'], event['action']) for event in events] == [
+        ('local', 'update'), ('postgres', 'update'), ('postgres', 'delete')
+    ]
+
+
+def test_notifications_without_a_token_are_delivered():
+    bus, events = make_bus()
+    bus.publish_user_profile_change('u1')
+    bus.publish(make_event('user_profiles', 'update', user_id='u1', source='postgres'))
+    assert len(events) == 2
+
+
+def test_started_bus_coalesces_pending_events_per_row():
+    bus, events = make_bus()
+
+    async def scenario():
+        await bus.start()
+        # Delivery runs only once this coroutine yields, so all three are queued first
+        bus.publish_athlete_profile_change('update', 'u1', 'p1', '2026-10-19T08:00:00+00:00')
+        bus.publish_athlete_profile_change('delete', 'u1', 'p1', '2026-10-19T08:00:01+00:00')
+        bus.publish_athlete_profile_change('update', 'u2', 'p2', '2026-10-19T08:00:02+00:00')
+        assert events == []
+        await bus.stop()
+
+    asyncio.run(scenario())
+    assert [(event['profile_id'], event['action']) for event in events] == [('p1', 'delete'), ('p2', 'update')]
+
+
+def test_failing_subscriber_does_not_stop_the_others():
+    bus = InvalidationBus()
+    events = []
+
+    def failing(event):
+        raise RuntimeError('boom')
+
+    bus.subscribe(failing)
+    bus.subscribe(events.append)
+    bus.publish_user_profile_change('u1')
+    assert len(events) == 1
@@ -0,0 +1,72 @@
+from backend.leaderboard_changes import SnapshotChangeLog, diff_snapshots
+from backend.leaderboard_snapshot import LeaderboardSnapshot
+
+
+def entry(profile_id, score):
+    return {'profile_id': profile_id, 'user_id': f"user-{profile_id}", 'score': score}
+
+
+def snapshot(version, *scores):
+    return LeaderboardSnapshot([entry(pid, score) for pid, score in scores], version=version)
+
+
+def test_diff_snapshots():
+    old = snapshot(1, ('a', 90), ('b', 80), ('c', 70))
+    new = snapshot(2, ('a', 90), ('c', 85), ('d', 60))
+    diff = diff_snapshots(old, new)
+    assert [e['profile_id'] for e in diff['inserted']] == ['d']
+    assert [e['profile_id'] for e in diff['updated']] == ['c']
+    assert diff['removed'] == ['b']
+    assert diff['rank_shifts'] == {}
+    assert (diff['from_version'], diff['to_version'], diff['total']) == (1, 2, 3)
+
+
+def test_rank_shift_without_other_changes():
+    old = snapshot(1, ('a', 90), ('b', 80))
+    new = snapshot(2, ('a', 90), ('b', 80), ('c', 95))
+    diff = diff_snapshots(old, new)
+    assert diff['rank_shifts'] == {'a': 2, 'b': 3}
+
+
+def test_changes_merged_across_versions():
+    log = SnapshotChangeLog()
+    v1 = snapshot(1, ('a', 90), ('b', 80))
+    v2 = snapshot(2, ('a', 90), ('b', 80), ('c', 70))
+    v3 = snapshot(3, ('a', 90), ('c', 75))
+    log.record(None, v1)
+    log.record(v1, v2)
+    log.record(v2, v3)
+
+    changes = log.changes_since(1, v3)
+    assert not changes['full_reload_required']
+    assert [(e['profile_id'], e['score'], e['rank']) for e in changes['inserted']] == [('c', 75, 2)]
+    assert changes['updated'] == []
+    assert changes['removed'] == ['b']
+
+
+def test_removed_then_readded_is_an_update():
+    log = SnapshotChangeLog()
+    v1 = snapshot(1, ('a', 90), ('b', 80))
+    v2 = snapshot(2, ('a', 90))
+    v3 = snapshot(3, ('a', 90), ('b', 85))
+    log.record(v1, v2)
+    log.record(v2, v3)
+
+    changes = log.changes_since(1, v3)
+    assert changes['removed'] == []
+    assert [e['profile_id'] for e in changes['updated']] == ['b']
+
+
+def test_unknown_version_requires_full_reload():
+    log = SnapshotChangeLog(size=1)
+    v1 = snapshot(1, ('a', 90))
+    v2 = snapshot(2, ('a', 91))
+    v3 = snapshot(3, ('a', 92))
+    log.record(v1, v2)
+    log.record(v2, v3)
+
+    assert log.changes_since(1, v3)['full_reload_required']
+    assert log.changes_since(7, v3)['full_reload_required']
+    current = log.changes_since(3, v3)
+    assert not current['full_reload_required']
+    assert current['inserted'] == [] and current['rank_shifts'] == []
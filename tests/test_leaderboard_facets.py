@@ -0,0 +1,67 @@
+import pytest
+
+# leaderboard_facets registers itself with the global RankingService, which needs supabase-py
+pytest.importorskip('supabase')
+pytest.importorskip('dotenv')
+
+from backend.leaderboard_changes import diff_snapshots  # noqa: E402
+from backend.leaderboard_facets import LeaderboardFacets, get_score_band  # noqa: E402
+from backend.leaderboard_snapshot import LeaderboardSnapshot  # noqa: E402
+
+
+def entry(profile_id, score, country='US', gender='male', age=30):
+    return {
+        'profile_id': profile_id,
+        'user_id': f"user-{profile_id}",
+        'score': score,
+        'country': country,
+        'gender': gender,
+        'age': age,
+    }
+
+
+def counts(facets, name):
+    return {item['value']: item['count'] for item in facets['facets'][name]}
+
+
+def test_score_bands():
+    assert get_score_band(73.4) == '70-80'
+    assert get_score_band(100) == '90-100'
+    assert get_score_band(0) == '0-10'
+    assert get_score_band(None) is None
+
+
+def test_counts_for_snapshot():
+    snapshot = LeaderboardSnapshot([
+        entry('a', 91), entry('b', 75, country='CA', gender='female', age=24), entry('c', 72, country=' ')
+    ], version=1)
+    facets = LeaderboardFacets().for_snapshot(snapshot)
+    assert facets['total'] == 3
+    assert counts(facets, 'country') == {'US': 1, 'CA': 1}
+    assert counts(facets, 'score_band') == {'70-80': 2, '90-100': 1}
+    assert [item['value'] for item in facets['facets']['age_group']] == ['18-24', '30-34']
+
+
+def test_diff_updates_only_touched_buckets():
+    old = LeaderboardSnapshot([entry('a', 91), entry('b', 75)], version=1)
+    new = LeaderboardSnapshot([entry('a', 91), entry('b', 55, country='MX'), entry('c', 65)], version=2)
+    facets = LeaderboardFacets()
+    facets.rebuild(old)
+    facets.apply_diff(diff_snapshots(old, new))
+
+    assert facets.version == 2
+    result = facets.for_snapshot(new)
+    assert result == LeaderboardFacets().for_snapshot(new)
+    assert counts(result, 'country') == {'US': 2, 'MX': 1}
+
+
+def test_out_of_step_diff_forces_rebuild():
+    v1 = LeaderboardSnapshot([entry('a', 91)], version=1)
+    v3 = LeaderboardSnapshot([entry('a', 91), entry('b', 45)], version=3)
+    v4 = LeaderboardSnapshot([entry('b', 45)], version=4)
+    facets = LeaderboardFacets()
+    facets.rebuild(v1)
+    facets.apply_diff(diff_snapshots(v3, v4))
+
+    assert facets.version is None
+    assert facets.for_snapshot(v4)['total'] == 1
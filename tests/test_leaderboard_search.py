@@ -0,0 +1,54 @@
+from backend.leaderboard_search import LeaderboardSearchIndex, normalize_name, trigrams
+from backend.leaderboard_snapshot import LeaderboardSnapshot
+
+
+def make_snapshot(version=1):
+    names = [('a', 'John Smith', 90), ('b', 'Zoë Müller', 85), ('c', "Sean O'Neil", 80), ('d', 'Johanna Smythe', 70)]
+    return LeaderboardSnapshot([
+        {'profile_id': pid, 'user_id': f"user-{pid}", 'display_name': name, 'score': score}
+        for pid, name, score in names
+    ], version=version)
+
+
+def test_normalize_name():
+    assert normalize_name('  Zoë  Müller ') == 'zoe muller'
+    assert normalize_name("O'Neil-Smith") == 'oneil smith'
+    assert normalize_name(None) == ''
+
+
+def test_trigrams_are_padded_per_word():
+    assert trigrams('ab') == {'  a', ' ab', 'ab '}
+
+
+def test_prefix_matches_any_word_in_rank_order():
+    index = LeaderboardSearchIndex(make_snapshot())
+    results = index.search('smi')
+    assert [r['profile_id'] for r in results] == ['a']
+    assert results[0]['match'] == 'prefix'
+    assert [r['profile_id'] for r in index.search('joh')] == ['a', 'd']
+
+
+def test_diacritics_and_apostrophes_fold():
+    index = LeaderboardSearchIndex(make_snapshot())
+    assert [r['profile_id'] for r in index.search('zoe')] == ['b']
+    assert [r['profile_id'] for r in index.search('oneil')] == ['c']
+
+
+def test_fuzzy_match_for_typos():
+    index = LeaderboardSearchIndex(make_snapshot())
+    results = index.search('jhon smith')
+    assert results and results[0]['profile_id'] == 'a'
+    assert results[0]['match'] == 'fuzzy'
+
+
+def test_ranks_come_from_newer_entries():
+    index = LeaderboardSearchIndex(make_snapshot())
+    newer = make_snapshot(version=2).with_user_entry('user-a', None, version=3)
+    results = index.search('joh', entries=newer.by_profile_id)
+    assert [(r['profile_id'], r['rank']) for r in results] == [('d', 3)]
+
+
+def test_limit_and_empty_query():
+    index = LeaderboardSearchIndex(make_snapshot())
+    assert len(index.search('joh', limit=1)) == 1
+    assert index.search('  ') == []
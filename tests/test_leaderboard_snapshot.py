@@ -0,0 +1,76 @@
+from backend.leaderboard_snapshot import LeaderboardSnapshot, get_age_group, get_segment_key
+
+
+def entry(profile_id, score, gender=None, age=None, user_id=None):
+    return {
+        'profile_id': profile_id,
+        'user_id': user_id or f"user-{profile_id}",
+        'score': score,
+        'gender': gender,
+        'age': age,
+    }
+
+
+def make_snapshot():
+    return LeaderboardSnapshot([
+        entry('a', 80, 'Male', 27),
+        entry('b', 90, 'female', 31),
+        entry('c', 80, 'male', 26),
+        entry('d', 70, 'male', 45),
+        entry('e', 60),
+    ], version=3)
+
+
+def test_segment_keys():
+    assert get_age_group(27) == '25-29'
+    assert get_age_group(None) is None
+    assert get_segment_key(' Male ', 27) == 'male:25-29'
+    assert get_segment_key(None, 27) is None
+
+
+def test_entries_sorted_with_competition_ranks():
+    snapshot = make_snapshot()
+    assert [e['profile_id'] for e in snapshot.entries][0] == 'b'
+    assert [e['rank'] for e in snapshot.entries] == [1, 2, 2, 4, 5]
+    assert snapshot.by_profile_id['e']['segment'] is None
+
+
+def test_rank_for_score_ties_share_the_better_rank():
+    snapshot = make_snapshot()
+    assert snapshot.rank_for_score(80) == 2
+    assert snapshot.rank_for_score(85) == 2
+    assert snapshot.rank_for_score(95) == 1
+    assert snapshot.rank_for_score(10) == 6
+    assert snapshot.rank_for_score(80, 'male:25-29') == 1
+
+
+def test_percentile_counts_only_strictly_lower_scores():
+    snapshot = make_snapshot()
+    assert snapshot.percentile_for_score(80) == 40.0
+    assert snapshot.percentile_for_score(60) == 0.0
+    assert snapshot.percentile_for_score(100) == 100.0
+    assert LeaderboardSnapshot([]).percentile_for_score(50) is None
+
+
+def test_score_lookups():
+    snapshot = make_snapshot()
+    assert snapshot.score_at_rank(1) == 90
+    assert snapshot.score_at_rank(3) == 80
+    assert snapshot.score_at_rank(6) is None
+    assert snapshot.next_score_above(80) == 90
+    assert snapshot.next_score_above(90) is None
+    assert snapshot.total('male:25-29') == 2
+    assert snapshot.rank_for_percentile(60) == 2
+
+
+def test_with_user_entry_leaves_the_original_untouched():
+    snapshot = make_snapshot()
+    patched = snapshot.with_user_entry('user-e', entry('e', 95), version=4)
+    assert patched.version == 4
+    assert patched.entries[0]['profile_id'] == 'e'
+    assert snapshot.by_profile_id['e']['score'] == 60
+    assert snapshot.by_profile_id['b']['rank'] == 1
+
+    removed = snapshot.with_user_entry('user-b', None, version=5)
+    assert 'b' not in removed.by_profile_id
+    assert removed.by_profile_id['a']['rank'] == 1
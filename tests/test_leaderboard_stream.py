@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from backend import leaderboard_stream as stream_module
+from backend.leaderboard_stream import LeaderboardStream, StreamSubscriber
+from tests.conftest import seed_athlete
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def parse(frame: bytes):
+    lines = dict(line.split(': ', 1) for line in frame.decode('utf-8').strip().split('\n'))
+    return lines['event'], json.loads(lines['data'])
+
+
+def test_stream_sends_hello_then_diffs_and_rank_changes(supabase, ranking, monkeypatch):
+    monkeypatch.setattr(stream_module, 'STREAM_COALESCE_SECONDS', 0)
+    watched = seed_athlete(supabase, 'athlete-0', 80)
+    seed_athlete(supabase, 'athlete-1', 70)
+    initial = ranking.get_snapshot()
+
+    async def scenario():
+        stream = LeaderboardStream(ranking)
+        stream.start()
+        subscriber = stream.subscribe(profile_id=watched['id'])
+        events = stream.events(ConnectedRequest(), subscriber)
+
+        assert parse(await events.__anext__()) == ('hello', {'version': initial.version, 'total': 2})
+        assert parse(await events.__anext__())[1]['rank'] == 1
+
+        # A new leader pushes the watched athlete to second place
+        seed_athlete(supabase, 'athlete-2', 95)
+        await asyncio.to_thread(ranking.apply_user_change, 'athlete-2')
+
+        event, delta = parse(await events.__anext__())
+        assert event == 'diff'
+        assert [entry['user_id'] for entry in delta['inserted']] == ['athlete-2']
+        event, rank = parse(await events.__anext__())
+        assert event == 'rank'
+        assert rank == {'profile_id': watched['id'], 'rank': 2, 'total': 3, 'version': delta['version']}
+
+        stream.stop()
+        assert [frame async for frame in events] == []
+        assert stream.subscriber_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_resumed_subscriber_first_gets_the_missed_delta(supabase, ranking):
+    seed_athlete(supabase, 'athlete-0', 80)
+    since = ranking.get_snapshot().version
+    seed_athlete(supabase, 'athlete-1', 90)
+    ranking.apply_user_change('athlete-1')
+
+    async def scenario():
+        stream = LeaderboardStream(ranking)
+        events = stream.events(ConnectedRequest(), stream.subscribe(since=since))
+        assert parse(await events.__anext__())[0] == 'hello'
+        event, delta = parse(await events.__anext__())
+        assert event == 'diff'
+        assert [entry['user_id'] for entry in delta['inserted']] == ['athlete-1']
+        await events.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_overflow_collapses_the_backlog_into_one_resync():
+    async def scenario():
+        subscriber = StreamSubscriber(version=1)
+        for version in range(1, stream_module.STREAM_QUEUE_SIZE + 2):
+            subscriber.offer(('diff', version, version + 1, b''))
+        assert subscriber.overflowed
+        assert subscriber.queue.qsize() == 1
+        assert subscriber.queue.get_nowait() == ('overflow',)
+
+    asyncio.run(scenario())
@@ -0,0 +1,135 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend import llm_ledger as ledger_module
+from backend.llm_ledger import Histogram, LLMLedger
+
+
+class FailingTable:
+    def insert(self, rows):
+        return self
+
+    def execute(self):
+        raise RuntimeError('database unavailable')
+
+
+class FailingClient:
+    def table(self, name):
+        return FailingTable()
+
+
+def ledger_rows(supabase):
+    return supabase.table('llm_call_ledger').select('*').execute().data
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(bounds=(100, 250, 500))
+    for value in (50, 80, 120, 300, 900):
+        histogram.add(value)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.4) == 100.0
+    assert histogram.quantile(0.5) == 250.0
+    # The open-ended bucket reports the largest value seen
+    assert histogram.quantile(0.95) == 900
+    result = histogram.to_dict()
+    assert result['count'] == 5
+    assert result['mean_ms'] == 290.0
+    assert result['buckets'] == {'<=100': 2, '<=250': 1, '<=500': 1, '>500': 1}
+
+
+def test_histogram_quantile_capped_at_max():
+    histogram = Histogram(bounds=(100, 250))
+    histogram.add(30)
+    assert histogram.quantile(0.5) == 30
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) is None
+    assert histogram.to_dict()['mean_ms'] is None
+
+
+def test_track_records_usage_and_time_to_first_token():
+    ledger = LLMLedger(persist=False)
+    usage = SimpleNamespace(input_tokens=100, output_tokens=20,
+                            input_tokens_details=SimpleNamespace(cached_tokens=60))
+    with ledger.track('hybrid_chat', 'fast', 's1', streamed=True, previous_response_id='resp-0') as call:
+        call.first_token()
+        call.response('resp-1', usage)
+    with ledger.track('hybrid_chat', 'fast', 's1') as call:
+        call.response('resp-2', usage)
+
+    calls = ledger.snapshot()['calls']
+    assert len(calls) == 1
+    stats = calls[0]
+    assert stats['calls'] == 2
+    assert stats['chained_calls'] == 1
+    assert stats['input_tokens'] == 200
+    assert stats['cached_input_tokens'] == 120
+    assert stats['wall']['count'] == 2
+    # Only the streamed call has a time to first token
+    assert stats['ttft']['count'] == 1
+
+
+def test_failed_call_is_recorded_and_reraised():
+    ledger = LLMLedger(persist=False)
+    with pytest.raises(RuntimeError):
+        with ledger.track('greeting', 'large'):
+            raise RuntimeError('boom')
+    stats = ledger.snapshot()['calls'][0]
+    assert stats['calls'] == 1
+    assert stats['errors'] == 1
+
+
+def test_calls_are_not_buffered_without_persistence(supabase):
+    ledger = LLMLedger(persist=False)
+    ledger.supabase = supabase
+    with ledger.track('greeting', 'large'):
+        pass
+    ledger.flush()
+    assert ledger.snapshot()['pending_writes'] == 0
+    assert ledger_rows(supabase) == []
+
+
+def test_flush_writes_buffered_calls(supabase, monkeypatch):
+    monkeypatch.setattr(ledger_module, 'LEDGER_BATCH_SIZE', 2)
+    ledger = LLMLedger(persist=True)
+    ledger.supabase = supabase
+    for index in range(3):
+        with ledger.track('hybrid_chat', 'fast', f"s{index}", route='scripted') as call:
+            call.response(f"resp-{index}")
+    assert ledger.snapshot()['pending_writes'] == 3
+
+    ledger.flush()
+    rows = ledger_rows(supabase)
+    assert sorted(row['response_id'] for row in rows) == ['resp-0', 'resp-1', 'resp-2']
+    assert all(row['route'] == 'scripted' and row['status'] == 'ok' for row in rows)
+    assert ledger.snapshot()['pending_writes'] == 0
+
+
+def test_failed_flush_puts_the_batch_back():
+    ledger = LLMLedger(persist=True)
+    ledger.supabase = FailingClient()
+    for index in range(2):
+        with ledger.track('hybrid_chat', 'fast', f"s{index}") as call:
+            call.response(f"resp-{index}")
+
+    with pytest.raises(RuntimeError):
+        ledger.flush()
+    assert [record['response_id'] for record in ledger._pending] == ['resp-0', 'resp-1']
+
+
+def test_stop_writes_what_is_buffered(supabase):
+    ledger = LLMLedger(persist=True)
+
+    async def scenario():
+        await ledger.start(supabase)
+        with ledger.track('greeting', 'large') as call:
+            call.response('resp-1')
+        await ledger.stop()
+
+    asyncio.run(scenario())
+    assert [row['response_id'] for row in ledger_rows(supabase)] == ['resp-1']
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from backend.athlete_profile_parser import SENTINEL
+from backend.interview_extractor import HYBRID_QUESTIONS
+from backend.openai_standin import (
+    RecordingOpenAI,
+    StandInError,
+    StandInOpenAI,
+    create_openai_client,
+    parse_latency,
+)
+
+
+def client(**kwargs):
+    return StandInOpenAI(first_token_latency='fixed:0', delta_latency='fixed:0', **kwargs)
+
+
+def test_parse_latency():
+    rng = random.Random(1)
+    assert parse_latency('fixed:300', rng)() == 0.3
+    assert 0.2 <= parse_latency('uniform:200:900', rng)() <= 0.9
+    assert parse_latency('normal:600:150', rng)() >= 0
+    assert parse_latency('lognormal:600:0.5', rng)() > 0
+    for spec in ('fixed', 'uniform:1', 'normal:a:b', 'lognormal:0:1', 'gamma:1:2'):
+        with pytest.raises(ValueError):
+            parse_latency(spec, rng)
+
+
+def test_scripted_interview_follows_the_question_script():
+    responses = client().responses
+    greeting = responses.create(model='gpt-4.1', input='hi')
+    assert greeting.output_text.endswith(HYBRID_QUESTIONS['first_name'])
+
+    reply = responses.create(model='gpt-4.1', input='Sam', previous_response_id=greeting.id)
+    assert reply.output_text == f"Got it. {HYBRID_QUESTIONS['sex']}"
+    # The chained call reads the earlier turns from the cache
+    assert reply.usage.input_tokens_details.cached_tokens > 0
+
+    finished = responses.create(model='gpt-4.1', input='done', previous_response_id=reply.id)
+    assert SENTINEL in finished.output_text
+
+
+def test_structured_output_gets_the_profile_as_json():
+    response = client().responses.create(
+        model='gpt-4.1',
+        input=[{'role': 'assistant', 'content': HYBRID_QUESTIONS['first_name']}, {'role': 'user', 'content': 'Sam'}],
+        text={'format': {'type': 'json_schema', 'schema': {
+            'type': 'object',
+            'properties': {'first_name': {'type': 'string'}, 'sex': {'type': 'string'}}
+        }}}
+    )
+    assert response.output_text == '{"first_name": "Sam", "sex": ""}'
+
+
+def test_unknown_previous_response_is_rejected():
+    with pytest.raises(StandInError):
+        client().responses.create(model='gpt-4.1', input='hi', previous_response_id='resp_missing')
+
+
+def test_unstored_responses_cannot_be_chained():
+    responses = client().responses
+    response = responses.create(model='gpt-4.1', input='hi', store=False)
+    with pytest.raises(StandInError):
+        responses.create(model='gpt-4.1', input='Sam', previous_response_id=response.id)
+
+
+def test_stream_events():
+    with client().responses.create(model='gpt-4.1', input='hi', stream=True) as stream:
+        events = list(stream)
+    assert events[0].type == 'response.created'
+    assert events[-1].type == 'response.completed'
+    deltas = ''.join(event.delta for event in events if event.type == 'response.output_text.delta')
+    assert deltas == events[-1].response.output_text
+    assert [event.sequence_number for event in events] == list(range(len(events)))
+
+
+def test_recorded_transcripts_replay_per_conversation(tmp_path):
+    path = tmp_path / 'transcripts.jsonl'
+    recording = RecordingOpenAI(client(), str(path))
+    greeting = recording.responses.create(model='gpt-4.1', input='hi')
+    with recording.responses.create(model='gpt-4.1', input='Sam', previous_response_id=greeting.id,
+                                    stream=True) as stream:
+        recorded_reply = ''.join(event.delta for event in stream if event.type == 'response.output_text.delta')
+
+    replay = client(transcripts_path=str(path)).responses
+    replayed_greeting = replay.create(model='gpt-4.1', input='hello')
+    assert replayed_greeting.output_text == greeting.output_text
+    replayed = replay.create(model='gpt-4.1', input='Alex', previous_response_id=replayed_greeting.id)
+    assert replayed.output_text == recorded_reply
+    # Past the end of the recording the scripted replies take over
+    after = replay.create(model='gpt-4.1', input='male', previous_response_id=replayed.id)
+    assert after.output_text == f"Got it. {HYBRID_QUESTIONS['weight_lb']}"
+
+
+def test_create_openai_client_modes(monkeypatch, tmp_path):
+    monkeypatch.delenv('OPENAI_STANDIN_RECORD', raising=False)
+    monkeypatch.setenv('OPENAI_STANDIN', 'scripted')
+    assert isinstance(create_openai_client(None), StandInOpenAI)
+
+    monkeypatch.setenv('OPENAI_STANDIN', 'replay')
+    monkeypatch.delenv('OPENAI_STANDIN_TRANSCRIPTS', raising=False)
+    with pytest.raises(ValueError):
+        create_openai_client(None)
+
+    monkeypatch.setenv('OPENAI_STANDIN', 'mocked')
+    with pytest.raises(ValueError):
+        create_openai_client(None)
+
+    monkeypatch.delenv('OPENAI_STANDIN')
+    monkeypatch.setenv('OPENAI_STANDIN_RECORD', str(tmp_path / 'transcripts.jsonl'))
+    assert isinstance(create_openai_client('sk-test'), RecordingOpenAI)
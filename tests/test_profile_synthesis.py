@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import uuid
+
+
+class UnparseableCompletion:
+    """Scripted replies whose ATHLETE_PROFILE::: payload isn't JSON (structured calls still get a profile)"""
+
+    def __init__(self, replies):
+        self.replies = replies
+
+    def reply(self, messages, text_format, conversation, turn):
+        if text_format:
+            return self.replies.reply(messages, text_format, conversation, turn)
+        return 'All set! ATHLETE_PROFILE:::{first_name: Sam, oops'
+
+
+def start_session(server, user_id):
+    row = server.supabase.table('interview_sessions').insert({
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'status': 'active',
+        'version': 0,
+    }).execute().data[0]
+    server.interview_session_store.create(row)
+    server.interview_session_store.record_turn(row['id'], [
+        {'role': 'assistant', 'content': "First, what's your first name?"},
+        {'role': 'user', 'content': 'Sam'},
+        {'role': 'assistant', 'content': "How do you identify—male or female?"},
+    ])
+    return row['id']
+
+
+def test_structured_synthesis_returns_a_validated_profile(server):
+    profile = server.synthesize_hybrid_profile([
+        {'role': 'assistant', 'content': "First, what's your first name?"},
+        {'role': 'user', 'content': 'Sam'},
+    ])
+    assert profile['first_name'] == 'Sam'
+    assert server.AthleteProfile(**profile).first_name == 'Sam'
+
+
+def test_unparseable_completion_is_synthesized_off_the_event_loop(server, monkeypatch):
+    user_id = f"user-{uuid.uuid4().hex}"
+    session_id = start_session(server, user_id)
+    responses = server.openai_client.responses
+    monkeypatch.setattr(responses, 'replies', UnparseableCompletion(responses.replies))
+
+    synthesis_threads = []
+    synthesize = server.synthesize_hybrid_profile
+
+    def recording_synthesis(*args):
+        synthesis_threads.append(threading.get_ident())
+        return synthesize(*args)
+
+    async def complete(user_id, session_id, profile_json):
+        return {'completed': True, 'profile_data': profile_json}
+
+    monkeypatch.setattr(server, 'synthesize_hybrid_profile', recording_synthesis)
+    monkeypatch.setattr(server, 'complete_hybrid_interview', complete)
+    request = server.UserMessageRequest(
+        session_id=session_id, messages=[server.InterviewMessage(role='user', content='done')]
+    )
+
+    async def scenario():
+        return threading.get_ident(), await server.run_hybrid_interview_turn(request, user_id)
+
+    loop_thread, result = asyncio.run(scenario())
+    assert result['completed'] is True
+    assert result['profile_data']['first_name'] == 'Sam'
+    assert synthesis_threads and synthesis_threads[0] != loop_thread
@@ -0,0 +1,53 @@
+import threading
+
+from tests.conftest import seed_athlete
+
+
+def seed_leaderboard(client):
+    profiles = {}
+    for index, score in enumerate([90, 80, 80, 70, 60]):
+        user_id = f"athlete-{index}"
+        profiles[user_id] = seed_athlete(client, user_id, score)
+    return profiles
+
+
+def test_score_ranking_and_targets_report_the_same_percentile(supabase, ranking):
+    profiles = seed_leaderboard(supabase)
+    profile = profiles['athlete-3']
+    context = ranking.get_profile_score_context(profile['id'])
+
+    score_ranking = ranking.get_score_ranking(context['score'], on_leaderboard=True)
+    targets = ranking.get_rank_targets(context)
+
+    assert score_ranking['position'] == targets['global']['position'] == 4
+    assert score_ranking['total_athletes'] == targets['global']['total_athletes'] == 5
+    assert score_ranking['percentile'] == targets['global']['percentile'] == 20.0
+
+
+def test_hypothetical_score_counts_the_user(supabase, ranking):
+    seed_leaderboard(supabase)
+    score_ranking = ranking.get_score_ranking(85)
+    assert score_ranking['position'] == 2
+    assert score_ranking['total_athletes'] == 6
+    assert score_ranking['percentile'] == ranking.get_snapshot().percentile_for_score(85)
+
+
+def test_concurrent_cold_callers_share_one_build(supabase, ranking, monkeypatch):
+    seed_leaderboard(supabase)
+    builds = []
+    build = ranking.get_public_leaderboard_data
+
+    def counted_build():
+        builds.append(1)
+        return build()
+
+    monkeypatch.setattr(ranking, 'get_public_leaderboard_data', counted_build)
+    snapshots = []
+    threads = [threading.Thread(target=lambda: snapshots.append(ranking.get_snapshot())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
@@ -0,0 +1,70 @@
+import gzip
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.response_cache import MIN_COMPRESS_BYTES, EncodedBody, ResponseCache
+
+
+def make_client(cache, payloads, version):
+    app = FastAPI()
+
+    @app.get('/leaderboard')
+    def leaderboard(request: Request):
+        return cache.get('leaderboard', version[0], lambda: payloads.append(1) or {
+            'version': version[0], 'rows': ['x' * 40] * 50
+        }).to_response(request)
+
+    return TestClient(app)
+
+
+def test_body_is_built_once_per_version():
+    cache, payloads, version = ResponseCache(), [], [1]
+    client = make_client(cache, payloads, version)
+
+    first = client.get('/leaderboard')
+    second = client.get('/leaderboard')
+    assert first.json() == second.json()
+    assert len(payloads) == 1
+
+    version[0] = 2
+    assert client.get('/leaderboard').json()['version'] == 2
+    assert len(payloads) == 2
+
+
+def test_older_version_never_replaces_a_newer_one():
+    cache = ResponseCache()
+    newer = cache.get('key', 2, lambda: {'v': 2})
+    cache.get('key', 1, lambda: {'v': 1})
+    assert cache.get('key', 2, lambda: {'v': 'rebuilt'}) is newer
+
+
+def test_compressed_variant_and_304():
+    client = make_client(ResponseCache(), [], [1])
+
+    response = client.get('/leaderboard', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['etag'].endswith('-gzip"')
+    assert response.headers['vary'] == 'Accept-Encoding'
+
+    not_modified = client.get('/leaderboard', headers={'If-None-Match': response.headers['etag']})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+
+
+def test_small_bodies_and_refused_codings_are_sent_as_is():
+    body = EncodedBody({'ok': True})
+    assert len(body.raw) < MIN_COMPRESS_BYTES
+    assert body.etag() == f'"{body.tag}"'
+
+    client = make_client(ResponseCache(), [], [1])
+    response = client.get('/leaderboard', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'content-encoding' not in response.headers
+
+
+def test_variant_round_trips():
+    body = EncodedBody({'rows': list(range(500))})
+    assert gzip.decompress(body.variant('gzip')) == body.raw
+    assert body.variant('gzip') is body.variant('gzip')
+    assert body.matches(f'W/{body.etag("br")}, "other"')
+    assert not body.matches('"other"')
@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from backend import session_sweeper
+from backend.interview_sessions import InterviewSessionStore
+from backend.session_sweeper import InterviewSessionSweeper
+
+
+class FailingDelete:
+    """Wraps a client so deletes on interview_sessions fail until `broken` is cleared"""
+
+    def __init__(self, client):
+        self.client = client
+        self.broken = True
+
+    def table(self, name):
+        table = self.client.table(name)
+        if self.broken:
+            table.delete = self._fail
+        return table
+
+    def _fail(self):
+        raise RuntimeError('database unavailable')
+
+
+def add_session(supabase, user_id, status='active', idle_hours=0):
+    updated_at = (datetime.utcnow() - timedelta(hours=idle_hours)).isoformat()
+    return supabase.table('interview_sessions').insert({
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'status': status,
+        'updated_at': updated_at,
+    }).execute().data[0]['id']
+
+
+def session_ids(supabase):
+    return {row['id'] for row in supabase.table('interview_sessions').select('id').execute().data}
+
+
+def sweeper_for(supabase, **kwargs):
+    return InterviewSessionSweeper(supabase, InterviewSessionStore(supabase), **kwargs)
+
+
+def test_superseded_sessions_are_deleted_except_the_new_one(supabase):
+    old, new = add_session(supabase, 'user-1'), add_session(supabase, 'user-1')
+    finished = add_session(supabase, 'user-1', status='complete')
+    other = add_session(supabase, 'user-2')
+    sweeper = sweeper_for(supabase)
+
+    sweeper.supersede('user-1', new)
+    assert sweeper.delete_superseded() == 1
+    assert session_ids(supabase) == {new, finished, other}
+    # The queue is drained
+    assert sweeper.delete_superseded() == 0
+
+
+def test_failed_supersede_is_retried(supabase):
+    old, new = add_session(supabase, 'user-1'), add_session(supabase, 'user-1')
+    client = FailingDelete(supabase)
+    sweeper = sweeper_for(client)
+
+    sweeper.supersede('user-1', new)
+    assert sweeper.delete_superseded() == 0
+    client.broken = False
+    assert sweeper.delete_superseded() == 1
+    assert session_ids(supabase) == {new}
+
+
+def test_expired_sessions_are_deleted_in_batches(supabase, monkeypatch):
+    monkeypatch.setattr(session_sweeper, 'SWEEP_BATCH_SIZE', 2)
+    expired = [add_session(supabase, f"user-{index}", idle_hours=30) for index in range(5)]
+    fresh = add_session(supabase, 'user-fresh', idle_hours=1)
+    finished = add_session(supabase, 'user-done', status='complete', idle_hours=30)
+    sweeper = sweeper_for(supabase, ttl_hours=24)
+    sweeper.store.create({'id': expired[0], 'user_id': 'user-0', 'status': 'active'})
+
+    assert sweeper.delete_expired() == 5
+    assert session_ids(supabase) == {fresh, finished}
+    # Cached copies of deleted sessions are dropped too
+    assert sweeper.store.get(expired[0], 'user-0') is None
+
+
+def test_sweep_only_expires_when_asked(supabase):
+    expired = add_session(supabase, 'user-1', idle_hours=30)
+    sweeper = sweeper_for(supabase, ttl_hours=24)
+    assert sweeper.sweep(expire=False) == (0, 0)
+    assert sweeper.sweep(expire=True) == (0, 1)
+    assert expired not in session_ids(supabase)
+
+
+def test_running_sweeper_deletes_superseded_sessions_when_woken(supabase):
+    old, new = add_session(supabase, 'user-1'), add_session(supabase, 'user-1')
+    sweeper = sweeper_for(supabase, interval=3600)
+
+    async def scenario():
+        await sweeper.start()
+        sweeper.supersede('user-1', new)
+        for _ in range(100):
+            if old not in session_ids(supabase):
+                break
+            await asyncio.sleep(0.01)
+        await sweeper.stop()
+
+    asyncio.run(scenario())
+    assert session_ids(supabase) == {new}
+
+
+def test_stop_deletes_what_is_queued(supabase):
+    old, new = add_session(supabase, 'user-1'), add_session(supabase, 'user-1')
+    sweeper = sweeper_for(supabase)
+    sweeper.supersede('user-1', new)
+    asyncio.run(sweeper.stop())
+    assert session_ids(supabase) == {new}
@@ -0,0 +1,68 @@
+import asyncio
+
+from backend.snapshot_refresher import SnapshotRefresher
+from tests.conftest import seed_athlete
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, 'condition not met in time'
+        await asyncio.sleep(0.01)
+
+
+def test_start_warms_the_snapshot_and_stop_detaches(supabase, ranking):
+    seed_athlete(supabase, 'athlete-0', 80)
+    refresher = SnapshotRefresher(ranking, interval=60)
+
+    async def scenario():
+        await refresher.start()
+        assert refresher.running
+        assert ranking._snapshot is not None and len(ranking._snapshot) == 1
+        assert ranking.refresh_callback == refresher.request_refresh
+        await refresher.stop()
+
+    asyncio.run(scenario())
+    assert not refresher.running
+    assert ranking.refresh_callback is None
+
+
+def test_stale_snapshot_is_served_while_the_refresher_rebuilds(supabase, ranking):
+    seed_athlete(supabase, 'athlete-0', 80)
+    refresher = SnapshotRefresher(ranking, interval=60)
+
+    async def scenario():
+        await refresher.start()
+        warm = ranking._snapshot
+        seed_athlete(supabase, 'athlete-1', 90)
+        ranking._snapshot_built_at = 0.0
+
+        # The request path gets the stale snapshot and only wakes the refresher
+        assert ranking.get_snapshot() is warm
+        await wait_for(lambda: ranking._snapshot is not warm)
+        assert len(ranking._snapshot) == 2
+        assert ranking._snapshot.version > warm.version
+        await refresher.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_rebuild_keeps_the_previous_snapshot(supabase, ranking, monkeypatch):
+    seed_athlete(supabase, 'athlete-0', 80)
+    refresher = SnapshotRefresher(ranking, interval=60)
+    failures = []
+
+    def failing_scan():
+        failures.append(1)
+        raise RuntimeError('database unavailable')
+
+    async def scenario():
+        await refresher.start()
+        warm = ranking._snapshot
+        monkeypatch.setattr(ranking, 'get_public_leaderboard_data', failing_scan)
+        refresher.request_refresh(force=True)
+        await wait_for(lambda: failures)
+        assert ranking.get_snapshot() is warm
+        await refresher.stop()
+
+    asyncio.run(scenario())
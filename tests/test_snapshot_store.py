@@ -0,0 +1,163 @@
+import os
+import threading
+
+from backend.leaderboard_snapshot import LeaderboardSnapshot
+from backend.snapshot_store import SharedSnapshotStore
+
+
+def make_snapshot(version, scores=(90, 80, 80, 70)):
+    return LeaderboardSnapshot([
+        {'profile_id': f"p{i}", 'user_id': f"u{i}", 'score': score, 'gender': 'male', 'age': 30}
+        for i, score in enumerate(scores)
+    ], version=version, built_at='2026-01-01T00:00:00')
+
+
+def test_publish_and_load(tmp_path):
+    path = str(tmp_path / 'leaderboard.snapshot')
+    writer = SharedSnapshotStore(path)
+    reader = SharedSnapshotStore(path)
+    assert reader.load_if_changed() is None
+    assert reader.published_version() == 0
+
+    with writer.publish_lock():
+        assert writer.publish(make_snapshot(1))
+
+    loaded = reader.load_if_changed()
+    assert loaded.version == 1
+    assert loaded.built_at == '2026-01-01T00:00:00'
+    assert [e['profile_id'] for e in loaded.entries] == ['p0', 'p1', 'p2', 'p3']
+    assert list(loaded.scores()) == [70.0, 80.0, 80.0, 90.0]
+    assert loaded.rank_for_score(80) == 2
+    assert reader.published_version() == 1
+    assert reader.published_age() is not None
+
+
+def test_load_only_when_changed(tmp_path):
+    path = str(tmp_path / 'leaderboard.snapshot')
+    store = SharedSnapshotStore(path)
+    reader = SharedSnapshotStore(path)
+    store.publish(make_snapshot(1))
+    assert reader.load_if_changed() is not None
+    assert reader.load_if_changed() is None
+
+    store.publish(make_snapshot(2, scores=(50,)))
+    loaded = reader.load_if_changed()
+    assert loaded.version == 2
+    assert len(loaded) == 1
+
+
+def test_same_or_older_version_is_not_published(tmp_path):
+    path = str(tmp_path / 'leaderboard.snapshot')
+    store = SharedSnapshotStore(path)
+    assert store.publish(make_snapshot(2))
+    assert not store.publish(make_snapshot(2, scores=(10,)))
+    assert not store.publish(make_snapshot(1))
+    assert store.published_version() == 2
+    assert sorted(os.listdir(tmp_path)) == ['leaderboard.snapshot']
+
+
+def test_versions_taken_under_the_publish_lock_are_unique(tmp_path):
+    path = str(tmp_path / 'leaderboard.snapshot')
+    published = []
+
+    def publish():
+        store = SharedSnapshotStore(path)
+        with store.publish_lock():
+            version = store.published_version() + 1
+            assert store.publish(make_snapshot(version))
+            published.append(version)
+
+    threads = [threading.Thread(target=publish) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(published) == list(range(1, 9))
+    assert SharedSnapshotStore(path).published_version() == 8
+
+
+def test_build_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / 'leaderboard.snapshot')
+    first, second = SharedSnapshotStore(path), SharedSnapshotStore(path)
+    with first.build_lock() as acquired:
+        assert acquired
+        with second.build_lock() as also_acquired:
+            assert not also_acquired
+    with second.build_lock() as acquired:
+        assert acquired
+
+
+def load(tmp_path, snapshot):
+    path = str(tmp_path / 'leaderboard.snapshot')
+    SharedSnapshotStore(path).publish(snapshot)
+    return SharedSnapshotStore(path).load_if_changed()
+
+
+def test_lookups_read_the_columns_without_decoding_entries(tmp_path):
+    snapshot = LeaderboardSnapshot([
+        {'profile_id': 'a', 'score': 90, 'gender': 'male', 'age': 30},
+        {'profile_id': 'long-profile-id', 'score': 80, 'gender': 'female', 'age': 27},
+        {'profile_id': 'b', 'score': 80, 'gender': 'male', 'age': 33},
+        {'profile_id': 'c', 'score': 60, 'gender': None, 'age': None},
+    ], version=1)
+    loaded = load(tmp_path, snapshot)
+
+    assert len(loaded) == 4
+    assert sorted(loaded.segment_keys()) == ['female:25-29', 'male:30-34']
+    for segment in [None, 'male:30-34', 'female:25-29', 'female:60+']:
+        assert list(loaded.scores(segment)) == list(snapshot.scores(segment))
+        assert loaded.rank_for_score(85, segment) == snapshot.rank_for_score(85, segment)
+        assert loaded.percentile_for_score(80, segment) == snapshot.percentile_for_score(80, segment)
+    assert loaded.index_of('b') == 2
+    assert 'long-profile-id' in loaded.by_profile_id
+    assert 'missing' not in loaded.by_profile_id
+    assert 'a-profile-id-longer-than-the-column' not in loaded.by_profile_id
+    assert sorted(loaded.by_profile_id) == ['a', 'b', 'c', 'long-profile-id']
+    assert loaded._entries is None
+
+
+def test_entries_decode_only_for_served_rows(tmp_path):
+    snapshot = make_snapshot(1, scores=(90, 80, 80, 70, 60))
+    loaded = load(tmp_path, snapshot)
+
+    assert loaded.by_profile_id['p2'] == snapshot.by_profile_id['p2']
+    assert loaded.page(1, 2) == snapshot.page(1, 2)
+    assert loaded.page(4, 10) == snapshot.page(4, 10)
+    assert loaded.entry_at(-1) == snapshot.entry_at(-1)
+    assert loaded._entries is None
+
+    assert loaded.entries == snapshot.entries
+    assert loaded.entries is loaded.entries
+
+
+def test_empty_snapshot_round_trips(tmp_path):
+    loaded = load(tmp_path, LeaderboardSnapshot([], version=1))
+    assert len(loaded) == 0
+    assert loaded.entries == []
+    assert loaded.rank_for_score(50) == 1
+    assert 'p0' not in loaded.by_profile_id
+
+
+def test_second_worker_serves_the_published_snapshot(tmp_path, supabase, ranking):
+    from backend.ranking_service import RankingService
+    from backend.snapshot_store import MappedLeaderboardSnapshot
+    from tests.conftest import seed_athlete
+
+    profile = seed_athlete(supabase, 'athlete-0', 80)
+    seed_athlete(supabase, 'athlete-1', 90)
+    path = str(tmp_path / 'leaderboard.snapshot')
+    ranking.shared_store = SharedSnapshotStore(path)
+    built = ranking.rebuild_snapshot()
+
+    worker = RankingService()
+    worker.supabase = None
+    worker.shared_store = SharedSnapshotStore(path)
+    served = worker.get_snapshot()
+
+    assert isinstance(served, MappedLeaderboardSnapshot)
+    assert served.version == built.version
+    assert worker.get_leaderboard_stats(served) == ranking.get_leaderboard_stats(built)
+    context = worker.get_profile_score_context(profile['id'])
+    assert context['on_leaderboard'] and context['score'] == 80
+    assert worker.get_score_ranking(80, on_leaderboard=True) == ranking.get_score_ranking(80, on_leaderboard=True)
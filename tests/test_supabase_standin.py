@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from backend import supabase_standin
+from backend.supabase_standin import StandInAPIError, StandInSupabase, create_supabase_client
+from tests.conftest import seed_athlete
+
+SCHEMA_SQL = """
+-- A parent and a child table
+CREATE TABLE IF NOT EXISTS teams (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    slug TEXT UNIQUE NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE TABLE players (
+    id SERIAL PRIMARY KEY,
+    team_id UUID REFERENCES teams(id) ON DELETE SET NULL,
+    name TEXT,
+    active BOOLEAN DEFAULT true
+);
+CREATE TRIGGER update_teams_updated_at BEFORE UPDATE ON teams
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+"""
+
+
+@pytest.fixture
+def league(tmp_path):
+    (tmp_path / 'schema.sql').write_text(SCHEMA_SQL)
+    return StandInSupabase(str(tmp_path))
+
+
+def test_schema_files_give_defaults_and_keys(league):
+    team = league.table('teams').insert({'slug': 'red'}).execute().data[0]
+    assert team['id'] and team['created_at']
+    players = league.table('players').insert([{'team_id': team['id'], 'name': 'a'}, {'name': 'b'}]).execute().data
+    assert [player['id'] for player in players] == [1, 2]
+    assert all(player['active'] is True for player in players)
+
+
+def test_unknown_table_is_rejected(league):
+    with pytest.raises(StandInAPIError) as error:
+        league.table('missing').select('*').execute()
+    assert error.value.code == '42P01'
+
+
+def test_unique_violation_rolls_back_the_whole_insert(league):
+    league.table('teams').insert({'slug': 'red'}).execute()
+    with pytest.raises(StandInAPIError) as error:
+        league.table('teams').insert([{'slug': 'blue'}, {'slug': 'red'}]).execute()
+    assert error.value.code == '23505'
+    assert [row['slug'] for row in league.table('teams').select('slug').execute().data] == ['red']
+
+
+def test_foreign_keys_are_enforced_and_set_null_on_delete(league):
+    with pytest.raises(StandInAPIError) as error:
+        league.table('players').insert({'team_id': '00000000-0000-0000-0000-000000000000'}).execute()
+    assert error.value.code == '23503'
+
+    team = league.table('teams').insert({'slug': 'red'}).execute().data[0]
+    league.table('players').insert({'team_id': team['id'], 'name': 'a'}).execute()
+    league.table('teams').delete().eq('id', team['id']).execute()
+    assert league.table('players').select('team_id').execute().data == [{'team_id': None}]
+
+
+def test_update_touches_updated_at(league):
+    team = league.table('teams').insert({'slug': 'red', 'updated_at': '2020-01-01T00:00:00+00:00'}).execute().data[0]
+    updated = league.table('teams').update({'slug': 'blue'}).eq('id', team['id']).execute().data[0]
+    assert updated['slug'] == 'blue'
+    assert updated['updated_at'] > '2020-01-01T00:00:00+00:00'
+
+
+def test_filters_order_and_ranges(league):
+    league.table('players').insert([
+        {'name': name, 'active': active} for name, active in [('a', True), ('b', False), ('c', True), ('d', None)]
+    ]).execute()
+    players = league.table('players')
+
+    assert [r['name'] for r in players.select('name').eq('active', True).order('name', desc=True).execute().data] \
+        == ['c', 'a']
+    assert [r['name'] for r in league.table('players').select('name').is_('active', 'null').execute().data] == ['d']
+    assert [r['name'] for r in league.table('players').select('name').not_.in_('name', ['a', 'b']).order('name')
+            .execute().data] == ['c', 'd']
+    page = league.table('players').select('name', count='exact').gte('id', 2).order('id').range(1, 2).execute()
+    assert [r['name'] for r in page.data] == ['c', 'd']
+    assert page.count == 3
+
+
+def test_upsert_on_conflict(league):
+    first = league.table('teams').upsert({'slug': 'red'}, on_conflict='slug').execute().data[0]
+    second = league.table('teams').upsert({'slug': 'red', 'updated_at': None}, on_conflict='slug').execute().data[0]
+    assert second['id'] == first['id']
+    assert league.table('teams').upsert({'slug': 'red'}, on_conflict='slug', ignore_duplicates=True).execute().data == []
+
+    with pytest.raises(StandInAPIError) as error:
+        league.table('players').upsert({'name': 'a'}, on_conflict='name').execute()
+    assert error.value.code == '42P10'
+
+
+def test_inner_embed_filters_rows(supabase):
+    seed_athlete(supabase, 'user-1', 80, name='Ana')
+    supabase.seed('athlete_profiles', [{'user_id': None, 'hybrid_score': 70}])
+
+    rows = supabase.table('athlete_profiles').select('hybrid_score, user_profiles!inner(name)').execute().data
+    assert rows == [{'hybrid_score': 80, 'user_profiles': {'name': 'Ana'}}]
+    both = supabase.table('athlete_profiles').select('hybrid_score, user_profiles(name)').order('hybrid_score').execute()
+    assert [row['user_profiles'] for row in both.data] == [None, {'name': 'Ana'}]
+
+
+def test_deleting_a_user_cascades_to_their_profiles(supabase):
+    seed_athlete(supabase, 'user-1', 80)
+    supabase.table('user_profiles').delete().eq('user_id', 'user-1').execute()
+    assert supabase.table('athlete_profiles').select('id').execute().data == []
+
+
+def test_rpc_needs_a_registered_function(league):
+    with pytest.raises(StandInAPIError) as error:
+        league.rpc('team_count').execute()
+    assert error.value.code == 'PGRST202'
+
+    league.register_rpc('team_count', lambda db, prefix='': [{'count': sum(
+        1 for row in db.rows['teams'].values() if row['slug'].startswith(prefix))}])
+    league.table('teams').insert([{'slug': 'red'}, {'slug': 'rose'}, {'slug': 'blue'}]).execute()
+    assert league.rpc('team_count', {'prefix': 'r'}).execute().data == [{'count': 2}]
+
+
+def test_create_supabase_client_shares_one_seeded_stand_in(monkeypatch, tmp_path):
+    seed_file = tmp_path / 'seed.json'
+    seed_file.write_text(json.dumps({'interview_sessions': [{'id': 's1', 'user_id': 'user-1', 'status': 'active'}]}))
+    monkeypatch.setattr(supabase_standin, '_standin', None)
+    monkeypatch.setenv('SUPABASE_STANDIN', 'memory')
+    monkeypatch.setenv('SUPABASE_STANDIN_SEED', str(seed_file))
+
+    client = create_supabase_client(None, None)
+    assert create_supabase_client(None, None) is client
+    assert client.table('interview_sessions').select('id').execute().data == [{'id': 's1'}]
+
+    monkeypatch.setenv('SUPABASE_STANDIN', 'sqlite')
+    with pytest.raises(ValueError):
+        create_supabase_client(None, None)